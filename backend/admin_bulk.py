@@ -0,0 +1,155 @@
+import csv
+import os
+import time
+import uuid
+
+from flask import current_app
+
+from .models import db, User
+from .admin_service import username_prefix_filter
+from .job_queue import current_job
+from .site_stats import adjust_site_stats
+
+BULK_ACTIONS = ('delete', 'promote', 'demote', 'export')
+EXPORT_FIELDS = ('id', 'username', 'is_admin', 'resume_generations', 'cover_letter_generations')
+
+
+class BulkActionError(ValueError):
+    """Raised for an invalid bulk request (unknown action, empty selection)."""
+    pass
+
+
+def _user_child_tables():
+    """Every table with a foreign key to user, children first, so deletes never violate a constraint."""
+    user_table = User.__table__
+    return [
+        table for table in reversed(db.metadata.sorted_tables)
+        if any(fk.column.table is user_table for fk in table.foreign_keys)
+    ]
+
+
+def _id_chunks(user_ids, exclude_id, chunk_size):
+    """Split a selection into sorted chunks, keeping every IN list under the database's parameter limit."""
+    ids = sorted(set(user_ids) - {exclude_id})
+    return [ids[start:start + chunk_size] for start in range(0, len(ids), chunk_size)], len(ids)
+
+
+def _filter_chunks(where, exclude_id, chunk_size):
+    """Yield lists of matching user ids in id order, reading one chunk at a time."""
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            db.select(User.id)
+            .where(where, User.id > last_id, User.id != exclude_id)
+            .order_by(User.id)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def delete_users(ids):
+    """Delete users and all their rows with one set-based DELETE per table. The caller commits.
+
+    Bypasses the ORM cascade (which loads every child row) and its mapper events, so
+    the site totals are adjusted here from the same rows.
+    """
+    connection = db.session.connection()
+    count, resumes, cover_letters = connection.execute(
+        db.select(
+            db.func.count(User.id),
+            db.func.coalesce(db.func.sum(User.resume_generations), 0),
+            db.func.coalesce(db.func.sum(User.cover_letter_generations), 0),
+        ).where(User.id.in_(ids))
+    ).one()
+    for table in _user_child_tables():
+        connection.execute(db.delete(table).where(table.c.user_id.in_(ids)))
+    connection.execute(db.delete(User.__table__).where(User.__table__.c.id.in_(ids)))
+    adjust_site_stats(connection, user_count=-count, resume_generations=-resumes, cover_letter_generations=-cover_letters)
+    # Cached profile renders of deleted users are never served again: a reused id gets a
+    # new random profile_version, so they just age out of the LRU
+    return count
+
+
+def set_admin(ids, is_admin):
+    """Promote or demote users with one UPDATE. The caller commits."""
+    result = db.session.execute(
+        db.update(User).where(User.id.in_(ids)).values(is_admin=is_admin).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def export_path(export_id):
+    return os.path.join(current_app.instance_path, 'exports', f'users-{export_id}.csv')
+
+
+def _prune_exports(directory, max_age):
+    """Remove exports older than max_age seconds; their jobs have expired, so nothing links to them."""
+    cutoff = time.time() - max_age
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+
+
+def run_bulk_action(action, acting_user_id, user_ids=None, prefix=None):
+    """Body of a bulk admin job; runs in a worker's app context.
+
+    Targets the given user ids, or every user matching the username prefix (everyone
+    if neither is given), never including the admin who started the job. Work is done
+    ADMIN_BULK_CHUNK_SIZE users at a time and each chunk is committed on its own, so
+    the database is only ever locked for one chunk and other requests keep flowing.
+    Progress is reported on the job after every chunk.
+    """
+    if action not in BULK_ACTIONS:
+        raise BulkActionError(f"Unknown bulk action '{action}'.")
+    chunk_size = current_app.config.get('ADMIN_BULK_CHUNK_SIZE', 500)
+    if user_ids is not None:
+        chunks, total = _id_chunks(user_ids, acting_user_id, chunk_size)
+    else:
+        where = username_prefix_filter(prefix) if prefix else db.true()
+        chunks = _filter_chunks(where, acting_user_id, chunk_size)
+        total = db.session.execute(db.select(db.func.count(User.id)).where(where, User.id != acting_user_id)).scalar()
+    job = current_job()
+    if job is not None:
+        job.set_progress(0, total)
+
+    done = 0
+    result = {'action': action}
+    export_file = writer = None
+    if action == 'export':
+        result['export_id'] = job.id if job is not None else uuid.uuid4().hex
+        path = export_path(result['export_id'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _prune_exports(os.path.dirname(path), current_app.config.get('ADMIN_JOB_RESULT_TTL', 3600))
+        export_file = open(path, 'w', newline='', encoding='utf-8')
+        writer = csv.writer(export_file)
+        writer.writerow(EXPORT_FIELDS)
+    try:
+        for ids in chunks:
+            try:
+                if action == 'delete':
+                    delete_users(ids)
+                elif action in ('promote', 'demote'):
+                    set_admin(ids, action == 'promote')
+                else:
+                    rows = db.session.execute(
+                        db.select(*(getattr(User, field) for field in EXPORT_FIELDS)).where(User.id.in_(ids)).order_by(User.id)
+                    ).all()
+                    writer.writerows(rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            done += len(ids)
+            if job is not None:
+                job.set_progress(done, max(total, done)) # Users added mid-run can push a filter past its count
+    finally:
+        if export_file is not None:
+            export_file.close()
+
+    current_app.logger.info(f"Bulk {action} by admin {acting_user_id} finished: {done} users")
+    result['users'] = done
+    return result
@@ -5,15 +5,19 @@ import os # Import os
 from functools import wraps
 from flask import Blueprint, render_template, abort, current_app, jsonify
 from flask_login import login_required, current_user
-from flask import Blueprint, render_template, abort, current_app, jsonify, request, flash, redirect, url_for # Added request, flash, redirect, url_for
+from flask import Blueprint, render_template, abort, current_app, jsonify, request, flash, redirect, url_for, send_file # Added request, flash, redirect, url_for
 from flask_login import login_required, current_user
 import os # Import os
 from functools import wraps
 from flask import Blueprint, render_template, abort, current_app, jsonify
 from flask_login import login_required, current_user
 # Import models needed for admin views
-# Import specific models needed for view_user
-from .models import User, db, PersonalInfo, Experience, Education, Skill, Project
+from .models import User, db
+from .profile_service import load_profile
+from .site_stats import load_dashboard_stats
+from .job_queue import get_admin_job_queue, JobQueueFull, load_job
+from .admin_bulk import BULK_ACTIONS, run_bulk_action, export_path, delete_users
+from .admin_service import USER_SORT_COLUMNS, list_users_page, estimate_user_count, count_matching_users
 
 # Define template folder relative to this blueprint file's location
 template_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'admin'))
@@ -35,20 +39,69 @@ def admin_required(f):
 @login_required
 @admin_required
 def dashboard():
-    # Get user count
-    user_count = User.query.count()
-    # Render the admin dashboard template, passing count
-    return render_template('admin_dashboard.html', current_user=current_user, user_count=user_count)
+    # Totals, per-day buckets and top users from the maintained summary tables (no user table scan)
+    stats = load_dashboard_stats(days=current_app.config.get('ADMIN_DASHBOARD_DAYS', 30))
+    # Tallest bar in the daily chart, for scaling
+    chart_max = max([day['resume_generations'] + day['cover_letter_generations'] for day in stats['daily']] + [1])
+    # Render the admin dashboard template, passing the stats
+    return render_template('admin_dashboard.html', current_user=current_user, user_count=stats['user_count'],
+                           total_resumes=stats['resume_generations'], total_cover_letters=stats['cover_letter_generations'],
+                           daily=stats['daily'], chart_max=chart_max, top_users=stats['top_users'],
+                           stats_updated_at=stats['updated_at'])
+
+
+@admin_bp.route('/stats')
+@login_required
+@admin_required
+def stats():
+    """The dashboard numbers as JSON."""
+    days = min(max(request.args.get('days', 30, type=int) or 30, 1), 366)
+    return jsonify(load_dashboard_stats(days=days))
+
+
+@admin_bp.route('/metrics')
+@login_required
+@admin_required
+def metrics():
+    # Runtime counters for this worker process (each gunicorn worker has its own)
+    return jsonify({
+        'generation_cache': current_app.extensions['generation_cache'].stats(),
+        'llm_client': current_app.extensions['llm_client'].stats(),
+        'profile_fragment_cache': current_app.extensions['profile_fragment_cache'].stats(),
+        'generation_counters': current_app.extensions['generation_counters'].stats(),
+        'keyword_engine': current_app.extensions['keyword_engine'].stats(),
+    })
 
 
 @admin_bp.route('/users')
 @login_required
 @admin_required
 def list_users():
+    """One page of users, optionally filtered by username prefix and sorted by a column.
+
+    Query parameters: `q` (username prefix), `sort` (see USER_SORT_COLUMNS), `dir`
+    ('asc' or 'desc') and `cursor` (from the previous page's "Next" link).
+    """
+    sort = request.args.get('sort', 'id')
+    descending = request.args.get('dir') == 'desc'
+    prefix = request.args.get('q', '').strip()
+    cursor = request.args.get('cursor')
+    try:
+        users, next_cursor = list_users_page(sort, descending, prefix, cursor,
+                                             current_app.config.get('ADMIN_USERS_PAGE_SIZE', 50))
+    except ValueError as e:
+        flash(f'Invalid user list request: {e}', 'warning')
+        return redirect(url_for('admin.list_users'))
     try:
-        users = User.query.order_by(User.id).all()
+        if prefix:
+            total, total_capped = count_matching_users(prefix, current_app.config.get('ADMIN_USERS_SEARCH_COUNT_CAP', 1000))
+        else:
+            total, total_capped = estimate_user_count(), False
         # Render the user list template, passing the users
-        return render_template('admin_users.html', users=users, current_user=current_user)
+        return render_template('admin_users.html', users=users, current_user=current_user, next_cursor=next_cursor,
+                               sort=sort, direction='desc' if descending else 'asc', q=prefix,
+                               sort_columns=USER_SORT_COLUMNS, total=total, total_capped=total_capped,
+                               total_is_estimate=not prefix)
     except Exception as e:
         current_app.logger.error(f"Error fetching users for admin: {e}")
         flash(f'An error occurred while fetching users: {e}', 'danger')
@@ -60,28 +113,7 @@ def list_users():
 def view_user(user_id):
     try:
         user = User.query.get_or_404(user_id)
-        # Fetch profile data similarly to profile_api.get_profile
-        personal_info = user.personal_info
-        experiences = user.experiences.order_by(Experience.id).all()
-        educations = user.educations.order_by(Education.id).all()
-        skills = user.skills.order_by(Skill.id).all()
-        projects = user.projects.order_by(Project.id).all()
-
-        profile_data = {
-            'personal_info': {
-                'full_name': personal_info.full_name if personal_info else '',
-                'phone_number': personal_info.phone_number if personal_info else '',
-                'email_address': personal_info.email_address if personal_info else '',
-                'linkedin_url': personal_info.linkedin_url if personal_info else '',
-                'portfolio_url': personal_info.portfolio_url if personal_info else '',
-                'location': personal_info.location if personal_info else '',
-                'target_job': personal_info.target_job if personal_info else '',
-            } if personal_info else {},
-            'experiences': [{'id': exp.id, 'job_title': exp.job_title, 'company_name': exp.company_name, 'location': exp.location, 'start_date': exp.start_date, 'end_date': exp.end_date, 'description': exp.description} for exp in experiences],
-            'educations': [{'id': edu.id, 'degree_name': edu.degree_name, 'major': edu.major, 'institution_name': edu.institution_name, 'location': edu.location, 'graduation_date': edu.graduation_date} for edu in educations],
-            'skills': [{'id': skill.id, 'skill_name': skill.skill_name} for skill in skills],
-            'projects': [{'id': proj.id, 'project_name': proj.project_name, 'description': proj.description, 'link': proj.link} for proj in projects],
-        }
+        profile_data = load_profile(user.id)
         # Render the detail template
         return render_template('admin_user_detail.html', user=user, profile_data=profile_data, current_user=current_user)
 
@@ -123,8 +155,8 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     username_deleted = user.username # Store username for flash message
     try:
-        # Cascade delete should handle related profile data
-        db.session.delete(user)
+        # Set-based deletes of the user's rows, rather than loading each one through the ORM cascade
+        delete_users([user.id])
         db.session.commit()
         flash(f"User '{username_deleted}' has been deleted.", 'success')
     except Exception as e:
@@ -132,3 +164,70 @@ def delete_user(user_id):
         current_app.logger.error(f"Error deleting user {user_id}: {e}")
         flash('Error deleting user.', 'danger')
     return redirect(url_for('admin.list_users'))
+
+
+@admin_bp.route('/users/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_users():
+    """Start a bulk action as a background job and return 202 with the job id.
+
+    JSON body: `action` (delete, promote, demote or export) and either `user_ids`
+    (a selection) or `q` with `"scope": "filter"` (every user whose name starts with q,
+    or all users if q is empty). The requesting admin is never included.
+    Poll /admin/jobs/<job_id> for progress.
+    """
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action not in BULK_ACTIONS:
+        return jsonify({'error': f"action must be one of {', '.join(BULK_ACTIONS)}."}), 400
+
+    user_ids = None
+    prefix = None
+    if data.get('scope') == 'filter':
+        prefix = (data.get('q') or '').strip()
+    else:
+        user_ids = data.get('user_ids')
+        if (not isinstance(user_ids, list) or not user_ids
+                or not all(isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids)):
+            return jsonify({'error': 'Select at least one user, or use "scope": "filter".'}), 400
+
+    try:
+        job = get_admin_job_queue().submit(current_user.id, f'admin_{action}', run_bulk_action,
+                                           action, current_user.id, user_ids, prefix)
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 429
+    return jsonify({'job_id': job.id, 'status': job.status,
+                    'status_url': url_for('admin.bulk_job_status', job_id=job.id)}), 202
+
+
+def _own_admin_job(job_id):
+    job = load_job(job_id) # Stored, so any worker process can answer
+    # Only the admin who started a job can see it; others get a 404
+    if job is None or job.user_id != current_user.id or job.queue != 'admin':
+        abort(404)
+    return job
+
+
+@admin_bp.route('/jobs/<job_id>')
+@login_required
+@admin_required
+def bulk_job_status(job_id):
+    job = _own_admin_job(job_id)
+    data = job.to_dict()
+    if data['status'] == 'succeeded' and job.kind == 'admin_export':
+        data['download_url'] = url_for('admin.bulk_export_download', job_id=job.id)
+    return jsonify(data)
+
+
+@admin_bp.route('/jobs/<job_id>/export.csv')
+@login_required
+@admin_required
+def bulk_export_download(job_id):
+    job = _own_admin_job(job_id)
+    if job.status != 'succeeded' or job.kind != 'admin_export':
+        abort(404)
+    path = export_path(job.result['export_id'])
+    if not os.path.exists(path):
+        abort(404)
+    return send_file(path, mimetype='text/csv', as_attachment=True, download_name='users.csv')
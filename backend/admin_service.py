@@ -0,0 +1,97 @@
+import base64
+import json
+
+from .models import db, User
+
+# ?sort= value -> column; every one is backed by an index ending in id (see models.User)
+USER_SORT_COLUMNS = {
+    'id': User.id,
+    'username': User.username,
+    'resume_generations': User.resume_generations,
+    'cover_letter_generations': User.cover_letter_generations,
+}
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return the list encoded by encode_cursor, or raise ValueError."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {e}') from e
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor.')
+    return values
+
+
+def _prefix_upper_bound(prefix):
+    # The smallest string greater than every string starting with prefix
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def username_prefix_filter(prefix):
+    """Case-insensitive "username starts with prefix" as a range on lower(username).
+
+    Written as a range rather than LIKE so it can use ix_user_username_lower on
+    any database (SQLite's case-insensitive LIKE can't use an ordinary index).
+    """
+    prefix = prefix.lower()
+    lowered = db.func.lower(User.username)
+    return db.and_(lowered >= prefix, lowered < _prefix_upper_bound(prefix))
+
+
+def list_users_page(sort='id', descending=False, prefix=None, cursor=None, limit=50):
+    """Return one page of users and the cursor of the next page (None on the last page).
+
+    Keyset pagination on (sort column, id): each page starts where the previous one
+    ended instead of skipping rows with OFFSET, so the cost of a page doesn't grow with
+    how far into the list it is. Raises ValueError for an unknown sort or bad cursor.
+    """
+    if sort not in USER_SORT_COLUMNS:
+        raise ValueError(f"Unknown sort '{sort}'.")
+    column = USER_SORT_COLUMNS[sort]
+    query = db.select(User)
+    if prefix:
+        query = query.where(username_prefix_filter(prefix))
+    if cursor:
+        after_value, after_id = decode_cursor(cursor)
+        key = db.tuple_(column, User.id)
+        query = query.where(key < (after_value, after_id) if descending else key > (after_value, after_id))
+    if descending:
+        query = query.order_by(column.desc(), User.id.desc())
+    else:
+        query = query.order_by(column.asc(), User.id.asc())
+
+    users = db.session.execute(query.limit(limit + 1)).scalars().all()
+    next_cursor = None
+    if len(users) > limit:
+        last = users[limit - 1]
+        next_cursor = encode_cursor([getattr(last, column.key), last.id])
+    return users[:limit], next_cursor
+
+
+def estimate_user_count():
+    """Approximate number of users without scanning the table.
+
+    PostgreSQL keeps a row estimate in its statistics. Elsewhere the highest id is
+    used: one index lookup, and an overestimate only by the number of deleted users.
+    """
+    bind = db.session.get_bind()
+    if bind.dialect.name == 'postgresql':
+        estimate = db.session.execute(db.text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'user'")).scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+    return db.session.execute(db.select(db.func.max(User.id))).scalar() or 0
+
+
+def count_matching_users(prefix, cap):
+    """Count users whose name starts with prefix, stopping at cap.
+
+    Returns (count, capped); counting stops early so a broad prefix costs at most cap index entries.
+    """
+    matching = db.select(User.id).where(username_prefix_filter(prefix)).limit(cap + 1).subquery()
+    count = db.session.execute(db.select(db.func.count()).select_from(matching)).scalar()
+    return min(count, cap), count > cap
@@ -29,7 +29,12 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
 
     # Initialize Flask extensions here
+    from .text_compression import init_text_compression
+    init_text_compression(app)
+    from .db_engine import engine_options, init_db_engine
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
     db.init_app(app)
+    init_db_engine(app, db)
     login_manager.init_app(app)
     # Pass the configured migration directory to Flask-Migrate
     migrate.init_app(app, db, directory=app.config['MIGRATION_DIR'])
@@ -40,6 +45,31 @@ def create_app(config_class=Config):
     except OSError:
         pass # Already exists
 
+    # One LLM client per worker process, shared by all requests and background jobs
+    from .llm_client import init_llm_client
+    init_llm_client(app)
+
+    # Background queues for generation jobs submitted in async mode, and for bulk admin actions
+    from .job_queue import init_admin_job_queue, init_job_queue
+    init_job_queue(app)
+    init_admin_job_queue(app)
+
+    # Site-wide totals for the admin dashboard, kept current as users are added and removed
+    from .site_stats import init_site_stats
+    init_site_stats(app)
+
+    # Writes generation counters, directly or in buffered batches
+    from .generation_counters import init_generation_counters
+    init_generation_counters(app)
+
+    # Cache of generated text keyed by prompt hash
+    from .generation_cache import init_generation_cache
+    init_generation_cache(app)
+
+    # Rendered profile sections per user, so generation can skip loading the profile
+    from .profile_cache import init_profile_cache
+    init_profile_cache(app)
+
     # Register blueprints here
     from .auth_routes import auth as auth_blueprint
     app.register_blueprint(auth_blueprint, url_prefix='/auth')
@@ -54,6 +84,9 @@ def create_app(config_class=Config):
     from .generation_api import generation_api as generation_api_blueprint
     app.register_blueprint(generation_api_blueprint) # Prefix is defined in the blueprint
 
+    from .history_api import history_api as history_api_blueprint
+    app.register_blueprint(history_api_blueprint) # Prefix is defined in the blueprint
+
     from .export_api import export_api as export_api_blueprint
     app.register_blueprint(export_api_blueprint) # Prefix is defined in the blueprint
 
@@ -92,6 +125,10 @@ def create_app(config_class=Config):
         print("Downloading NLTK 'wordnet' data...")
         nltk.download('wordnet', quiet=True)
 
+    # Load NLP resources now rather than in the first keyword request (shared by workers under gunicorn --preload)
+    from .keyword_engine import init_keyword_engine
+    init_keyword_engine(app)
+
     # --- CLI Commands ---
     @app.cli.command("make-admin")
     @click.argument("username")
@@ -107,4 +144,30 @@ def create_app(config_class=Config):
         else:
             print(f"User '{username}' not found.")
 
+    @app.cli.command("rebuild-stats")
+    def rebuild_stats():
+        """Recompute the admin dashboard totals from the user table."""
+        from .site_stats import rebuild_site_stats, load_dashboard_stats
+        rebuild_site_stats(db.session.connection())
+        db.session.commit()
+        stats = load_dashboard_stats(days=1)
+        print(f"Rebuilt site stats: {stats['user_count']} users, {stats['resume_generations']} resumes, "
+              f"{stats['cover_letter_generations']} cover letters.")
+
+    @app.cli.command("build-keyword-corpus")
+    @click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+    @click.option("--output", default=None, help="Table file to write (default: KEYWORD_DF_TABLE_PATH).")
+    @click.option("--min-df", default=2, show_default=True, help="Drop terms found in fewer job descriptions.")
+    def build_keyword_corpus(paths, output, min_df):
+        """Build the keyword TF-IDF table from job descriptions (.txt files, or .jsonl with one per line)."""
+        from .keyword_corpus import count_document_frequencies, iter_job_descriptions, write_document_frequency_table
+        from .keyword_engine import KeywordEngineUnavailable, keyword_table_path
+        output = output or keyword_table_path(app)
+        try:
+            documents, frequencies = count_document_frequencies(app.extensions['keyword_engine'], iter_job_descriptions(paths), min_df)
+        except KeywordEngineUnavailable as e:
+            raise click.ClickException(str(e))
+        terms = write_document_frequency_table(output, documents, frequencies)
+        print(f"Wrote {terms} terms from {documents} job descriptions to {output}. Restart the app to use it.")
+
     return app
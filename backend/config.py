@@ -17,11 +17,96 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(instance_path, 'resume_app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Engine tuning (see db_engine.py). The SQLite pragmas are applied to every new connection.
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL') # Readers and the writer don't block each other
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL') # Durable under WAL except on power loss
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)) # Milliseconds to wait for the write lock
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)) # Bytes
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -20000)) # Negative means KiB (about 20 MB) per connection
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5)) # Other databases only
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800)) # Seconds
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+    # LLM client (see llm_client.py). LLM_BACKEND='fake' runs generation offline for tests and load tests.
+    LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini')
+    GEMINI_MODEL_NAME = os.environ.get('GEMINI_MODEL_NAME', 'gemini-2.5-pro-preview-03-25')
+    GEMINI_TEMPERATURE = float(os.environ['GEMINI_TEMPERATURE']) if os.environ.get('GEMINI_TEMPERATURE') else None
+    GEMINI_TOP_P = float(os.environ['GEMINI_TOP_P']) if os.environ.get('GEMINI_TOP_P') else None
+    GEMINI_MAX_OUTPUT_TOKENS = int(os.environ['GEMINI_MAX_OUTPUT_TOKENS']) if os.environ.get('GEMINI_MAX_OUTPUT_TOKENS') else None
+    # Resilience policy around model calls (see llm_resilience.py)
+    LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 60)) # Seconds per attempt
+    LLM_DEADLINE = float(os.environ.get('LLM_DEADLINE', 120)) # Seconds for all attempts of one call
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 2))
+    LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', 0.5)) # Seconds, doubled per retry, with full jitter
+    LLM_BACKOFF_MAX = float(os.environ.get('LLM_BACKOFF_MAX', 8))
+    LLM_BREAKER_FAILURE_RATE = float(os.environ.get('LLM_BREAKER_FAILURE_RATE', 0.5)) # Opens at this failure rate...
+    LLM_BREAKER_MIN_CALLS = int(os.environ.get('LLM_BREAKER_MIN_CALLS', 10)) # ...once this many calls are in the window
+    LLM_BREAKER_WINDOW = int(os.environ.get('LLM_BREAKER_WINDOW', 20)) # Most recent calls considered
+    LLM_BREAKER_RESET_TIMEOUT = float(os.environ.get('LLM_BREAKER_RESET_TIMEOUT', 30)) # Seconds before a trial call
     OPENWEATHER_API_KEY = os.environ.get('OPENWEATHER_API_KEY')
     # Point MIGRATION_DIR to the 'db' directory in the project root
     MIGRATION_DIR = os.path.join(os.path.dirname(basedir), 'db')
 
+    # Background generation jobs (see job_queue.py)
+    GENERATION_WORKERS = int(os.environ.get('GENERATION_WORKERS', 4)) # Worker threads per process
+    GENERATION_MAX_PENDING_PER_USER = int(os.environ.get('GENERATION_MAX_PENDING_PER_USER', 5)) # Queued + running
+    GENERATION_MAX_RUNNING_PER_USER = int(os.environ.get('GENERATION_MAX_RUNNING_PER_USER', 2))
+    GENERATION_JOB_RESULT_TTL = int(os.environ.get('GENERATION_JOB_RESULT_TTL', 3600)) # Seconds to keep finished jobs
+    GENERATION_JOB_TIMEOUT = int(os.environ.get('GENERATION_JOB_TIMEOUT', 600)) # Seconds before an unfinished job counts as interrupted
+    GENERATION_BATCH_MAX_ITEMS = int(os.environ.get('GENERATION_BATCH_MAX_ITEMS', 30)) # Job descriptions per batch request
+    GENERATION_BATCH_CONCURRENCY = int(os.environ.get('GENERATION_BATCH_CONCURRENCY', 4)) # Parallel model calls per batch
+    GENERATION_STREAMING_ENABLED = os.environ.get('GENERATION_STREAMING_ENABLED', 'true').lower() != 'false'
+    # Seconds to buffer generation counter increments before writing them in one batch; 0 writes each one immediately
+    GENERATION_COUNTER_FLUSH_INTERVAL = float(os.environ.get('GENERATION_COUNTER_FLUSH_INTERVAL', 0))
+    GENERATION_COUNTER_MAX_PENDING = int(os.environ.get('GENERATION_COUNTER_MAX_PENDING', 500)) # Flush early at this many
+
+    # Prompt size limits in estimated tokens (see prompt_builder.py)
+    PROMPT_TOKEN_BUDGET = int(os.environ.get('PROMPT_TOKEN_BUDGET', 8000))
+    PROMPT_MAX_JOB_DESCRIPTION_TOKENS = int(os.environ.get('PROMPT_MAX_JOB_DESCRIPTION_TOKENS', 3000))
+    PROMPT_MAX_ITEM_DESCRIPTION_TOKENS = int(os.environ.get('PROMPT_MAX_ITEM_DESCRIPTION_TOKENS', 500)) # Per experience/project
+
+    # Generation result cache (see generation_cache.py)
+    GENERATION_CACHE_BACKEND = os.environ.get('GENERATION_CACHE_BACKEND', 'memory') # 'memory', 'sqlite' or 'none'
+    GENERATION_CACHE_PATH = os.environ.get('GENERATION_CACHE_PATH') # SQLite file, defaults to the instance folder
+    GENERATION_CACHE_MAX_ENTRIES = int(os.environ.get('GENERATION_CACHE_MAX_ENTRIES', 256))
+    GENERATION_CACHE_TTL = int(os.environ.get('GENERATION_CACHE_TTL', 3600)) # Seconds
+
+    # Pre-rendered profile sections used in prompts, invalidated by profile saves
+    PROFILE_FRAGMENT_CACHE_MAX_ENTRIES = int(os.environ.get('PROFILE_FRAGMENT_CACHE_MAX_ENTRIES', 1024)) # In-process, per worker
+    # Also persist renders on the user row so other workers and restarts can reuse them
+    PROFILE_FRAGMENT_DB_CACHE = os.environ.get('PROFILE_FRAGMENT_DB_CACHE', 'false').lower() in ('1', 'true', 'yes')
+
+    # Stored history of delivered generations (see generation_history.py)
+    GENERATION_HISTORY_ENABLED = os.environ.get('GENERATION_HISTORY_ENABLED', 'true').lower() != 'false'
+    GENERATION_HISTORY_PAGE_SIZE = int(os.environ.get('GENERATION_HISTORY_PAGE_SIZE', 20))
+    GENERATION_HISTORY_MAX_PAGE_SIZE = int(os.environ.get('GENERATION_HISTORY_MAX_PAGE_SIZE', 100))
+
+    # Keyword extraction (see keyword_engine.py)
+    KEYWORD_LANGUAGE = os.environ.get('KEYWORD_LANGUAGE', 'english')
+    KEYWORD_TOP_N = int(os.environ.get('KEYWORD_TOP_N', 15))
+    # Load NLTK corpora in create_app instead of on the first request; with gunicorn --preload they are loaded once for all workers
+    KEYWORD_ENGINE_WARMUP = os.environ.get('KEYWORD_ENGINE_WARMUP', 'true').lower() != 'false'
+    KEYWORD_LEMMA_CACHE_SIZE = int(os.environ.get('KEYWORD_LEMMA_CACHE_SIZE', 8192)) # Memoized token -> lemma pairs, 0 disables
+    KEYWORD_RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('KEYWORD_RESULT_CACHE_MAX_ENTRIES', 512)) # Results by description hash, 0 disables
+    KEYWORD_RESULT_CACHE_TTL = int(os.environ.get('KEYWORD_RESULT_CACHE_TTL', 86400)) # Seconds
+    # TF-IDF ranking table built by `flask build-keyword-corpus`, defaults to the instance folder; frequency ranking without one
+    KEYWORD_DF_TABLE_PATH = os.environ.get('KEYWORD_DF_TABLE_PATH')
+    KEYWORD_MAX_NGRAM = int(os.environ.get('KEYWORD_MAX_NGRAM', 3)) # Longest phrase considered
+    KEYWORD_MIN_PHRASE_DF = int(os.environ.get('KEYWORD_MIN_PHRASE_DF', 2)) # Corpus documents a phrase must appear in
+
+    # Codec for compressed text columns: 'zlib', or 'zstd' if the zstandard package is installed
+    TEXT_COMPRESSION_CODEC = os.environ.get('TEXT_COMPRESSION_CODEC', 'zlib')
+
+    # Admin user list (see admin_service.py)
+    ADMIN_USERS_PAGE_SIZE = int(os.environ.get('ADMIN_USERS_PAGE_SIZE', 50))
+    ADMIN_USERS_SEARCH_COUNT_CAP = int(os.environ.get('ADMIN_USERS_SEARCH_COUNT_CAP', 1000)) # Search counts above this show as "1000+"
+    ADMIN_DASHBOARD_DAYS = int(os.environ.get('ADMIN_DASHBOARD_DAYS', 30)) # Days shown in the dashboard's generation chart
+    ADMIN_BULK_CHUNK_SIZE = int(os.environ.get('ADMIN_BULK_CHUNK_SIZE', 500)) # Users per transaction in bulk admin jobs
+    # Bulk admin jobs run on their own queue, see job_queue.init_admin_job_queue
+    ADMIN_JOB_WORKERS = int(os.environ.get('ADMIN_JOB_WORKERS', 1)) # Worker threads per process
+    ADMIN_MAX_PENDING_JOBS = int(os.environ.get('ADMIN_MAX_PENDING_JOBS', 3)) # Queued + running, per admin
+    ADMIN_JOB_RESULT_TTL = int(os.environ.get('ADMIN_JOB_RESULT_TTL', 3600)) # Seconds to keep finished jobs and exports
+    ADMIN_JOB_TIMEOUT = int(os.environ.get('ADMIN_JOB_TIMEOUT', 600)) # Seconds without progress before a job counts as interrupted
 
     # Ensure the instance folder exists
     @staticmethod
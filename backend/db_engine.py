@@ -0,0 +1,57 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def is_sqlite(database_uri):
+    return make_url(database_uri).get_backend_name() == 'sqlite'
+
+
+def engine_options(config):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the configured database.
+
+    Options set explicitly in SQLALCHEMY_ENGINE_OPTIONS win. SQLite gets the driver's
+    lock wait matched to SQLITE_BUSY_TIMEOUT; other databases get pool sizing from
+    the DB_POOL_* settings.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        connect_args = dict(options.get('connect_args') or {})
+        connect_args.setdefault('timeout', config.get('SQLITE_BUSY_TIMEOUT', 5000) / 1000)
+        options['connect_args'] = connect_args
+    else:
+        options.setdefault('pool_size', config.get('DB_POOL_SIZE', 5))
+        options.setdefault('max_overflow', config.get('DB_MAX_OVERFLOW', 10))
+        options.setdefault('pool_recycle', config.get('DB_POOL_RECYCLE', 1800))
+        options.setdefault('pool_pre_ping', True) # Drop connections the server closed while idle
+    return options
+
+
+def sqlite_pragmas(config):
+    """The PRAGMA statements run on every new SQLite connection, in order."""
+    pragmas = [
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT', 5000)),
+        ('mmap_size', config.get('SQLITE_MMAP_SIZE', 268435456)),
+        ('cache_size', config.get('SQLITE_CACHE_SIZE', -20000)),
+    ]
+    return [(name, value) for name, value in pragmas if value is not None]
+
+
+def init_db_engine(app, db):
+    """Apply the SQLite pragmas to every connection the app's engine opens.
+
+    Must run after db.init_app(app). Does nothing for other databases.
+    """
+    if not is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+    statements = [f'PRAGMA {name}={value}' for name, value in sqlite_pragmas(app.config)]
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
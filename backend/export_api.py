@@ -3,12 +3,13 @@ import re # Import regex for cleaning
 import io
 import re
 from flask import Blueprint, request, jsonify, current_app, make_response
-from flask_login import login_required
+from flask_login import login_required, current_user
 # Import base libraries needed
 from docx import Document
 from fpdf import FPDF
 # Import template functions and common helpers
 from .export_templates import common, docx_templates, pdf_templates
+from .generation_history import get_generation
 
 export_api = Blueprint('export_api', __name__, url_prefix='/api')
 
@@ -20,6 +21,14 @@ def export_resume():
     export_format = data.get('format') # 'docx' or 'pdf'
     template_choice = data.get('template', 'simple') # Default to 'simple'
 
+    # Re-export a stored generation without sending (or regenerating) its text
+    generation_id = data.get('generation_id')
+    if not resume_text and generation_id is not None:
+        generation = get_generation(current_user.id, generation_id) if isinstance(generation_id, int) else None
+        if generation is None:
+            return jsonify({'error': 'Generation not found.'}), 404
+        resume_text = generation.output
+
     if not resume_text or not export_format:
         return jsonify({'error': 'Missing resume text or format.'}), 400
 
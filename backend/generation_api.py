@@ -1,16 +1,21 @@
-from flask import Blueprint, request, jsonify, current_app
+import json
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
-import google.generativeai as genai
-# Import NLTK stuff
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-from collections import Counter
-import string
-# Import get_profile function from profile_api and db
-from .profile_api import get_profile
+# Import the profile loader and db
+from .profile_service import load_profile
 from .app import db # Import db for saving counter
+from .keyword_engine import KeywordEngineUnavailable, get_keyword_engine
+from .job_queue import get_job_queue, JobQueueFull, load_job
+from .generation_counters import get_generation_counters
+from .generation_cache import get_generation_cache, make_cache_key
+from .generation_history import record_generation
+from .llm_client import get_llm_client
+from .llm_resilience import LLMUnavailable, LLMTimeout
+from .prompt_builder import PROMPT_VERSION, PromptBudget, build_resume_prompt, build_cover_letter_prompt
+from .profile_cache import RenderedProfile, get_profile_cache, load_stored_profile, store_profile
 
 generation_api = Blueprint('generation_api', __name__, url_prefix='/api')
 
@@ -21,111 +26,275 @@ def generate_resume():
     if not job_description:
         return jsonify({'error': 'Job description is required.'}), 400
 
-    # Fetch user profile data using the imported function
-    profile_data_response = get_profile()
-    # Check if the response indicates an error or is not JSON
-    if not isinstance(profile_data_response, tuple) or profile_data_response[1] != 200:
-         # Handle potential errors from get_profile if it were more complex
-         # For now, assume it returns JSON even on error, or handle specific status codes
-         try:
-             profile_data = profile_data_response.get_json()
-         except: # If it's not a Response object or doesn't have get_json
-             current_app.logger.error("Failed to get profile data for generation.")
-             return jsonify({'error': 'Could not retrieve profile data.'}), 500
-    else:
-         profile_data = profile_data_response[0].get_json() # get_profile returns (jsonify_obj, 200)
+    full_prompt, error_response = _prepare_resume_prompt(job_description)
+    if error_response:
+        return error_response
 
-    # Basic check if profile seems empty
-    if not profile_data.get('personal_info') and not profile_data.get('experiences'):
-         return jsonify({'error': 'Please complete your profile before generating a resume.'}), 400
-
-    # --- Construct Prompt for Gemini ---
-    # (Keep the prompt construction logic here)
-    prompt_parts = ["Generate a professional resume tailored for the following job description, using the candidate's details provided below."]
-    prompt_parts.append("\n--- JOB DESCRIPTION ---")
-    prompt_parts.append(job_description)
-    prompt_parts.append("\n--- CANDIDATE PROFILE ---")
-    pi = profile_data.get('personal_info', {})
-    prompt_parts.append("\n**Personal Information:**")
-    if pi.get('full_name'): prompt_parts.append(f"- Name: {pi['full_name']}")
-    # ... (rest of prompt construction as before) ...
-    if pi.get('phone_number'): prompt_parts.append(f"- Phone: {pi['phone_number']}")
-    if pi.get('email_address'): prompt_parts.append(f"- Email: {pi['email_address']}")
-    if pi.get('location'): prompt_parts.append(f"- Location: {pi['location']}")
-    if pi.get('linkedin_url'): prompt_parts.append(f"- LinkedIn: {pi['linkedin_url']}")
-    if pi.get('portfolio_url'): prompt_parts.append(f"- Portfolio: {pi['portfolio_url']}")
-    if pi.get('target_job'): prompt_parts.append(f"- Target Role/Summary Hint: {pi['target_job']}")
-
-    if profile_data.get('experiences'):
-            prompt_parts.append("\n**Work Experience:**")
-            for exp in profile_data['experiences']:
-                prompt_parts.append(f"- **{exp['job_title']}** at {exp['company_name']} ({exp.get('location', 'N/A')})")
-                prompt_parts.append(f"  {exp.get('start_date', '')} - {exp.get('end_date', '')}")
-                if exp.get('description'):
-                    # Perform replacement outside the f-string expression
-                    formatted_desc = exp['description'].replace('\n', '\n    - ')
-                    prompt_parts.append(f"  Responsibilities/Achievements:\n    - {formatted_desc}")
-
-    # Correct indentation for the following blocks
-    if profile_data.get('educations'):
-        prompt_parts.append("\n**Education:**")
-        for edu in profile_data['educations']:
-            prompt_parts.append(f"- **{edu['degree_name']}** in {edu.get('major', 'N/A')}")
-            prompt_parts.append(f"  {edu.get('institution_name', 'N/A')} ({edu.get('location', 'N/A')})")
-            if edu.get('graduation_date'): prompt_parts.append(f"  Graduated: {edu['graduation_date']}")
-
-    if profile_data.get('skills'):
-        prompt_parts.append("\n**Skills:**")
-        prompt_parts.append("- " + ", ".join([skill['skill_name'] for skill in profile_data['skills']]))
-
-    if profile_data.get('projects'):
-        prompt_parts.append("\n**Projects:**")
-        for proj in profile_data['projects']:
-            prompt_parts.append(f"- **{proj['project_name']}**")
-            if proj.get('description'): prompt_parts.append(f"  {proj['description']}")
-            if proj.get('link'): prompt_parts.append(f"  Link: {proj['link']}")
-
-    prompt_parts.append("\n--- OUTPUT FORMATTING INSTRUCTIONS ---")
-    prompt_parts.append("1.  Generate the resume content ONLY. Start directly with the candidate's name or summary. Do not include any introductory or concluding text outside the resume itself.")
-    prompt_parts.append("2.  Use Markdown-like formatting with specific markers:")
-    prompt_parts.append("    - Use `### Section Name` for main section headers (e.g., `### Experience`, `### Education`, `### Skills`).")
-    prompt_parts.append("    - Use `**Job Title**` or `**Degree Name**` for titles within sections.")
-    prompt_parts.append("    - Use `* Bullet point description` for list items under experience or projects.")
-    prompt_parts.append("    - For skills, list them comma-separated or as simple list items after the `### Skills` header.")
-    prompt_parts.append("3.  **VERY IMPORTANT: You MUST include ALL sections and ALL details provided in the 'CANDIDATE PROFILE' section above in your generated resume output.** Do not omit any provided information (Personal Information, Experience, Education, Skills, Projects).")
-    prompt_parts.append("4.  Ensure standard resume sections (Summary/Objective, Experience, Education, Skills, Projects) are present and populated with the provided data.")
-    prompt_parts.append("5.  Focus on highlighting experiences and skills relevant to the job description, but still include all provided profile information.")
-    prompt_parts.append("6.  Double-check that all profile sections (Personal Info, Experience, Education, Skills, Projects) are present in the final output if they were provided in the input profile.")
-
-
-    full_prompt = "\n".join(prompt_parts)
+    force_regenerate = bool(request.json.get('force_regenerate'))
+    if request.json.get('async'):
+        return _submit_job('resume', full_prompt, 'resume_generations', 'resume_text', force_regenerate)
 
     # --- Call Gemini API ---
-    api_key = current_app.config.get('GEMINI_API_KEY')
-    if not api_key:
+    try:
+        generated = _generate_text(full_prompt, force_regenerate)
+    except Exception as e:
+        current_app.logger.error(f"Gemini API error: {e}")
+        message, status = _generation_error(e)
+        return jsonify({'error': message}), status
+
+    # Increment counter on success
+    _increment_counter(current_user.id, 'resume_generations')
+    _record_generation(current_user.id, 'resume', full_prompt, generated)
+
+    return jsonify({'resume_text': generated.text}), 200
+
+
+@generation_api.route('/generate/stream', methods=['POST'])
+@login_required
+def generate_resume_stream():
+    """Stream the generated resume as Server-Sent Events.
+
+    Emits `chunk` events carrying `{"text": ...}` as the model produces output,
+    then a single `done` event, or an `error` event if generation fails. The
+    counter is incremented and the result cached only once the stream completes.
+    When streaming is disabled this behaves exactly like /api/generate.
+    """
+    if not current_app.config.get('GENERATION_STREAMING_ENABLED', True):
+        return generate_resume()
+
+    job_description = request.json.get('job_description')
+    if not job_description:
+        return jsonify({'error': 'Job description is required.'}), 400
+
+    full_prompt, error_response = _prepare_resume_prompt(job_description)
+    if error_response:
+        return error_response
+
+    force_regenerate = bool(request.json.get('force_regenerate'))
+    user_id = current_user.id
+
+    client = get_llm_client()
+
+    def event_stream():
+        started = time.monotonic()
+        cache = get_generation_cache()
+        key = make_cache_key(full_prompt, client.model_name, PROMPT_VERSION)
+        cached = None if force_regenerate else _cache_get(cache, key)
+        if cached is not None:
+            parts = [cached]
+            yield _sse_event('chunk', {'text': cached})
+        else:
+            parts = []
+            try:
+                for text in client.stream(full_prompt):
+                    parts.append(text)
+                    yield _sse_event('chunk', {'text': text})
+            except Exception as e:
+                current_app.logger.error(f"Gemini API error (stream): {e}")
+                # Nothing to fall back to if output was already sent, or if the
+                # breaker/deadline says the service itself is unhealthy
+                if parts or isinstance(e, (LLMUnavailable, LLMTimeout)):
+                    yield _sse_event('error', {'error': _generation_error(e)[0]})
+                    return
+                # Streaming failed before any output, degrade to a single buffered call
+                try:
+                    text = client.generate(full_prompt)
+                except Exception as e:
+                    current_app.logger.error(f"Gemini API error: {e}")
+                    yield _sse_event('error', {'error': _generation_error(e)[0]})
+                    return
+                parts = [text]
+                yield _sse_event('chunk', {'text': text})
+            _cache_set(cache, key, ''.join(parts))
+
+        _increment_counter(user_id, 'resume_generations')
+        record_generation(user_id, 'resume', key, client.model_name, full_prompt, ''.join(parts),
+                          (time.monotonic() - started) * 1000, cached=cached is not None)
+        yield _sse_event('done', {})
+
+    return Response(stream_with_context(event_stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}) # Disable nginx buffering
+
+
+def _generation_error(e):
+    """Map a failed model call to a user-facing message and HTTP status.
+
+    Provider error details are only logged, not shown to the user.
+    """
+    if isinstance(e, LLMUnavailable):
+        return 'The AI service is temporarily unavailable. Please try again in a minute.', 503
+    if isinstance(e, LLMTimeout):
+        return 'The AI service took too long to respond. Please try again.', 504
+    return 'An error occurred during AI generation. Please try again.', 500
+
+
+def _in_app_context(func):
+    """Wrap func to run inside the current app's context, for use on executor threads."""
+    app = current_app._get_current_object()
+    def wrapper(*args, **kwargs):
+        with app.app_context():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _load_rendered_profile(budget):
+    """Return the current user's RenderedProfile, loading and rendering the profile only on a miss.
+
+    Renders are looked up in the in-process cache, then (if PROFILE_FRAGMENT_DB_CACHE
+    is on) on the user row, and are valid for as long as the user's profile_version is
+    unchanged. Returns (rendered, None) on success or (None, error_response) on failure.
+    """
+    user_id = current_user.id
+    version = current_user.profile_version
+    item_tokens = budget.item_description_tokens
+    cache = get_profile_cache()
+    rendered = cache.get(user_id, version, item_tokens)
+    if rendered is not None:
+        return rendered, None
+
+    use_db = current_app.config.get('PROFILE_FRAGMENT_DB_CACHE', False)
+    rendered = load_stored_profile(current_user, item_tokens) if use_db else None
+    if rendered is None:
+        try:
+            profile = load_profile(user_id)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Failed to get profile data for generation: {e}")
+            return None, (jsonify({'error': 'Could not retrieve profile data.'}), 500)
+        rendered = RenderedProfile.from_profile_data(profile.to_dict(), budget)
+        if use_db:
+            store_profile(user_id, version, item_tokens, rendered)
+    cache.set(user_id, version, item_tokens, rendered)
+    return rendered, None
+
+
+def _prompt_budget():
+    return PromptBudget.from_config(current_app.config)
+
+
+def _check_llm_configured():
+    """Return an error response if no model backend is available, else None."""
+    if not get_llm_client().is_configured:
         current_app.logger.error("GEMINI_API_KEY not configured.")
         return jsonify({'error': 'API key not configured.'}), 500
+    return None
+
 
+def _prepare_resume_prompt(job_description):
+    """Load the current user's profile and build the resume prompt.
+
+    Returns (prompt, None) on success or (None, error_response) if generation can't proceed.
+    """
+    budget = _prompt_budget()
+    rendered, error_response = _load_rendered_profile(budget)
+    if error_response:
+        return None, error_response
+
+    # Basic check if profile seems empty
+    if not rendered.has_profile:
+         return None, (jsonify({'error': 'Please complete your profile before generating a resume.'}), 400)
+
+    error_response = _check_llm_configured()
+    if error_response:
+        return None, error_response
+
+    # --- Construct Prompt for Gemini ---
+    return build_resume_prompt(None, job_description, budget, fragments=rendered.fragments), None
+
+
+# The output of _generate_text plus what the generation history records about it
+GeneratedText = namedtuple('GeneratedText', ['text', 'input_hash', 'model_name', 'latency_ms', 'cached'])
+
+
+def _generate_text(prompt, force_regenerate=False):
+    """Return a GeneratedText for a prompt, serving identical prompts from the cache.
+
+    With force_regenerate the cached entry is ignored, and replaced by the new output.
+    """
+    started = time.monotonic()
+    client = get_llm_client()
+    cache = get_generation_cache()
+    key = make_cache_key(prompt, client.model_name, PROMPT_VERSION)
+    generated_text = None if force_regenerate else _cache_get(cache, key)
+    cached = generated_text is not None
+    if not cached:
+        generated_text = client.generate(prompt)
+        _cache_set(cache, key, generated_text)
+    return GeneratedText(generated_text, key, client.model_name, (time.monotonic() - started) * 1000, cached)
+
+
+def _cache_get(cache, key):
+    """Look up a generation in the cache. The cache is best-effort: errors are logged and count as a miss."""
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-pro-preview-03-25')
-        response = model.generate_content(full_prompt)
-        generated_text = response.text
+        return cache.get(key)
     except Exception as e:
-        current_app.logger.error(f"Gemini API error: {e}")
-        return jsonify({'error': f'An error occurred during AI generation: {e}'}), 500
+        current_app.logger.error(f"Generation cache read failed: {e}")
+        return None
 
-    # Increment counter on success
+
+def _cache_set(cache, key, value):
+    """Store a generation in the cache. Errors are logged, never raised, so a paid model call is still delivered."""
+    try:
+        cache.set(key, value)
+    except Exception as e:
+        current_app.logger.error(f"Generation cache write failed: {e}")
+
+
+def _record_generation(user_id, kind, prompt, generated):
+    """Add a delivered GeneratedText to the user's history. Failures are logged, never raised.
+
+    Called from the request (or job) thread rather than the executor threads of
+    bundle and batch requests, so history writes stay on one connection per request.
+    """
+    record_generation(user_id, kind, generated.input_hash, generated.model_name, prompt,
+                      generated.text, generated.latency_ms, cached=generated.cached)
+
+
+def _increment_counter(user_id, *counter_fields, by=1):
+    """Increment the given generation counters of a user atomically. Failures are logged, never raised."""
     try:
-        current_user.resume_generations = (current_user.resume_generations or 0) + 1
-        db.session.add(current_user)
-        db.session.commit()
+        get_generation_counters().increment(user_id, counter_fields, by)
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error incrementing resume counter for user {current_user.id}: {e}")
+        current_app.logger.error(f"Error incrementing {', '.join(counter_fields)} for user {user_id}: {e}")
         # Don't fail the request if counter fails, just log it
 
-    return jsonify({'resume_text': generated_text}), 200
+
+def _run_generation_job(user_id, kind, prompt, counter_field, result_key, force_regenerate=False):
+    """Body of a background generation job; runs in a worker's app context."""
+    try:
+        generated = _generate_text(prompt, force_regenerate)
+    except Exception as e:
+        current_app.logger.error(f"Gemini API error (job): {e}")
+        # The job's error is shown to the user, so replace provider details with the friendly message
+        raise RuntimeError(_generation_error(e)[0]) from e
+    _increment_counter(user_id, counter_field)
+    _record_generation(user_id, kind, prompt, generated)
+    return {result_key: generated.text}
+
+
+def _submit_job(kind, prompt, counter_field, result_key, force_regenerate=False):
+    """Queue a generation for the current user and return 202 with the job id."""
+    try:
+        job = get_job_queue().submit(current_user.id, kind, _run_generation_job,
+                                     current_user.id, kind, prompt, counter_field, result_key, force_regenerate)
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 429
+    return jsonify({'job_id': job.id, 'status': job.status}), 202
+
+
+@generation_api.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    job = load_job(job_id) # Stored, so the poll can land on any worker process
+    # Jobs belonging to other users are reported as missing
+    if job is None or job.user_id != current_user.id:
+        return jsonify({'error': 'Job not found.'}), 404
+    return jsonify(job.to_dict()), 200
 
 
 @generation_api.route('/extract_keywords', methods=['POST'])
@@ -138,21 +307,12 @@ def extract_keywords():
         return jsonify({'error': 'Missing job description.'}), 400
 
     try:
-        # --- Basic Keyword Extraction using NLTK ---
-        tokens = word_tokenize(job_description.lower())
-        stop_words = set(stopwords.words('english'))
-        punctuation = set(string.punctuation)
-        filtered_tokens = [
-            word for word in tokens
-            if word.isalpha() and word not in stop_words and word not in punctuation and len(word) > 2
-        ]
-        lemmatizer = WordNetLemmatizer()
-        lemmatized_tokens = [lemmatizer.lemmatize(token) for token in filtered_tokens]
-        word_counts = Counter(lemmatized_tokens)
-        top_keywords = [word for word, count in word_counts.most_common(15)]
-
+        top_keywords = get_keyword_engine().extract(job_description)
         return jsonify({'keywords': top_keywords}), 200
 
+    except KeywordEngineUnavailable as e:
+        current_app.logger.error(f"Keyword extraction unavailable: {e}")
+        return jsonify({'error': 'Keyword extraction is temporarily unavailable.'}), 503
     except Exception as e:
         current_app.logger.error(f"Error extracting keywords: {e}")
         # Return error status code here
@@ -172,78 +332,166 @@ def generate_cover_letter():
         return jsonify({'error': 'Job description and company name are required.'}), 400
 
     # Fetch user profile data
-    profile_data_response = get_profile()
-    if not isinstance(profile_data_response, tuple) or profile_data_response[1] != 200:
-         try:
-             profile_data = profile_data_response.get_json()
-         except:
-             current_app.logger.error("Failed to get profile data for cover letter.")
-             return jsonify({'error': 'Could not retrieve profile data.'}), 500
-    else:
-         profile_data = profile_data_response[0].get_json()
+    budget = _prompt_budget()
+    rendered, error_response = _load_rendered_profile(budget)
+    if error_response:
+        return error_response
 
     # Check if profile seems empty (at least name needed)
-    if not profile_data.get('personal_info') or not profile_data.get('personal_info').get('full_name'):
+    if not rendered.full_name:
          return jsonify({'error': 'Please complete your profile (at least name) before generating a cover letter.'}), 400
 
+    error_response = _check_llm_configured()
+    if error_response:
+        return error_response
+
     # --- Construct Prompt for Gemini ---
-    prompt_parts = [
-        f"Generate a professional cover letter for a position based on the provided job description at {company_name}.",
-        "The letter should be tailored using the candidate's profile details below.",
-        "Address it appropriately (e.g., 'Dear Hiring Manager,' or use the provided name)." if not hiring_manager else f"Address it to {hiring_manager}.",
-        "Structure it with an introduction, body paragraphs highlighting relevant skills/experience from the profile that match the job description, and a conclusion expressing enthusiasm and call to action.",
-        "Maintain a professional and enthusiastic tone."
-    ]
-    if additional_notes:
-        prompt_parts.append(f"Incorporate the following points if relevant: {additional_notes}")
-
-    prompt_parts.append("\n--- JOB DESCRIPTION ---")
-    prompt_parts.append(job_description)
-    prompt_parts.append("\n--- CANDIDATE PROFILE ---")
-    # Include relevant profile parts (similar to resume prompt)
-    pi = profile_data.get('personal_info', {})
-    prompt_parts.append(f"\nName: {pi.get('full_name', 'N/A')}")
-    # Include key skills and maybe brief summary of experience types if available
-    if profile_data.get('skills'):
-        skills_str = ", ".join([skill['skill_name'] for skill in profile_data['skills']])
-        prompt_parts.append(f"Key Skills: {skills_str}")
-    if profile_data.get('experiences'):
-         exp_titles = ", ".join(list(set([exp['job_title'] for exp in profile_data['experiences']])))
-         prompt_parts.append(f"Relevant Experience Areas: {exp_titles}")
-    # Add more profile details as needed for better context, e.g., education summary
-    if profile_data.get('educations'):
-        degrees = ", ".join(list(set([edu['degree_name'] for edu in profile_data['educations']])))
-        prompt_parts.append(f"Education Background: {degrees}")
-
-
-    prompt_parts.append("\n--- INSTRUCTIONS ---")
-    prompt_parts.append("Generate only the cover letter text, starting with the salutation (e.g., 'Dear ...'). Do not include any introductory or concluding remarks outside the letter itself.")
-
-    full_prompt = "\n".join(prompt_parts)
+    full_prompt = build_cover_letter_prompt(None, job_description, company_name, hiring_manager,
+                                            additional_notes, budget, fragments=rendered.fragments)
 
-    # --- Call Gemini API ---
-    api_key = current_app.config.get('GEMINI_API_KEY')
-    if not api_key:
-        current_app.logger.error("GEMINI_API_KEY not configured.")
-        return jsonify({'error': 'API key not configured.'}), 500
+    force_regenerate = bool(data.get('force_regenerate'))
+    if data.get('async'):
+        return _submit_job('cover_letter', full_prompt, 'cover_letter_generations', 'cover_letter_text', force_regenerate)
 
+    # --- Call Gemini API ---
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-pro-preview-03-25') # Use same model for consistency
-        response = model.generate_content(full_prompt)
-        generated_text = response.text
+        generated = _generate_text(full_prompt, force_regenerate)
     except Exception as e:
         current_app.logger.error(f"Gemini API error (Cover Letter): {e}")
-        return jsonify({'error': f'An error occurred during AI generation: {e}'}), 500
+        message, status = _generation_error(e)
+        return jsonify({'error': message}), status
 
     # Increment counter on success
+    _increment_counter(current_user.id, 'cover_letter_generations')
+    _record_generation(current_user.id, 'cover_letter', full_prompt, generated)
+
+    return jsonify({'cover_letter_text': generated.text}), 200
+
+
+@generation_api.route('/generate_bundle', methods=['POST'])
+@login_required
+def generate_bundle():
+    """Generate a resume and a cover letter for the same job in one request.
+
+    The profile is loaded once and both prompts are sent to the model
+    concurrently, so the wall-clock time is that of the slower of the two.
+    Both counters are incremented together, and only if both generations succeed.
+    """
+    data = request.json
+    job_description = data.get('job_description')
+    company_name = data.get('company_name')
+    if not job_description or not company_name:
+        return jsonify({'error': 'Job description and company name are required.'}), 400
+
+    budget = _prompt_budget()
+    rendered, error_response = _load_rendered_profile(budget)
+    if error_response:
+        return error_response
+    if not rendered.full_name:
+         return jsonify({'error': 'Please complete your profile (at least name) before generating a resume and cover letter.'}), 400
+
+    error_response = _check_llm_configured()
+    if error_response:
+        return error_response
+
+    # result key -> (generation kind, prompt)
+    prompts = {
+        'resume_text': ('resume', build_resume_prompt(None, job_description, budget, fragments=rendered.fragments)),
+        'cover_letter_text': ('cover_letter', build_cover_letter_prompt(None, job_description, company_name,
+                                                                        data.get('hiring_manager'), data.get('additional_notes'),
+                                                                        budget, fragments=rendered.fragments)),
+    }
+    force_regenerate = bool(data.get('force_regenerate'))
+    user_id = current_user.id
+
+    generate = _in_app_context(_generate_text)
     try:
-        current_user.cover_letter_generations = (current_user.cover_letter_generations or 0) + 1
-        db.session.add(current_user)
-        db.session.commit()
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            futures = {key: executor.submit(generate, prompt, force_regenerate) for key, (kind, prompt) in prompts.items()}
+            results = {key: future.result() for key, future in futures.items()}
     except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Error incrementing cover letter counter for user {current_user.id}: {e}")
-        # Don't fail the request if counter fails, just log it
+        current_app.logger.error(f"Gemini API error (Bundle): {e}")
+        message, status = _generation_error(e)
+        return jsonify({'error': message}), status
+
+    _increment_counter(user_id, 'resume_generations', 'cover_letter_generations')
+    for key, (kind, prompt) in prompts.items():
+        _record_generation(user_id, kind, prompt, results[key])
+
+    return jsonify({key: generated.text for key, generated in results.items()}), 200
+
+
+@generation_api.route('/generate_batch', methods=['POST'])
+@login_required
+def generate_batch():
+    """Generate one resume per job description, streaming results as NDJSON.
+
+    The profile is loaded once and the model calls are fanned out over at most
+    GENERATION_BATCH_CONCURRENCY threads. Each line is emitted as soon as its
+    item finishes: `{"index": i, "resume_text": ...}` or `{"index": i, "error": ...}`,
+    followed by a final `{"done": true, "succeeded": n, "failed": m}` line.
+    A failed item does not affect the others.
+    """
+    data = request.json
+    job_descriptions = data.get('job_descriptions')
+    max_items = current_app.config.get('GENERATION_BATCH_MAX_ITEMS', 30)
+    if not isinstance(job_descriptions, list) or not job_descriptions:
+        return jsonify({'error': 'A non-empty list of job descriptions is required.'}), 400
+    if len(job_descriptions) > max_items:
+        return jsonify({'error': f'At most {max_items} job descriptions can be generated at once.'}), 400
+
+    budget = _prompt_budget()
+    rendered, error_response = _load_rendered_profile(budget)
+    if error_response:
+        return error_response
+    if not rendered.has_profile:
+         return jsonify({'error': 'Please complete your profile before generating a resume.'}), 400
 
-    return jsonify({'cover_letter_text': generated_text}), 200
+    error_response = _check_llm_configured()
+    if error_response:
+        return error_response
+
+    force_regenerate = bool(data.get('force_regenerate'))
+    concurrency = min(current_app.config.get('GENERATION_BATCH_CONCURRENCY', 4), len(job_descriptions))
+    generate = _in_app_context(_generate_text)
+    user_id = current_user.id
+
+    def result_stream():
+        succeeded = failed = 0
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = {}
+            for index, job_description in enumerate(job_descriptions):
+                if not isinstance(job_description, str) or not job_description.strip():
+                    failed += 1
+                    yield _ndjson_line({'index': index, 'error': 'Job description is required.'})
+                    continue
+                prompt = build_resume_prompt(None, job_description, budget, fragments=rendered.fragments)
+                futures[executor.submit(generate, prompt, force_regenerate)] = (index, prompt)
+
+            for future in as_completed(futures):
+                index, prompt = futures[future]
+                try:
+                    generated = future.result()
+                    line = {'index': index, 'resume_text': generated.text}
+                    succeeded += 1
+                    _record_generation(user_id, 'resume', prompt, generated)
+                except Exception as e:
+                    current_app.logger.error(f"Gemini API error (Batch item {index}): {e}")
+                    line = {'index': index, 'error': _generation_error(e)[0]}
+                    failed += 1
+                yield _ndjson_line(line)
+
+            yield _ndjson_line({'done': True, 'succeeded': succeeded, 'failed': failed})
+        finally:
+            # Also runs if the client disconnects: drop queued items and count what finished
+            executor.shutdown(wait=False, cancel_futures=True)
+            if succeeded:
+                _increment_counter(user_id, 'resume_generations', by=succeeded)
+
+    return Response(stream_with_context(result_stream()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'}) # Disable nginx buffering
+
+
+def _ndjson_line(data):
+    return json.dumps(data) + "\n"
@@ -0,0 +1,211 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+def make_cache_key(prompt, model_name, prompt_version):
+    """Stable content hash of everything that determines a generation's output."""
+    digest = hashlib.sha256()
+    for part in (model_name, str(prompt_version), prompt):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0') # Separator so ('ab', 'c') and ('a', 'bc') hash differently
+    return digest.hexdigest()
+
+
+class CacheStats:
+    """Hit/miss/eviction counters shared by every cache backend."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_evictions(self, count):
+        if count:
+            with self._lock:
+                self.evictions += count
+
+    def as_dict(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+class NullCache:
+    """Backend used when caching is disabled. Every lookup is a miss."""
+    backend = 'none'
+
+    def __init__(self):
+        self._stats = CacheStats()
+
+    def get(self, key):
+        self._stats.record(hit=False)
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return dict(self._stats.as_dict(), backend=self.backend, size=0)
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL."""
+    backend = 'memory'
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # key -> (expires_at, value), least recently used first
+        self._stats = CacheStats()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self._stats.record(hit=entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self._stats.record_evictions(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return dict(self._stats.as_dict(), backend=self.backend, size=size)
+
+
+class SQLiteCache:
+    """Disk-backed cache in a standalone SQLite file, shared by all worker processes.
+
+    Entries are evicted least-recently-used once the table grows past max_entries,
+    and expired entries are treated as misses and removed on the next write.
+    """
+    backend = 'sqlite'
+
+    def __init__(self, path, max_entries=5000, ttl=86400, busy_timeout=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.busy_timeout = busy_timeout # Milliseconds to wait for another process's write lock
+        self._local = threading.local() # sqlite3 connections can't be shared across threads
+        self._stats = CacheStats()
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use.
+
+        Connections are opened lazily and per process, so workers forked from a
+        --preload master never share the master's connection.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout / 1000)
+            conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout)}')
+            conn.execute('PRAGMA journal_mode = WAL') # Readers in other workers don't block the writer
+            with conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS generation_cache ('
+                    ' key TEXT PRIMARY KEY, value TEXT NOT NULL,'
+                    ' expires_at REAL NOT NULL, last_used REAL NOT NULL)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS ix_generation_cache_last_used ON generation_cache (last_used)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute('SELECT value, expires_at FROM generation_cache WHERE key = ?', (key,)).fetchone()
+        if row is not None and row[1] < now:
+            row = None
+        if row is not None:
+            with conn:
+                conn.execute('UPDATE generation_cache SET last_used = ? WHERE key = ?', (now, key))
+        self._stats.record(hit=row is not None)
+        return row[0] if row is not None else None
+
+    def set(self, key, value):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO generation_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)',
+                (key, value, now + self.ttl, now),
+            )
+            evicted = conn.execute('DELETE FROM generation_cache WHERE expires_at < ?', (now,)).rowcount
+            evicted += conn.execute(
+                'DELETE FROM generation_cache WHERE key IN ('
+                ' SELECT key FROM generation_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            ).rowcount
+        self._stats.record_evictions(evicted)
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM generation_cache')
+
+    def stats(self):
+        size = self._connect().execute('SELECT COUNT(*) FROM generation_cache').fetchone()[0]
+        return dict(self._stats.as_dict(), backend=self.backend, size=size)
+
+
+def init_generation_cache(app):
+    """Create the generation cache backend selected by GENERATION_CACHE_BACKEND."""
+    backend = app.config.get('GENERATION_CACHE_BACKEND', 'memory')
+    max_entries = app.config.get('GENERATION_CACHE_MAX_ENTRIES', 256)
+    ttl = app.config.get('GENERATION_CACHE_TTL', 3600)
+    if backend == 'memory':
+        cache = MemoryCache(max_entries=max_entries, ttl=ttl)
+    elif backend == 'sqlite':
+        path = app.config.get('GENERATION_CACHE_PATH') or os.path.join(app.instance_path, 'generation_cache.db')
+        cache = SQLiteCache(path, max_entries=max_entries, ttl=ttl,
+                            busy_timeout=app.config.get('SQLITE_BUSY_TIMEOUT', 5000))
+    elif backend == 'none':
+        cache = NullCache()
+    else:
+        raise ValueError(f"Unknown GENERATION_CACHE_BACKEND '{backend}'")
+    app.extensions['generation_cache'] = cache
+    return cache
+
+
+def get_generation_cache():
+    return current_app.extensions['generation_cache']
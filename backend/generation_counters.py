@@ -0,0 +1,179 @@
+import atexit
+import threading
+from collections import Counter
+
+from flask import current_app
+
+from .models import db, User
+from .site_stats import mark_active_today, record_generations
+
+COUNTER_FIELDS = ('resume_generations', 'cover_letter_generations')
+
+
+def apply_increments(increments):
+    """Add {user_id: {field: amount}} to the users' counters with one atomic UPDATE per user.
+
+    The addition happens in SQL (SET x = x + n), so concurrent increments from other
+    threads or worker processes can't overwrite each other. The same transaction adds
+    the batch to the site totals and today's generation bucket (see site_stats.py).
+    The caller commits.
+    """
+    applied = Counter()
+    new_active_users = 0
+    connection = db.session.connection()
+    for user_id, counts in increments.items():
+        values = {}
+        for field, amount in counts.items():
+            if field not in COUNTER_FIELDS:
+                raise ValueError(f"Unknown generation counter '{field}'")
+            column = getattr(User, field)
+            values[column] = column + amount
+        if not values:
+            continue
+        result = db.session.execute(db.update(User).where(User.id == user_id).values(values))
+        if result.rowcount: # Users deleted in the meantime aren't counted
+            applied.update(counts)
+            new_active_users += mark_active_today(connection, user_id)
+    if applied:
+        record_generations(connection, applied, new_active_users)
+
+
+class DirectCounters:
+    """Writes every increment immediately, in its own transaction."""
+    mode = 'direct'
+
+    def increment(self, user_id, fields, by=1):
+        apply_increments({user_id: {field: by for field in fields}})
+        db.session.commit()
+
+    def flush(self):
+        return 0
+
+    def shutdown(self):
+        pass
+
+    def stats(self):
+        return {'mode': self.mode}
+
+
+class BufferedCounters:
+    """Coalesces increments in memory and writes them in batches.
+
+    Pending increments are flushed by a background thread every `flush_interval`
+    seconds, sooner once `max_pending` increments are waiting, and at interpreter
+    exit. Each flush is one transaction of atomic SQL increments, so totals stay
+    exact across worker processes. Increments still pending when a process is
+    killed without a clean exit are lost.
+    """
+    mode = 'buffered'
+
+    def __init__(self, app, flush_interval=5, max_pending=500):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = {} # user_id -> Counter of field -> amount
+        self._pending_count = 0
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopping = False
+        self.flushes = 0
+        self.flushed_increments = 0
+        self.failed_flushes = 0
+        atexit.register(self.shutdown)
+
+    def increment(self, user_id, fields, by=1):
+        with self._lock:
+            counts = self._pending.setdefault(user_id, Counter())
+            for field in fields:
+                counts[field] += by
+            self._pending_count += 1
+            self._ensure_thread()
+            if self._pending_count >= self.max_pending:
+                self._wake.set()
+
+    def flush(self):
+        """Write all pending increments now. Returns the number of increments written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            count, self._pending_count = self._pending_count, 0
+        if not pending:
+            return 0
+        with self.app.app_context():
+            try:
+                apply_increments(pending)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error(f"Error flushing generation counters for {len(pending)} users: {e}")
+                self._requeue(pending, count)
+                with self._lock:
+                    self.failed_flushes += 1
+                return 0
+            finally:
+                db.session.remove()
+        with self._lock:
+            self.flushes += 1
+            self.flushed_increments += count
+        return count
+
+    def shutdown(self):
+        """Stop the flush thread and write whatever is still pending."""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'pending_users': len(self._pending),
+                'pending_increments': self._pending_count,
+                'flushes': self.flushes,
+                'flushed_increments': self.flushed_increments,
+                'failed_flushes': self.failed_flushes,
+            }
+
+    # Callers must hold self._lock
+    def _ensure_thread(self):
+        # Started on first use, like the job queue workers
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name='generation-counter-flusher', daemon=True)
+            self._thread.start()
+
+    def _requeue(self, pending, count):
+        # Put a failed batch back so the next flush retries it
+        with self._lock:
+            for user_id, counts in pending.items():
+                self._pending.setdefault(user_id, Counter()).update(counts)
+            self._pending_count += count
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                stopping = self._stopping
+            if stopping:
+                return # shutdown() does the final flush
+            self.flush()
+
+
+def init_generation_counters(app):
+    """Attach the counter writer selected by GENERATION_COUNTER_FLUSH_INTERVAL (0 = write immediately)."""
+    interval = app.config.get('GENERATION_COUNTER_FLUSH_INTERVAL', 0)
+    if interval and interval > 0:
+        counters = BufferedCounters(app, flush_interval=interval,
+                                    max_pending=app.config.get('GENERATION_COUNTER_MAX_PENDING', 500))
+    else:
+        counters = DirectCounters()
+    app.extensions['generation_counters'] = counters
+    return counters
+
+
+def get_generation_counters():
+    return current_app.extensions['generation_counters']
@@ -0,0 +1,79 @@
+from flask import current_app
+
+from .models import db, Generation
+from .prompt_builder import estimate_tokens
+
+GENERATION_KINDS = ('resume', 'cover_letter')
+
+
+def record_generation(user_id, kind, input_hash, model_name, prompt, output, latency_ms, cached=False):
+    """Store a generation delivered to a user and return its id.
+
+    Failures are logged and rolled back, never raised: losing a history entry
+    must not fail a generation the user has already received.
+    """
+    if not current_app.config.get('GENERATION_HISTORY_ENABLED', True):
+        return None
+    try:
+        generation = Generation(
+            user_id=user_id,
+            kind=kind,
+            input_hash=input_hash,
+            model_name=model_name,
+            latency_ms=int(latency_ms),
+            prompt_tokens=estimate_tokens(prompt),
+            output_tokens=estimate_tokens(output),
+            cached=cached,
+            output=output,
+        )
+        db.session.add(generation)
+        db.session.commit()
+        return generation.id
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error recording {kind} generation for user {user_id}: {e}")
+        return None
+
+
+def generation_to_dict(generation, include_output=False):
+    data = {
+        'id': generation.id,
+        'kind': generation.kind,
+        'created_at': generation.created_at.isoformat() + 'Z',
+        'input_hash': generation.input_hash,
+        'model_name': generation.model_name,
+        'latency_ms': generation.latency_ms,
+        'prompt_tokens': generation.prompt_tokens,
+        'output_tokens': generation.output_tokens,
+        'cached': generation.cached,
+    }
+    if include_output:
+        data['text'] = generation.output
+    return data
+
+
+def list_generations(user_id, limit, before_id=None, kind=None):
+    """Return one page of a user's generations, newest first, and the cursor for the next page.
+
+    Keyset pagination: the page is the `limit` rows with an id below before_id, read
+    straight off the (user_id, id) index, so every page costs the same however deep
+    the user has scrolled. next_before_id is None on the last page.
+    """
+    query = db.select(Generation).where(Generation.user_id == user_id)
+    if before_id is not None:
+        query = query.where(Generation.id < before_id)
+    if kind is not None:
+        query = query.where(Generation.kind == kind)
+    # One extra row tells us whether another page exists without a count query
+    rows = db.session.execute(query.order_by(Generation.id.desc()).limit(limit + 1)).scalars().all()
+    next_before_id = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_before_id
+
+
+def get_generation(user_id, generation_id):
+    """Return one of the user's generations with its output loaded, or None."""
+    return db.session.execute(
+        db.select(Generation)
+        .where(Generation.id == generation_id, Generation.user_id == user_id)
+        .options(db.undefer(Generation.output))
+    ).scalar_one_or_none()
@@ -0,0 +1,44 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+
+from .generation_history import GENERATION_KINDS, list_generations, get_generation, generation_to_dict
+
+history_api = Blueprint('history_api', __name__, url_prefix='/api')
+
+
+@history_api.route('/generations', methods=['GET'])
+@login_required
+def get_generations():
+    """List the current user's generations, newest first, without their text.
+
+    Query parameters: `limit` (page size), `before_id` (the `next_before_id` of the
+    previous page) and an optional `kind` ('resume' or 'cover_letter').
+    """
+    page_size = current_app.config.get('GENERATION_HISTORY_PAGE_SIZE', 20)
+    max_page_size = current_app.config.get('GENERATION_HISTORY_MAX_PAGE_SIZE', 100)
+    # type=int gives None for values that aren't integers
+    limit = request.args.get('limit', type=int) if 'limit' in request.args else page_size
+    before_id = request.args.get('before_id', type=int)
+    kind = request.args.get('kind')
+    if limit is None or not 1 <= limit <= max_page_size:
+        return jsonify({'error': f'limit must be an integer between 1 and {max_page_size}.'}), 400
+    if 'before_id' in request.args and before_id is None:
+        return jsonify({'error': 'before_id must be an integer.'}), 400
+    if kind is not None and kind not in GENERATION_KINDS:
+        return jsonify({'error': f"kind must be one of {', '.join(GENERATION_KINDS)}."}), 400
+
+    generations, next_before_id = list_generations(current_user.id, limit, before_id, kind)
+    return jsonify({
+        'generations': [generation_to_dict(generation) for generation in generations],
+        'next_before_id': next_before_id,
+    }), 200
+
+
+@history_api.route('/generations/<int:generation_id>', methods=['GET'])
+@login_required
+def get_generation_detail(generation_id):
+    generation = get_generation(current_user.id, generation_id)
+    # Generations belonging to other users are reported as missing
+    if generation is None:
+        return jsonify({'error': 'Generation not found.'}), 404
+    return jsonify(generation_to_dict(generation, include_output=True)), 200
@@ -0,0 +1,298 @@
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from .models import BackgroundJob, db
+
+
+# The Job being run by the current worker thread, see current_job()
+_worker_state = threading.local()
+# Serializes this process's writes to the background_job table. SQLite takes one writer at
+# a time anyway, and it keeps them from interleaving on a connection shared between threads
+# (as an in-memory database is).
+_store_lock = threading.Lock()
+
+
+class JobQueueFull(Exception):
+    """Raised when a user already has the maximum number of pending jobs."""
+    pass
+
+
+class Job:
+    """A single unit of background work and its outcome."""
+    __slots__ = ('id', 'user_id', 'kind', 'func', 'args', 'kwargs', 'status', 'result', 'error',
+                 'progress', 'timeout', 'created_at', 'started_at', 'finished_at', '_done')
+
+    def __init__(self, user_id, kind, func, args, kwargs, timeout=600):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.status = 'queued' # queued -> running -> succeeded / failed
+        self.result = None
+        self.error = None
+        self.progress = None # {'done': n, 'total': m} for jobs that report it
+        self.timeout = timeout # Seconds until the stored job is reported as interrupted
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job has finished. Returns True if it did within the timeout."""
+        return self._done.wait(timeout)
+
+    def set_progress(self, done, total):
+        """Report progress, on the stored job too. Call from the job itself; each call commits.
+
+        Progress also pushes the job's timeout back, so long jobs that keep
+        reporting aren't mistaken for interrupted ones.
+        """
+        self.progress = {'done': done, 'total': total}
+        _update_stored_job(self.id, progress_done=done, progress_total=total,
+                           timeout_at=_utcnow() + timedelta(seconds=self.timeout))
+
+    def to_dict(self):
+        data = {'job_id': self.id, 'kind': self.kind, 'status': self.status}
+        if self.progress is not None:
+            data['progress'] = self.progress
+        if self.status == 'succeeded':
+            data['result'] = self.result
+        elif self.status == 'failed':
+            data['error'] = self.error
+        return data
+
+
+class GenerationJobQueue:
+    """In-process queue running background jobs on a fixed pool of worker threads.
+
+    Pending jobs are kept in one FIFO per user and handed out round-robin across
+    users, so a burst from one user only delays that user's own jobs. Workers run
+    each job inside an application context so jobs can use the config and the db.
+
+    Each job's status, progress and result are also stored in the background_job
+    table, so a status poll can be answered by any worker process (see load_job),
+    and the pending limit counts a user's jobs across all of them. A job whose
+    process exits before it finishes is reported as failed once its timeout passes.
+    """
+
+    def __init__(self, app, name='generation', workers=4, max_pending_per_user=5, max_running_per_user=2,
+                 result_ttl=3600, job_timeout=600):
+        self.app = app
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_pending_per_user = max_pending_per_user
+        self.max_running_per_user = max(1, max_running_per_user)
+        self.result_ttl = result_ttl
+        self.job_timeout = job_timeout
+
+        self._cond = threading.Condition()
+        self._pending = {} # user_id -> deque of queued jobs
+        self._running = {} # user_id -> number of jobs currently running
+        self._last_served = {} # user_id -> value of _serve_counter when they last got a worker
+        self._serve_counter = 0
+        self._jobs = {} # job_id -> Job (queued, running and finished)
+        self._threads = []
+        self._stopping = False
+
+    # --- Public API ---
+    def submit(self, user_id, kind, func, *args, **kwargs):
+        """Queue `func(*args, **kwargs)` for `user_id` and return the new Job."""
+        job = Job(user_id, kind, func, args, kwargs, timeout=self.job_timeout)
+        # In a context of its own, so storing the job never commits the caller's session
+        with self.app.app_context(), _store_lock:
+            self._prune_stored_jobs()
+            if self._stored_pending_count(user_id) >= self.max_pending_per_user:
+                db.session.commit() # Keep the pruning
+                raise JobQueueFull(f'Too many pending jobs (limit {self.max_pending_per_user}).')
+            db.session.add(BackgroundJob(id=job.id, queue=self.name, user_id=user_id, kind=kind, status=job.status,
+                                         timeout_at=_utcnow() + timedelta(seconds=self.job_timeout)))
+            db.session.commit()
+
+        with self._cond:
+            self._prune_finished()
+            self._jobs[job.id] = job
+            self._pending.setdefault(user_id, deque()).append(job)
+            self._ensure_workers()
+            self._cond.notify()
+            return job
+
+    def get(self, job_id):
+        """The Job object of a job submitted to this process; see load_job for any process's jobs."""
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait=True):
+        """Stop the workers once they finish their current job."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    # --- Scheduling ---
+    def _ensure_workers(self):
+        # Workers are started lazily so app instances that never queue a job
+        # (CLI commands, most tests) don't spawn threads.
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker_loop, name=f'{self.name}-worker-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self):
+        """Pop the next job, preferring users with the fewest running jobs.
+
+        Ties go to the user who was served least recently, which gives round-robin
+        order between users while each user's own jobs stay FIFO.
+        """
+        best_user = None
+        best_key = None
+        for user_id in self._pending:
+            running = self._running.get(user_id, 0)
+            if running >= self.max_running_per_user:
+                continue
+            key = (running, self._last_served.get(user_id, 0))
+            if best_key is None or key < best_key:
+                best_user, best_key = user_id, key
+        if best_user is None:
+            return None
+
+        queued = self._pending[best_user]
+        job = queued.popleft()
+        if not queued:
+            del self._pending[best_user]
+        self._running[best_user] = self._running.get(best_user, 0) + 1
+        self._serve_counter += 1
+        self._last_served[best_user] = self._serve_counter
+        return job
+
+    def _stored_pending_count(self, user_id):
+        """Queued and running jobs of the user in every process, not counting interrupted ones."""
+        return db.session.execute(
+            db.select(db.func.count(BackgroundJob.id)).where(
+                BackgroundJob.user_id == user_id, BackgroundJob.queue == self.name,
+                BackgroundJob.status.in_(('queued', 'running')), BackgroundJob.timeout_at >= _utcnow())
+        ).scalar()
+
+    def _prune_stored_jobs(self):
+        cutoff = _utcnow() - timedelta(seconds=self.result_ttl)
+        db.session.execute(db.delete(BackgroundJob).where(
+            BackgroundJob.queue == self.name,
+            db.or_(BackgroundJob.finished_at < cutoff, BackgroundJob.timeout_at < cutoff)))
+
+    def _prune_finished(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._stopping:
+                    self._cond.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+                job.status = 'running'
+                job.started_at = time.time()
+
+            try:
+                _worker_state.job = job
+                with self.app.app_context():
+                    try:
+                        _update_stored_job(job.id, status='running', started_at=_utcnow())
+                        job.result = job.func(*job.args, **job.kwargs)
+                        job.status = 'succeeded'
+                    except Exception as e:
+                        db.session.rollback()
+                        self.app.logger.error(f"Background job {job.id} ({job.kind}) failed: {e}")
+                        job.error = str(e)
+                        job.status = 'failed'
+                    try:
+                        _update_stored_job(job.id, status=job.status, result=job.result, error=job.error,
+                                           finished_at=_utcnow())
+                    except Exception as e:
+                        db.session.rollback()
+                        self.app.logger.error(f"Could not store the outcome of background job {job.id}: {e}")
+            finally:
+                _worker_state.job = None
+                with self._cond:
+                    job.finished_at = time.time()
+                    job.func = job.args = job.kwargs = None # Release references held by the closure
+                    self._running[job.user_id] -= 1
+                    if not self._running[job.user_id]:
+                        del self._running[job.user_id]
+                    # A slot freed up for this user, wake a worker that may have skipped them
+                    self._cond.notify()
+                job._done.set()
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None) # Stored naive, in UTC, like the models' timestamps
+
+
+def _update_stored_job(job_id, **values):
+    with _store_lock:
+        db.session.execute(db.update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values))
+        db.session.commit()
+
+
+def load_job(job_id):
+    """The stored BackgroundJob with this id, whichever worker process queued it, or None."""
+    return db.session.get(BackgroundJob, job_id)
+
+
+def current_job():
+    """The Job running on this worker thread, or None outside a job (e.g. when called directly)."""
+    return getattr(_worker_state, 'job', None)
+
+
+def init_job_queue(app):
+    """Attach a GenerationJobQueue configured from app.config to the app."""
+    queue = GenerationJobQueue(
+        app,
+        workers=app.config.get('GENERATION_WORKERS', 4),
+        max_pending_per_user=app.config.get('GENERATION_MAX_PENDING_PER_USER', 5),
+        max_running_per_user=app.config.get('GENERATION_MAX_RUNNING_PER_USER', 2),
+        result_ttl=app.config.get('GENERATION_JOB_RESULT_TTL', 3600),
+        job_timeout=app.config.get('GENERATION_JOB_TIMEOUT', 600),
+    )
+    app.extensions['generation_jobs'] = queue
+    return queue
+
+
+def get_job_queue():
+    return current_app.extensions['generation_jobs']
+
+
+def init_admin_job_queue(app):
+    """Attach the queue for bulk admin jobs to the app.
+
+    Separate from the generation queue, so long bulk actions never hold generation
+    workers or count against the users' generation limits.
+    """
+    queue = GenerationJobQueue(
+        app,
+        name='admin',
+        workers=app.config.get('ADMIN_JOB_WORKERS', 1),
+        max_pending_per_user=app.config.get('ADMIN_MAX_PENDING_JOBS', 3),
+        max_running_per_user=1,
+        result_ttl=app.config.get('ADMIN_JOB_RESULT_TTL', 3600),
+        job_timeout=app.config.get('ADMIN_JOB_TIMEOUT', 600),
+    )
+    app.extensions['admin_jobs'] = queue
+    return queue
+
+
+def get_admin_job_queue():
+    return current_app.extensions['admin_jobs']
@@ -0,0 +1,153 @@
+import array
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from collections import Counter
+
+# File layout, all little-endian: header, then every term hash sorted ascending (uint64),
+# then the document frequency of each hash in the same order (uint32)
+MAGIC = b'RGKWDF01'
+HEADER = struct.Struct('<8sQQ') # magic, documents in the corpus, terms in the table
+CORPUS_SUFFIXES = ('.txt', '.jsonl')
+
+
+def term_hash(term):
+    """64-bit hash a term is stored under. Collisions are negligible at a few million terms."""
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class DocumentFrequencyTable:
+    """Read-only, memory-mapped table of how many corpus documents contain each term.
+
+    Lookups binary-search the sorted hash array in place, so opening the table reads
+    nothing up front and every worker process shares the same page cache. Raises
+    ValueError for a file that isn't a table.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mmap) < HEADER.size:
+                raise ValueError(f'{path} is too short to be a document frequency table.')
+            magic, self.document_count, self.term_count = HEADER.unpack_from(self._mmap)
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not a document frequency table.')
+            hashes_end = HEADER.size + 8 * self.term_count
+            if len(self._mmap) != hashes_end + 4 * self.term_count:
+                raise ValueError(f'{path} is truncated.')
+            view = memoryview(self._mmap)
+            if sys.byteorder == 'little':
+                self._hashes = view[HEADER.size:hashes_end].cast('Q')
+                self._counts = view[hashes_end:].cast('I')
+            else:
+                # Big-endian hosts can't read the arrays in place; copy and swap them once
+                self._hashes, self._counts = array.array('Q'), array.array('I')
+                self._hashes.frombytes(view[HEADER.size:hashes_end])
+                self._counts.frombytes(view[hashes_end:])
+                self._hashes.byteswap()
+                self._counts.byteswap()
+                view.release()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def document_frequency(self, term):
+        """Number of corpus documents containing term (0 if it was never seen or was pruned)."""
+        key = term_hash(term)
+        index = bisect.bisect_left(self._hashes, key)
+        if index < self.term_count and self._hashes[index] == key:
+            return self._counts[index]
+        return 0
+
+    def close(self):
+        for values in (self._hashes, self._counts):
+            if isinstance(values, memoryview):
+                values.release()
+        self._mmap.close()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'documents': self.document_count,
+            'terms': self.term_count,
+            'size_bytes': len(self._mmap),
+        }
+
+
+def write_document_frequency_table(path, document_count, frequencies):
+    """Write {term: document frequency} as a table file, replacing any existing one atomically.
+
+    Workers that already mapped the old file keep reading it until they restart.
+    """
+    by_hash = {}
+    for term, count in frequencies.items():
+        key = term_hash(term)
+        by_hash[key] = max(count, by_hash.get(key, 0))
+    keys = sorted(by_hash)
+    hashes = array.array('Q', keys)
+    counts = array.array('I', (min(by_hash[key], 0xFFFFFFFF) for key in keys))
+    if sys.byteorder != 'little':
+        hashes.byteswap()
+        counts.byteswap()
+
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, document_count, len(keys)))
+        f.write(hashes.tobytes())
+        f.write(counts.tobytes())
+    os.replace(temp_path, path)
+    return len(keys)
+
+
+def _corpus_files(path):
+    if not os.path.isdir(path):
+        yield path
+        return
+    for directory, subdirectories, names in os.walk(path):
+        subdirectories.sort()
+        for name in sorted(names):
+            if name.endswith(CORPUS_SUFFIXES):
+                yield os.path.join(directory, name)
+
+
+def iter_job_descriptions(paths):
+    """Yield the job descriptions in the given files and directories.
+
+    A .jsonl file holds one description per line, either a JSON string or an object
+    with a "job_description" field; any other file is a single description.
+    Directories are searched recursively for .txt and .jsonl files.
+    """
+    for path in paths:
+        for file_path in _corpus_files(path):
+            with open(file_path, encoding='utf-8') as f:
+                if not file_path.endswith('.jsonl'):
+                    text = f.read()
+                    if text.strip():
+                        yield text
+                    continue
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    text = record.get('job_description') if isinstance(record, dict) else record
+                    if isinstance(text, str) and text.strip():
+                        yield text
+
+
+def count_document_frequencies(engine, documents, min_df=2):
+    """Return (documents counted, {term: document frequency}) for terms in at least min_df documents.
+
+    Terms are the engine's own unigrams and phrases, so the table matches what it scores.
+    """
+    frequencies = Counter()
+    document_count = 0
+    for text in documents:
+        frequencies.update(engine.document_terms(text).keys())
+        document_count += 1
+    return document_count, {term: count for term, count in frequencies.items() if count >= min_df}
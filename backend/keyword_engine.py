@@ -0,0 +1,269 @@
+import functools
+import hashlib
+import math
+import os
+import string
+import threading
+import time
+from collections import Counter, namedtuple
+
+from flask import current_app
+
+from .generation_cache import MemoryCache, NullCache
+from .keyword_corpus import DocumentFrequencyTable
+
+# Everything extraction needs from NLTK, loaded once per process
+NlpResources = namedtuple('NlpResources', ['stop_words', 'punctuation', 'tokenize', 'lemmatize'])
+
+
+class KeywordEngineUnavailable(RuntimeError):
+    """Raised when the NLTK data keyword extraction needs can't be loaded."""
+    pass
+
+
+def load_nltk_resources(language='english'):
+    """Load stopwords, the tokenizer and the lemmatizer, forcing NLTK's lazy corpus loads.
+
+    Returns (resources, {resource: seconds}). WordNet and punkt are only read from disk
+    on first use, so each is exercised once here rather than in the first request.
+    """
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tokenize import word_tokenize
+
+    timings = {}
+    start = time.perf_counter()
+    stop_words = frozenset(stopwords.words(language))
+    timings['stopwords'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lemmatizer = WordNetLemmatizer()
+    lemmatizer.lemmatize('warming')
+    timings['wordnet'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    word_tokenize('Warm up the tokenizer.', language=language)
+    timings['punkt'] = time.perf_counter() - start
+
+    def tokenize(text):
+        return word_tokenize(text, language=language)
+
+    resources = NlpResources(stop_words, frozenset(string.punctuation), tokenize, lemmatizer.lemmatize)
+    return resources, timings
+
+
+def make_document_key(text, top_n):
+    """Hash of a job description as extraction sees it: case and runs of whitespace don't matter."""
+    digest = hashlib.sha256(f'{top_n}\0'.encode('utf-8'))
+    digest.update(' '.join(text.lower().split()).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class KeywordEngine:
+    """Keyword extraction over NLP resources shared by every request in the process.
+
+    Resources are loaded by warm_up(), normally from create_app. Under gunicorn's
+    --preload the app is created in the master before workers fork, so the loaded
+    corpora are shared copy-on-write instead of loaded again by every worker. If
+    warm-up was skipped or failed it is retried by the first extraction.
+
+    Lemmas are memoized in a bounded LRU shared by all requests, since job
+    descriptions reuse the same few thousand words. Whole results can also be
+    cached by document hash (result_cache), so re-analyzing a description is free.
+
+    With a document frequency table (see keyword_corpus.py) words and phrases are
+    ranked by TF-IDF, so terms every job description uses sink below the ones that
+    set this one apart. Without one they are ranked by raw frequency.
+    """
+
+    def __init__(self, language='english', top_n=15, loader=load_nltk_resources, lemma_cache_size=8192, result_cache=None,
+                 df_table=None, max_ngram=3, min_phrase_df=2):
+        self.language = language
+        self.top_n = top_n
+        self.lemma_cache_size = lemma_cache_size
+        self.result_cache = result_cache if result_cache is not None else NullCache()
+        self.df_table = df_table
+        self.max_ngram = max_ngram
+        self.min_phrase_df = min_phrase_df
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._resources = None
+        self._lemmatize = None
+        self._warmup_seconds = None
+        self._resource_seconds = {}
+        self._warmup_error = None
+        self._extractions = 0
+
+    def warm_up(self):
+        """Load the NLP resources if they aren't loaded yet. Raises KeywordEngineUnavailable on failure."""
+        if self._resources is not None:
+            return self._resources
+        with self._lock:
+            if self._resources is None:
+                start = time.perf_counter()
+                try:
+                    resources, timings = self._loader(self.language)
+                except LookupError as e:
+                    self._warmup_error = str(e).strip()
+                    raise KeywordEngineUnavailable(f'NLTK data for keyword extraction is missing: {self._warmup_error}') from e
+                self._warmup_seconds = time.perf_counter() - start
+                self._resource_seconds = timings
+                self._warmup_error = None
+                if self.lemma_cache_size:
+                    self._lemmatize = functools.lru_cache(maxsize=self.lemma_cache_size)(resources.lemmatize)
+                else:
+                    self._lemmatize = resources.lemmatize
+                self._resources = resources
+        return self._resources
+
+    def extract(self, text, top_n=None):
+        """Return the most frequent lemmatized content words of text, most frequent first."""
+        top_n = top_n or self.top_n
+        key = make_document_key(text, top_n)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        if self.df_table is None:
+            keywords = self._rank_by_frequency(text, top_n)
+        else:
+            keywords = self._rank_by_tfidf(text, top_n)
+        with self._lock:
+            self._extractions += 1
+        self.result_cache.set(key, tuple(keywords))
+        return keywords
+
+    @staticmethod
+    def _is_content_word(resources, word):
+        return word.isalpha() and word not in resources.stop_words and word not in resources.punctuation and len(word) > 2
+
+    def _rank_by_frequency(self, text, top_n):
+        resources = self.warm_up()
+        token_counts = Counter(word for word in resources.tokenize(text.lower()) if self._is_content_word(resources, word))
+        # Lemmatize each distinct token once; first occurrences keep their order, so ties rank as before
+        word_counts = Counter()
+        for token, count in token_counts.items():
+            word_counts[self._lemmatize(token)] += count
+        return [word for word, count in word_counts.most_common(top_n)]
+
+    def document_terms(self, text):
+        """Count the lemmatized words of text and its phrases of up to max_ngram adjacent words.
+
+        Stopwords, punctuation and short words end a phrase, so "python and flask"
+        yields no phrase while "machine learning engineer" yields three.
+        """
+        resources = self.warm_up()
+        terms = Counter()
+        run = []
+        for word in resources.tokenize(text.lower()):
+            if not self._is_content_word(resources, word):
+                run = []
+                continue
+            run.append(self._lemmatize(word))
+            terms[run[-1]] += 1
+            for n in range(2, min(self.max_ngram, len(run)) + 1):
+                terms[' '.join(run[-n:])] += 1
+        return terms
+
+    def _rank_by_tfidf(self, text, top_n):
+        terms = self.document_terms(text)
+        documents = self.df_table.document_count
+        frequencies = {}
+        scored = []
+        for term, count in terms.items():
+            df = frequencies[term] = self.df_table.document_frequency(term)
+            if ' ' in term and df < self.min_phrase_df:
+                # Word sequences only count as phrases if they recur, in the corpus or in this description.
+                # One the corpus hasn't seen scores like its most common word (always counted before it),
+                # so repeating generic words doesn't make a distinctive phrase.
+                if count < 2:
+                    continue
+                df = max(frequencies[word] for word in term.split(' '))
+            # Sublinear term frequency: a word used ten times isn't ten times as relevant
+            score = (1 + math.log(count)) * (math.log((1 + documents) / (1 + df)) + 1)
+            scored.append((term, score, term.count(' ')))
+        # Highest score first and longer phrases first on ties; the sort is stable, so other ties keep first-occurrence order
+        scored.sort(key=lambda item: (item[1], item[2]), reverse=True)
+
+        keywords = []
+        for term, score, spaces in scored:
+            # Skip words that only ever appeared inside a phrase already chosen
+            if any(f' {term} ' in f' {phrase} ' and terms[term] <= terms[phrase] for phrase in keywords):
+                continue
+            keywords.append(term)
+            if len(keywords) == top_n:
+                break
+        return keywords
+
+    def _lemma_cache_stats(self):
+        info = self._lemmatize.cache_info() if hasattr(self._lemmatize, 'cache_info') else None
+        if info is None:
+            return {'hits': 0, 'misses': 0, 'hit_ratio': 0.0, 'size': 0, 'max_entries': self.lemma_cache_size}
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_ratio': (info.hits / lookups) if lookups else 0.0,
+            'size': info.currsize,
+            'max_entries': info.maxsize,
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ready': self._resources is not None,
+                'warmup_seconds': self._warmup_seconds,
+                'resource_seconds': dict(self._resource_seconds),
+                'warmup_error': self._warmup_error,
+                'extractions': self._extractions,
+                'lemma_cache': self._lemma_cache_stats(),
+                'result_cache': self.result_cache.stats(),
+                'ranking': 'frequency' if self.df_table is None else 'tfidf',
+                'df_table': self.df_table.stats() if self.df_table is not None else None,
+            }
+
+
+def keyword_table_path(app):
+    return app.config.get('KEYWORD_DF_TABLE_PATH') or os.path.join(app.instance_path, 'keyword_df.bin')
+
+
+def load_df_table(app):
+    """Open the document frequency table if one has been built, else return None (frequency ranking)."""
+    path = keyword_table_path(app)
+    if not os.path.exists(path):
+        return None
+    try:
+        return DocumentFrequencyTable(path)
+    except (OSError, ValueError) as e:
+        app.logger.warning(f"Ignoring keyword document frequency table {path}: {e}")
+        return None
+
+
+def init_keyword_engine(app):
+    result_cache_size = app.config.get('KEYWORD_RESULT_CACHE_MAX_ENTRIES', 512)
+    if result_cache_size:
+        result_cache = MemoryCache(max_entries=result_cache_size, ttl=app.config.get('KEYWORD_RESULT_CACHE_TTL', 86400))
+    else:
+        result_cache = NullCache()
+    engine = KeywordEngine(
+        language=app.config.get('KEYWORD_LANGUAGE', 'english'),
+        top_n=app.config.get('KEYWORD_TOP_N', 15),
+        lemma_cache_size=app.config.get('KEYWORD_LEMMA_CACHE_SIZE', 8192),
+        result_cache=result_cache,
+        df_table=load_df_table(app),
+        max_ngram=app.config.get('KEYWORD_MAX_NGRAM', 3),
+        min_phrase_df=app.config.get('KEYWORD_MIN_PHRASE_DF', 2),
+    )
+    app.extensions['keyword_engine'] = engine
+    if app.config.get('KEYWORD_ENGINE_WARMUP', True):
+        try:
+            engine.warm_up()
+            app.logger.info(f"Keyword engine warmed up in {engine.stats()['warmup_seconds']:.2f}s")
+        except KeywordEngineUnavailable as e:
+            # Don't stop the app from starting; extraction retries the load and reports the error
+            app.logger.warning(f"Keyword engine warm-up failed: {e}")
+    return engine
+
+
+def get_keyword_engine():
+    return current_app.extensions['keyword_engine']
@@ -0,0 +1,169 @@
+import re
+import threading
+import time
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from flask import current_app
+
+from .llm_resilience import ResilientLLMClient, CircuitBreaker
+
+
+class LLMNotConfigured(Exception):
+    """Raised when a generation is attempted without a usable backend (e.g. no API key)."""
+    pass
+
+
+class GeminiClient:
+    """Process-wide wrapper around a configured Gemini GenerativeModel.
+
+    Created once per worker in create_app. The GenerativeModel opens its gRPC
+    channel on the first call and reuses it for every later request, so
+    connections stay warm. The underlying client is safe to share between threads.
+    """
+    backend = 'gemini'
+    # Transient provider errors worth retrying: rate limits, 5xx and timeouts
+    retryable_errors = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.InternalServerError,
+        google_exceptions.BadGateway,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.GatewayTimeout, # Includes DeadlineExceeded
+        TimeoutError,
+        ConnectionError,
+    )
+    timeout_errors = (google_exceptions.GatewayTimeout, TimeoutError)
+
+    def __init__(self, api_key, model_name, generation_config=None):
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+        self._model = None
+        if api_key:
+            genai.configure(api_key=api_key)
+            self._model = genai.GenerativeModel(model_name, generation_config=self.generation_config or None)
+
+    @property
+    def is_configured(self):
+        return self._model is not None
+
+    def _get_model(self):
+        if self._model is None:
+            raise LLMNotConfigured('GEMINI_API_KEY not configured.')
+        return self._model
+
+    def generate(self, prompt, timeout=None):
+        """Return the full generated text for a prompt."""
+        response = self._get_model().generate_content(prompt, request_options=self._request_options(timeout))
+        return response.text
+
+    def stream(self, prompt, timeout=None):
+        """Yield generated text chunks as the model produces them."""
+        response = self._get_model().generate_content(prompt, stream=True, request_options=self._request_options(timeout))
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    @staticmethod
+    def _request_options(timeout):
+        return {'timeout': timeout} if timeout else None
+
+
+class FakeLLMClient:
+    """Offline stand-in for GeminiClient with the same interface.
+
+    Returns `response_text` (or a canned resume-like reply) after an optional
+    simulated `latency`, and records every prompt in `calls`. Set `error` to make
+    every call raise, or `stream_error` to make only streaming raise. A latency
+    longer than the call's timeout raises TimeoutError.
+    """
+    backend = 'fake'
+    is_configured = True
+    retryable_errors = (TimeoutError, ConnectionError)
+    timeout_errors = (TimeoutError,)
+
+    def __init__(self, model_name='fake-model', generation_config=None, response_text=None, latency=0.0):
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+        self.response_text = response_text
+        self.latency = latency
+        self.error = None
+        self.stream_error = None
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self.response_text = None
+        self.error = None
+        self.stream_error = None
+        with self._lock:
+            self.calls = []
+
+    def _respond(self, prompt, timeout):
+        with self._lock:
+            self.calls.append(prompt)
+        if self.latency:
+            if timeout and self.latency > timeout:
+                time.sleep(timeout)
+                raise TimeoutError(f'Fake model exceeded the {timeout}s timeout.')
+            time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        if self.response_text is not None:
+            return self.response_text
+        return f"### Summary\nGenerated by {self.model_name} from a {len(prompt)} character prompt."
+
+    def generate(self, prompt, timeout=None):
+        return self._respond(prompt, timeout)
+
+    def stream(self, prompt, timeout=None):
+        if self.stream_error:
+            raise self.stream_error
+        # Emit one word (with its trailing whitespace) per chunk, like a token stream
+        for word in re.findall(r'\S+\s*', self._respond(prompt, timeout)):
+            yield word
+
+
+def init_llm_client(app):
+    """Create the LLM client selected by LLM_BACKEND and attach it to the app.
+
+    The backend client is wrapped in a ResilientLLMClient configured from the
+    LLM_* timeout, retry and circuit breaker settings.
+    """
+    backend = app.config.get('LLM_BACKEND', 'gemini')
+    model_name = app.config.get('GEMINI_MODEL_NAME')
+    generation_config = {
+        key: value for key, value in {
+            'temperature': app.config.get('GEMINI_TEMPERATURE'),
+            'top_p': app.config.get('GEMINI_TOP_P'),
+            'max_output_tokens': app.config.get('GEMINI_MAX_OUTPUT_TOKENS'),
+        }.items() if value is not None
+    }
+    if backend == 'gemini':
+        client = GeminiClient(app.config.get('GEMINI_API_KEY'), model_name, generation_config)
+    elif backend == 'fake':
+        client = FakeLLMClient(model_name, generation_config)
+    else:
+        raise ValueError(f"Unknown LLM_BACKEND '{backend}'")
+
+    breaker = CircuitBreaker(
+        failure_rate=app.config.get('LLM_BREAKER_FAILURE_RATE', 0.5),
+        min_calls=app.config.get('LLM_BREAKER_MIN_CALLS', 10),
+        window=app.config.get('LLM_BREAKER_WINDOW', 20),
+        reset_timeout=app.config.get('LLM_BREAKER_RESET_TIMEOUT', 30),
+    )
+    client = ResilientLLMClient(
+        client,
+        breaker=breaker,
+        timeout=app.config.get('LLM_TIMEOUT', 60),
+        deadline=app.config.get('LLM_DEADLINE', 120),
+        max_retries=app.config.get('LLM_MAX_RETRIES', 2),
+        backoff_base=app.config.get('LLM_BACKOFF_BASE', 0.5),
+        backoff_max=app.config.get('LLM_BACKOFF_MAX', 8),
+    )
+    app.extensions['llm_client'] = client
+    return client
+
+
+def get_llm_client():
+    return current_app.extensions['llm_client']
@@ -0,0 +1,232 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter, deque
+
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailable(Exception):
+    """Raised without calling the model while the circuit breaker is open."""
+    pass
+
+
+class LLMTimeout(Exception):
+    """Raised when a generation could not finish within its deadline."""
+    pass
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a rolling window of recent calls.
+
+    CLOSED: calls go through and outcomes are recorded. Once at least `min_calls`
+    outcomes are in the window and the failure rate reaches `failure_rate`, the
+    breaker OPENs and rejects calls for `reset_timeout` seconds. It then goes
+    HALF_OPEN and lets a single trial call through: success closes it again,
+    failure re-opens it. Every state transition is counted and logged.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate=0.5, min_calls=10, window=20, reset_timeout=30, clock=time.monotonic):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window) # True for success, False for failure
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.transitions = Counter() # 'closed->open' -> count
+        self.rejected_calls = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow(self):
+        """Return True if a call may proceed now."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected_calls += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._transition(self.CLOSED)
+            else:
+                self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._transition(self.OPEN)
+                return
+            self._outcomes.append(False)
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._transition(self.OPEN)
+
+    def release(self):
+        """End a call allowed by allow() without recording an outcome.
+
+        For errors that say nothing about the provider's health either way (a bad
+        request, missing credentials). A half-open trial slot is given back so the
+        next call can be the trial; the breaker stays half-open.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def reset(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                self._transition(self.CLOSED)
+            self._outcomes.clear()
+
+    def stats(self):
+        with self._lock:
+            self._maybe_half_open()
+            outcomes = len(self._outcomes)
+            return {
+                'state': self._state,
+                'window_calls': outcomes,
+                'window_failure_rate': (self._outcomes.count(False) / outcomes) if outcomes else 0.0,
+                'rejected_calls': self.rejected_calls,
+                'transitions': dict(self.transitions),
+            }
+
+    # Callers must hold self._lock
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._transition(self.HALF_OPEN)
+
+    def _transition(self, new_state):
+        old_state = self._state
+        self._state = new_state
+        self.transitions[f'{old_state}->{new_state}'] += 1
+        self._trial_in_flight = False
+        if new_state == self.OPEN:
+            self._opened_at = self._clock()
+        elif new_state == self.CLOSED:
+            self._outcomes.clear()
+        logger.warning(f"LLM circuit breaker {old_state} -> {new_state}")
+
+
+class ResilientLLMClient:
+    """Wraps an LLM client with deadlines, retries and a circuit breaker.
+
+    Exposes the same interface as the wrapped client. Each call gets an overall
+    `deadline`; every attempt is given at most `timeout` seconds of it. Errors the
+    wrapped client lists in `retryable_errors` are retried up to `max_retries`
+    times with full-jitter exponential backoff. Other errors are raised at once
+    and, since the provider did answer, don't count against the breaker.
+    """
+
+    def __init__(self, client, breaker=None, timeout=60, deadline=120, max_retries=2,
+                 backoff_base=0.5, backoff_max=8, sleep=time.sleep, clock=time.monotonic):
+        self.client = client
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.retries = 0
+
+    @property
+    def model_name(self):
+        return self.client.model_name
+
+    @property
+    def is_configured(self):
+        return self.client.is_configured
+
+    def generate(self, prompt):
+        return self._call(lambda timeout: self.client.generate(prompt, timeout=timeout))
+
+    def stream(self, prompt):
+        """Yield chunks from the wrapped client's stream.
+
+        Retries only happen before the first chunk; once output has been sent a
+        failure is raised to the caller, which can't take the chunks back.
+        """
+        def open_stream(timeout):
+            iterator = iter(self.client.stream(prompt, timeout=timeout))
+            try:
+                first = next(iterator)
+            except StopIteration:
+                return None, iterator
+            return first, iterator
+
+        first, iterator = self._call(open_stream)
+        if first is None:
+            return
+        yield first
+        try:
+            for chunk in iterator:
+                yield chunk
+        except Exception as e:
+            if self._is_retryable(e):
+                self.breaker.record_failure()
+            self._raise_translated(e)
+
+    def stats(self):
+        return dict(self.breaker.stats(), retries=self.retries)
+
+    # --- Internals ---
+    def _is_retryable(self, error):
+        return isinstance(error, getattr(self.client, 'retryable_errors', ()))
+
+    def _raise_translated(self, error):
+        """Re-raise a provider timeout as LLMTimeout, anything else unchanged."""
+        if isinstance(error, getattr(self.client, 'timeout_errors', ())):
+            raise LLMTimeout(f'The AI service did not respond in time: {error}') from error
+        raise error
+
+    def _call(self, attempt_fn):
+        deadline_at = self._clock() + self.deadline
+        attempt = 0
+        while True:
+            remaining = deadline_at - self._clock()
+            if remaining <= 0:
+                # Checked before allow() so no trial slot is taken; the provider wasn't called,
+                # so this says nothing about its health and isn't recorded on the breaker
+                raise LLMTimeout(f'Generation deadline of {self.deadline}s exceeded.')
+            if not self.breaker.allow():
+                raise LLMUnavailable('The AI service is temporarily unavailable.')
+            try:
+                result = attempt_fn(min(self.timeout, remaining))
+            except Exception as e:
+                if not self._is_retryable(e):
+                    # Not a provider outage, but not proof it's healthy either (e.g. an auth error),
+                    # so a half-open trial mustn't close the breaker on it
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                if attempt >= self.max_retries or self._clock() + delay >= deadline_at:
+                    self._raise_translated(e)
+                logger.info(f"Retrying LLM call after {type(e).__name__} (attempt {attempt + 1}, sleeping {delay:.2f}s)")
+                with self._lock:
+                    self.retries += 1
+                attempt += 1
+                self._sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
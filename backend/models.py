@@ -1,8 +1,23 @@
+import secrets
+from datetime import datetime, timezone
 from .app import db # Import db instance from app.py
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from .text_compression import CompressedText
+
+
+def _initial_profile_version():
+    # Start at a random value rather than 0 so that if a deleted user's id is reused,
+    # the new account's version never matches caches built for the old one
+    return secrets.randbelow(2 ** 31)
 
 class User(UserMixin, db.Model):
+    # For the admin user list: case-insensitive prefix search, and keyset pages sorted by counts
+    __table_args__ = (
+        db.Index('ix_user_username_lower', db.text('lower(username)')),
+        db.Index('ix_user_resume_generations_id', 'resume_generations', 'id'),
+        db.Index('ix_user_cover_letter_generations_id', 'cover_letter_generations', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(100), unique=True, nullable=False)
     password_hash = db.Column(db.String(128))
@@ -10,13 +25,23 @@ class User(UserMixin, db.Model):
     # Generation counters
     resume_generations = db.Column(db.Integer, default=0, nullable=False)
     cover_letter_generations = db.Column(db.Integer, default=0, nullable=False)
+    # UTC day of the user's latest generation, to count each active user once per day (see site_stats.py)
+    last_generation_on = db.Column(db.Date)
+    # Incremented on every profile write; used to invalidate cached profile renders
+    profile_version = db.Column(db.Integer, default=_initial_profile_version, nullable=False)
+    # JSON of the pre-rendered prompt fragments for profile_version (see profile_cache.py).
+    # Deferred so the user loader doesn't read it on every request.
+    profile_fragments = db.deferred(db.Column(db.Text))
 
     # Relationships
     personal_info = db.relationship('PersonalInfo', backref='user', uselist=False, cascade="all, delete-orphan")
-    experiences = db.relationship('Experience', backref='user', lazy='dynamic', cascade="all, delete-orphan")
-    educations = db.relationship('Education', backref='user', lazy='dynamic', cascade="all, delete-orphan")
-    skills = db.relationship('Skill', backref='user', lazy='dynamic', cascade="all, delete-orphan")
-    projects = db.relationship('Project', backref='user', lazy='dynamic', cascade="all, delete-orphan")
+    # Plain (not dynamic) collections so they can be eager loaded, see profile_service.load_profile
+    experiences = db.relationship('Experience', backref='user', order_by='Experience.id', cascade="all, delete-orphan")
+    educations = db.relationship('Education', backref='user', order_by='Education.id', cascade="all, delete-orphan")
+    skills = db.relationship('Skill', backref='user', order_by='Skill.id', cascade="all, delete-orphan")
+    projects = db.relationship('Project', backref='user', order_by='Project.id', cascade="all, delete-orphan")
+    # Dynamic: history can grow large and is only ever read a page at a time
+    generations = db.relationship('Generation', backref='user', lazy='dynamic', cascade="all, delete-orphan")
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -42,19 +67,22 @@ class PersonalInfo(db.Model):
         return f'<PersonalInfo {self.full_name}>'
 
 class Experience(db.Model):
+    # Per-user lookups, already ordered by id (see load_profile)
+    __table_args__ = (db.Index('ix_experience_user_id_id', 'user_id', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     job_title = db.Column(db.String(150), nullable=False)
     company_name = db.Column(db.String(150))
     location = db.Column(db.String(100))
     start_date = db.Column(db.String(20)) # Using String for flexibility (e.g., "Jan 2020")
     end_date = db.Column(db.String(20)) # Using String (e.g., "Present" or "Dec 2022")
-    description = db.Column(db.Text) # Key Responsibilities/Achievements
+    description = db.Column(CompressedText) # Key Responsibilities/Achievements
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
     def __repr__(self):
         return f'<Experience {self.job_title} at {self.company_name}>'
 
 class Education(db.Model):
+    __table_args__ = (db.Index('ix_education_user_id_id', 'user_id', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     degree_name = db.Column(db.String(150), nullable=False)
     major = db.Column(db.String(150))
@@ -67,6 +95,7 @@ class Education(db.Model):
         return f'<Education {self.degree_name} from {self.institution_name}>'
 
 class Skill(db.Model):
+    __table_args__ = (db.Index('ix_skill_user_id_id', 'user_id', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     skill_name = db.Column(db.String(100), nullable=False)
     # category = db.Column(db.String(50)) # Optional: e.g., 'Technical', 'Soft'
@@ -76,11 +105,102 @@ class Skill(db.Model):
         return f'<Skill {self.skill_name}>'
 
 class Project(db.Model):
+    __table_args__ = (db.Index('ix_project_user_id_id', 'user_id', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     project_name = db.Column(db.String(150), nullable=False)
-    description = db.Column(db.Text)
+    description = db.Column(CompressedText)
     link = db.Column(db.String(200))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
     def __repr__(self):
         return f'<Project {self.project_name}>'
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None) # Stored naive, in UTC
+
+class Generation(db.Model):
+    """A resume or cover letter delivered to a user, kept so it can be reopened and re-exported."""
+    # Keyset pagination walks a user's history newest first by id
+    __table_args__ = (db.Index('ix_generation_user_id_id', 'user_id', 'id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False) # 'resume' or 'cover_letter'
+    created_at = db.Column(db.DateTime, default=_utcnow, nullable=False)
+    # Same hash as the generation cache key (prompt, model and prompt version)
+    input_hash = db.Column(db.String(64), nullable=False, index=True)
+    model_name = db.Column(db.String(100))
+    latency_ms = db.Column(db.Integer)
+    prompt_tokens = db.Column(db.Integer) # Estimated, see prompt_builder.estimate_tokens
+    output_tokens = db.Column(db.Integer)
+    cached = db.Column(db.Boolean, default=False, nullable=False) # Served from the generation cache
+    # Deferred so listing history never reads it
+    output = db.deferred(db.Column(CompressedText, nullable=False))
+
+    def __repr__(self):
+        return f'<Generation {self.kind} {self.id} for user {self.user_id}>'
+
+
+class SiteStats(db.Model):
+    """Running site-wide totals for the admin dashboard, kept in a single row (id 1).
+
+    Maintained incrementally by site_stats.py so the dashboard never aggregates the user table.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    user_count = db.Column(db.Integer, default=0, nullable=False)
+    # Sums of the users' counters, so deleting a user removes their generations too
+    resume_generations = db.Column(db.Integer, default=0, nullable=False)
+    cover_letter_generations = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<SiteStats users={self.user_count}>'
+
+class GenerationDailyStats(db.Model):
+    """Generations per UTC day. Historical, so unaffected by later user deletions."""
+    day = db.Column(db.Date, primary_key=True)
+    resume_generations = db.Column(db.Integer, default=0, nullable=False)
+    cover_letter_generations = db.Column(db.Integer, default=0, nullable=False)
+    active_users = db.Column(db.Integer, default=0, nullable=False) # Distinct users who generated that day
+
+    def __repr__(self):
+        return f'<GenerationDailyStats {self.day}>'
+
+class BackgroundJob(db.Model):
+    """Status and outcome of a queued background job (see job_queue.py).
+
+    Jobs run in the worker process that accepted them, but their state is kept here
+    so a status poll answered by any worker process sees it.
+    """
+    __table_args__ = (db.Index('ix_background_job_user_id_status', 'user_id', 'status'),)
+    id = db.Column(db.String(32), primary_key=True) # uuid4 hex
+    queue = db.Column(db.String(20), nullable=False) # Name of the GenerationJobQueue that ran it
+    # Not a foreign key, so deleting a user (possibly from one of their own admin jobs) never trips over job rows
+    user_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(30), nullable=False)
+    status = db.Column(db.String(20), nullable=False) # queued -> running -> succeeded / failed
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    progress_done = db.Column(db.Integer)
+    progress_total = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=_utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    # An unfinished job is reported as failed after this, e.g. if the worker running it was restarted
+    timeout_at = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        status, error = self.status, self.error
+        if status in ('queued', 'running') and self.timeout_at < _utcnow():
+            status, error = 'failed', 'The job was interrupted. Please try again.'
+        data = {'job_id': self.id, 'kind': self.kind, 'status': status}
+        if self.progress_total is not None:
+            data['progress'] = {'done': self.progress_done, 'total': self.progress_total}
+        if status == 'succeeded':
+            data['result'] = self.result
+        elif status == 'failed':
+            data['error'] = error
+        return data
+
+    def __repr__(self):
+        return f'<BackgroundJob {self.kind} {self.id} {self.status}>'
@@ -1,116 +1,150 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 # Adjust imports based on new location relative to models/app
-from .models import db, User, PersonalInfo, Experience, Education, Skill, Project
+from .models import db
+from .profile_cache import get_profile_cache
+from .profile_service import (
+    load_profile, load_profile_summary, load_user_with_profile, update_profile, item_to_dict, create_item, update_item, delete_item,
+    update_personal_info, apply_patch, bump_profile_version, ProfileEditError, ProfileItemNotFound,
+)
 
 profile_api = Blueprint('profile_api', __name__, url_prefix='/api') # Add prefix
 
 @profile_api.route('/get_profile', methods=['GET'])
 @login_required
 def get_profile():
-    user = current_user
-    personal_info = user.personal_info
-    experiences = user.experiences.order_by(Experience.id).all()
-    educations = user.educations.order_by(Education.id).all()
-    skills = user.skills.order_by(Skill.id).all()
-    projects = user.projects.order_by(Project.id).all()
-
-    profile_data = {
-        'username': user.username, # Add username here
-        'personal_info': {
-            'full_name': personal_info.full_name if personal_info else '',
-            'phone_number': personal_info.phone_number if personal_info else '',
-            'email_address': personal_info.email_address if personal_info else '',
-            'linkedin_url': personal_info.linkedin_url if personal_info else '',
-            'portfolio_url': personal_info.portfolio_url if personal_info else '',
-            'location': personal_info.location if personal_info else '',
-            'target_job': personal_info.target_job if personal_info else '',
-        } if personal_info else {},
-        'experiences': [{'id': exp.id, 'job_title': exp.job_title, 'company_name': exp.company_name, 'location': exp.location, 'start_date': exp.start_date, 'end_date': exp.end_date, 'description': exp.description} for exp in experiences],
-        'educations': [{'id': edu.id, 'degree_name': edu.degree_name, 'major': edu.major, 'institution_name': edu.institution_name, 'location': edu.location, 'graduation_date': edu.graduation_date} for edu in educations],
-        'skills': [{'id': skill.id, 'skill_name': skill.skill_name} for skill in skills],
-        'projects': [{'id': proj.id, 'project_name': proj.project_name, 'description': proj.description, 'link': proj.link} for proj in projects],
-    }
+    """Return the current user's profile as JSON.
+
+    The response carries a strong ETag derived from the user's profile_version, which
+    every write bumps. flask-login has already loaded the user row, so a request with a
+    matching If-None-Match is answered 304 without loading the profile at all.
+    """
     # Return just the JSON data, status code defaults to 200
-    return jsonify(profile_data)
+    return _conditional_profile_response(lambda: load_profile(current_user.id).to_dict())
+
+
+@profile_api.route('/profile/summary', methods=['GET'])
+@login_required
+def get_profile_summary():
+    """Counts, completeness flags and skill names, for pages that don't need the full profile."""
+    return _conditional_profile_response(lambda: load_profile_summary(current_user.id), etag_suffix='summary')
+
+
+def _conditional_profile_response(build_body, etag_suffix=None):
+    """jsonify(build_body()) with the profile ETag, or a bodyless 304 if the client's copy is current."""
+    etag = profile_etag(current_user)
+    if etag_suffix:
+        etag = f'{etag}-{etag_suffix}'
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build_body())
+    response.set_etag(etag)
+    # Per-user data: browsers may keep it but must revalidate, shared caches must not store it
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def profile_etag(user):
+    # The user id keeps two accounts used in the same browser from matching each other's tags
+    return f'{user.id}-{user.profile_version}'
 
 @profile_api.route('/save_profile', methods=['POST'])
 @login_required
 def save_profile():
-    data = request.json
-    user = current_user
-
-    # --- Update Personal Info ---
-    personal_data = data.get('personal_info', {})
-    personal_info = user.personal_info
-    if not personal_info:
-        personal_info = PersonalInfo(user_id=user.id)
-        db.session.add(personal_info)
-    personal_info.full_name = personal_data.get('full_name')
-    personal_info.phone_number = personal_data.get('phone_number')
-    personal_info.email_address = personal_data.get('email_address')
-    personal_info.linkedin_url = personal_data.get('linkedin_url')
-    personal_info.portfolio_url = personal_data.get('portfolio_url')
-    personal_info.location = personal_data.get('location')
-    personal_info.target_job = personal_data.get('target_job')
-
-    # --- Update Experiences (Replace existing ones for simplicity) ---
-    Experience.query.filter_by(user_id=user.id).delete()
-    experiences_data = data.get('experiences', [])
-    for exp_data in experiences_data:
-        if exp_data.get('job_title'):
-            exp = Experience(
-                job_title=exp_data.get('job_title'),
-                company_name=exp_data.get('company_name'),
-                location=exp_data.get('location'),
-                start_date=exp_data.get('start_date'),
-                end_date=exp_data.get('end_date'),
-                description=exp_data.get('description'),
-                user_id=user.id
-            )
-            db.session.add(exp)
-
-    # --- Update Educations (Replace existing) ---
-    Education.query.filter_by(user_id=user.id).delete()
-    educations_data = data.get('educations', [])
-    for edu_data in educations_data:
-         if edu_data.get('degree_name'):
-            edu = Education(
-                degree_name=edu_data.get('degree_name'),
-                major=edu_data.get('major'),
-                institution_name=edu_data.get('institution_name'),
-                location=edu_data.get('location'),
-                graduation_date=edu_data.get('graduation_date'),
-                user_id=user.id
-            )
-            db.session.add(edu)
-
-    # --- Update Skills (Replace existing) ---
-    Skill.query.filter_by(user_id=user.id).delete()
-    skills_data = data.get('skills', [])
-    for skill_data in skills_data:
-        if skill_data.get('skill_name'):
-            skill = Skill(skill_name=skill_data.get('skill_name'), user_id=user.id)
-            db.session.add(skill)
-
-    # --- Update Projects (Replace existing) ---
-    Project.query.filter_by(user_id=user.id).delete()
-    projects_data = data.get('projects', [])
-    for proj_data in projects_data:
-        if proj_data.get('project_name'):
-            proj = Project(
-                project_name=proj_data.get('project_name'),
-                description=proj_data.get('description'),
-                link=proj_data.get('link'),
-                user_id=user.id
-            )
-            db.session.add(proj)
+    """Save the full profile form.
+
+    Submitted items are matched to existing rows by id, so only new, edited and
+    removed items are written. The response includes the id of every submitted
+    item so the client can send them back on the next save. A save that changes
+    nothing writes nothing and keeps the profile version (and caches) intact.
+    """
+    data = request.json or {}
+    user_id = current_user.id
 
     try:
-        db.session.commit()
-        return jsonify({'message': 'Profile saved successfully!'}), 200
+        user = load_user_with_profile(user_id)
+        changed, ids = update_profile(user, data)
+        if changed:
+            _commit_profile_change(user_id)
+        return jsonify({'message': 'Profile saved successfully!', 'ids': ids}), 200
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error saving profile for user {user.id}: {e}")
+        current_app.logger.error(f"Error saving profile for user {user_id}: {e}")
         # Standardized JSON error response
         return jsonify({'error': f'An unexpected error occurred while saving the profile: {e}'}), 500
+
+
+def _commit_profile_change(user_id):
+    """Bump the profile version and commit; any cached renders of the old profile are now stale."""
+    bump_profile_version(user_id)
+    db.session.commit()
+    get_profile_cache().invalidate(user_id)
+
+
+def _profile_edit(edit):
+    """Run edit() -> (changed, body, status) in a transaction and turn edit errors into JSON responses."""
+    user_id = current_user.id
+    try:
+        changed, body, status = edit(user_id)
+        if changed:
+            _commit_profile_change(user_id)
+        else:
+            db.session.rollback() # Nothing to write, release the read transaction
+        return jsonify(body), status
+    except ProfileItemNotFound as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 404
+    except ProfileEditError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error editing profile for user {user_id}: {e}")
+        return jsonify({'error': 'An unexpected error occurred while saving the profile.'}), 500
+
+
+# --- Granular edits: each touches only the affected rows ---
+@profile_api.route('/profile/personal_info', methods=['PATCH'])
+@login_required
+def patch_personal_info():
+    def edit(user_id):
+        return update_personal_info(user_id, request.get_json(silent=True)), {'message': 'Personal info saved.'}, 200
+    return _profile_edit(edit)
+
+
+@profile_api.route('/profile/<section>', methods=['POST'])
+@login_required
+def create_profile_item(section):
+    def edit(user_id):
+        row = create_item(user_id, section, request.get_json(silent=True))
+        return True, item_to_dict(section, row), 201
+    return _profile_edit(edit)
+
+
+@profile_api.route('/profile/<section>/<int:item_id>', methods=['PATCH'])
+@login_required
+def update_profile_item(section, item_id):
+    def edit(user_id):
+        row, changed = update_item(user_id, section, item_id, request.get_json(silent=True))
+        return changed, item_to_dict(section, row), 200
+    return _profile_edit(edit)
+
+
+@profile_api.route('/profile/<section>/<int:item_id>', methods=['DELETE'])
+@login_required
+def delete_profile_item(section, item_id):
+    def edit(user_id):
+        delete_item(user_id, section, item_id)
+        return True, {'message': 'Item deleted.'}, 200
+    return _profile_edit(edit)
+
+
+@profile_api.route('/profile', methods=['PATCH'])
+@login_required
+def patch_profile():
+    """Apply several edits at once (see profile_service.apply_patch). All or nothing."""
+    def edit(user_id):
+        changed, results = apply_patch(user_id, request.get_json(silent=True))
+        return changed, {'results': results}, 200
+    return _profile_edit(edit)
@@ -0,0 +1,134 @@
+import json
+import threading
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+
+from .models import db, User
+from .generation_cache import CacheStats
+from .prompt_builder import ProfileFragments, render_profile_fragments
+
+
+class RenderedProfile(namedtuple('RenderedProfile', ['fragments', 'has_profile', 'full_name'])):
+    """A user's pre-rendered candidate sections plus what generation needs to validate the profile.
+
+    has_profile: personal info or at least one experience was provided (required for resumes).
+    full_name: the candidate's name, or '' (required for cover letters).
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_profile_data(cls, profile_data, budget):
+        personal_info = profile_data.get('personal_info') or {}
+        return cls(
+            fragments=render_profile_fragments(profile_data, budget),
+            has_profile=bool(profile_data.get('personal_info') or profile_data.get('experiences')),
+            full_name=personal_info.get('full_name') or '',
+        )
+
+    def to_json(self, version, item_tokens):
+        return json.dumps({
+            'version': version,
+            'item_tokens': item_tokens,
+            'resume': self.fragments.resume,
+            'cover_letter': self.fragments.cover_letter,
+            'has_profile': self.has_profile,
+            'full_name': self.full_name,
+        })
+
+    @classmethod
+    def from_json(cls, raw, version, item_tokens):
+        """Parse a stored render, or return None if it is stale or unreadable."""
+        try:
+            data = json.loads(raw)
+            if data['version'] != version or data['item_tokens'] != item_tokens:
+                return None
+            return cls(ProfileFragments(data['resume'], data['cover_letter']), data['has_profile'], data['full_name'])
+        except (TypeError, ValueError, KeyError):
+            return None
+
+
+class ProfileFragmentCache:
+    """Thread-safe in-process LRU of RenderedProfile per user.
+
+    Entries are keyed by (user_id, item_tokens) and tagged with the profile_version
+    they were rendered from. Lookups pass the user's current version, which flask-login
+    has already loaded, so a save in another worker process is picked up without any
+    cross-process messaging: the old entry simply stops matching.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # (user_id, item_tokens) -> (version, RenderedProfile)
+        self._stats = CacheStats()
+
+    def get(self, user_id, version, item_tokens):
+        key = (user_id, item_tokens)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != version:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self._stats.record(hit=entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, user_id, version, item_tokens, rendered):
+        with self._lock:
+            self._entries[(user_id, item_tokens)] = (version, rendered)
+            self._entries.move_to_end((user_id, item_tokens))
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self._stats.record_evictions(evicted)
+
+    def invalidate(self, user_id):
+        """Drop every entry for a user (all budgets)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return dict(self._stats.as_dict(), size=size)
+
+
+def load_stored_profile(user, item_tokens):
+    """Return the RenderedProfile stored on the user row if it matches their current version."""
+    raw = user.profile_fragments # Deferred column, one small query
+    if not raw:
+        return None
+    return RenderedProfile.from_json(raw, user.profile_version, item_tokens)
+
+
+def store_profile(user_id, version, item_tokens, rendered):
+    """Persist a render on the user row, unless the profile was saved again in the meantime."""
+    try:
+        db.session.execute(
+            db.update(User)
+            .where(User.id == user_id, User.profile_version == version)
+            .values(profile_fragments=rendered.to_json(version, item_tokens))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error storing profile fragments for user {user_id}: {e}")
+
+
+def init_profile_cache(app):
+    cache = ProfileFragmentCache(max_entries=app.config.get('PROFILE_FRAGMENT_CACHE_MAX_ENTRIES', 1024))
+    app.extensions['profile_fragment_cache'] = cache
+    return cache
+
+
+def get_profile_cache():
+    return current_app.extensions['profile_fragment_cache']
@@ -0,0 +1,354 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from .models import db, User, PersonalInfo, Experience, Education, Skill, Project
+
+PERSONAL_INFO_FIELDS = ('full_name', 'phone_number', 'email_address', 'linkedin_url', 'portfolio_url', 'location', 'target_job')
+EXPERIENCE_FIELDS = ('id', 'job_title', 'company_name', 'location', 'start_date', 'end_date', 'description')
+EDUCATION_FIELDS = ('id', 'degree_name', 'major', 'institution_name', 'location', 'graduation_date')
+SKILL_FIELDS = ('id', 'skill_name')
+PROJECT_FIELDS = ('id', 'project_name', 'description', 'link')
+
+
+class Profile:
+    """A user's full profile as plain Python data, detached from the session.
+
+    personal_info is a dict (empty if the user never saved one) and each collection
+    is a list of dicts ordered by id, matching the /api/get_profile JSON.
+    """
+    __slots__ = ('username', 'personal_info', 'experiences', 'educations', 'skills', 'projects')
+
+    def __init__(self, username, personal_info=None, experiences=(), educations=(), skills=(), projects=()):
+        self.username = username
+        self.personal_info = personal_info or {}
+        self.experiences = list(experiences)
+        self.educations = list(educations)
+        self.skills = list(skills)
+        self.projects = list(projects)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data.get('username'),
+            data.get('personal_info'),
+            data.get('experiences') or (),
+            data.get('educations') or (),
+            data.get('skills') or (),
+            data.get('projects') or (),
+        )
+
+    def to_dict(self):
+        return {
+            'username': self.username,
+            'personal_info': self.personal_info,
+            'experiences': self.experiences,
+            'educations': self.educations,
+            'skills': self.skills,
+            'projects': self.projects,
+        }
+
+
+def _row_dict(row, fields):
+    return {field: getattr(row, field) for field in fields}
+
+
+def load_user_with_profile(user_id):
+    """Return the User with personal_info and all profile collections loaded, or None.
+
+    personal_info is joined onto the user row. The four collections are loaded with
+    selectin loads rather than joins, since joining them all would multiply rows
+    (experiences x educations x skills x projects).
+    """
+    return db.session.execute(
+        db.select(User)
+        .where(User.id == user_id)
+        .options(
+            joinedload(User.personal_info),
+            selectinload(User.experiences),
+            selectinload(User.educations),
+            selectinload(User.skills),
+            selectinload(User.projects),
+        )
+        # current_user is usually already in the session; make sure its collections are refreshed too
+        .execution_options(populate_existing=True)
+    ).unique().scalar_one_or_none()
+
+
+def load_profile(user_id):
+    """Load a user's profile in one eager query, or return None if the user doesn't exist."""
+    user = load_user_with_profile(user_id)
+    if user is None:
+        return None
+
+    personal_info = user.personal_info
+    return Profile(
+        user.username,
+        _row_dict(personal_info, PERSONAL_INFO_FIELDS) if personal_info else {},
+        [_row_dict(exp, EXPERIENCE_FIELDS) for exp in user.experiences],
+        [_row_dict(edu, EDUCATION_FIELDS) for edu in user.educations],
+        [_row_dict(skill, SKILL_FIELDS) for skill in user.skills],
+        [_row_dict(proj, PROJECT_FIELDS) for proj in user.projects],
+    )
+
+
+def load_profile_summary(user_id):
+    """Return counts, completeness flags and skill names for a user in a single query.
+
+    Counts come from correlated subqueries and skills are outer-joined, so the query
+    returns one row per skill (or one row if there are none), never touching the long
+    description columns. Returns None if the user doesn't exist.
+    """
+    def count(model):
+        return (db.select(db.func.count(model.id)).where(model.user_id == User.id)
+                .correlate(User).scalar_subquery())
+
+    rows = db.session.execute(
+        db.select(
+            User.username,
+            PersonalInfo.full_name,
+            count(Experience).label('experiences'),
+            count(Education).label('educations'),
+            count(Project).label('projects'),
+            Skill.skill_name,
+        )
+        .select_from(User)
+        .outerjoin(PersonalInfo, PersonalInfo.user_id == User.id)
+        .outerjoin(Skill, Skill.user_id == User.id)
+        .where(User.id == user_id)
+        .order_by(Skill.id)
+    ).all()
+    if not rows:
+        return None
+
+    first = rows[0]
+    skills = [row.skill_name for row in rows if row.skill_name is not None]
+    has_name = bool(first.full_name)
+    return {
+        'username': first.username,
+        'counts': {
+            'experiences': first.experiences,
+            'educations': first.educations,
+            'skills': len(skills),
+            'projects': first.projects,
+        },
+        # Mirrors the checks the generation endpoints make
+        'complete': {
+            'personal_info': has_name,
+            'resume': has_name or first.experiences > 0,
+            'cover_letter': has_name,
+        },
+        'skills': skills,
+    }
+
+
+# section -> (model, editable fields, field an item must have to be kept)
+PROFILE_SECTIONS = {
+    'experiences': (Experience, EXPERIENCE_FIELDS[1:], 'job_title'),
+    'educations': (Education, EDUCATION_FIELDS[1:], 'degree_name'),
+    'skills': (Skill, SKILL_FIELDS[1:], 'skill_name'),
+    'projects': (Project, PROJECT_FIELDS[1:], 'project_name'),
+}
+
+
+def _assign_changed(row, item, fields):
+    """Copy item values onto row, touching only fields that differ. Returns True if any did."""
+    changed = False
+    for field in fields:
+        value = item.get(field)
+        if getattr(row, field) != value:
+            setattr(row, field, value)
+            changed = True
+    return changed
+
+
+def _sync_section(user, section, items):
+    """Diff the submitted items of one section against the user's rows by id.
+
+    Items with the id of an existing row update it (only if something changed),
+    items without a known id are inserted, and rows missing from the submission are
+    removed from the collection, which deletes them on flush (delete-orphan cascade).
+    Items lacking the required field are dropped, as before.
+    Returns (changed, rows) where rows lines up with items (None for dropped items).
+    """
+    model, fields, required_field = PROFILE_SECTIONS[section]
+    collection = getattr(user, section)
+    existing = {row.id: row for row in collection}
+    rows = []
+    kept_ids = set()
+    changed = False
+    for item in items:
+        if not isinstance(item, dict) or not item.get(required_field):
+            rows.append(None)
+            continue
+        row = existing.get(item.get('id'))
+        if row is None or row.id in kept_ids: # Unknown or repeated ids become new rows
+            row = model(**{field: item.get(field) for field in fields})
+            collection.append(row)
+            changed = True
+        else:
+            kept_ids.add(row.id)
+            changed = _assign_changed(row, item, fields) or changed
+        rows.append(row)
+
+    for row_id, row in existing.items():
+        if row_id not in kept_ids:
+            collection.remove(row)
+            changed = True
+    return changed, rows
+
+
+def update_profile(user, data):
+    """Apply a full profile submission to a user loaded by load_user_with_profile.
+
+    Only rows that actually differ are written; the session is flushed so new rows
+    have ids, and the caller commits. Returns (changed, ids) where ids maps each
+    section to the row ids of the submitted items, in order (None for dropped items).
+    """
+    changed = False
+    personal_data = data.get('personal_info') or {}
+    personal_info = user.personal_info
+    if personal_info is None:
+        personal_info = PersonalInfo()
+        user.personal_info = personal_info
+        changed = True
+    changed = _assign_changed(personal_info, personal_data, PERSONAL_INFO_FIELDS) or changed
+
+    section_rows = {}
+    for section in PROFILE_SECTIONS:
+        section_changed, section_rows[section] = _sync_section(user, section, data.get(section) or [])
+        changed = changed or section_changed
+
+    if changed:
+        db.session.flush() # Inserts, updates and deletes are batched per table here
+    ids = {section: [row.id if row is not None else None for row in rows] for section, rows in section_rows.items()}
+    return changed, ids
+
+
+# --- Granular edits ---
+class ProfileEditError(ValueError):
+    """Raised for an invalid edit (unknown section, missing required field, bad patch op)."""
+    pass
+
+
+class ProfileItemNotFound(LookupError):
+    """Raised when an item doesn't exist or belongs to another user."""
+    pass
+
+
+def _section(section):
+    if section not in PROFILE_SECTIONS:
+        raise ProfileEditError(f"Unknown profile section '{section}'.")
+    return PROFILE_SECTIONS[section]
+
+
+def item_to_dict(section, row):
+    model, fields, required_field = _section(section)
+    return dict(_row_dict(row, fields), id=row.id)
+
+
+def _get_item(user_id, section, item_id):
+    model = _section(section)[0]
+    row = db.session.execute(
+        db.select(model).where(model.id == item_id, model.user_id == user_id)
+    ).scalar_one_or_none()
+    if row is None:
+        raise ProfileItemNotFound(f'No {section} item with id {item_id}.')
+    return row
+
+
+def _editable_values(section, values, partial):
+    """Pick the editable fields out of a request body and check the required field."""
+    model, fields, required_field = _section(section)
+    if not isinstance(values, dict):
+        raise ProfileEditError('Item values must be an object.')
+    picked = {field: values[field] for field in fields if field in values}
+    if (required_field in picked or not partial) and not picked.get(required_field):
+        raise ProfileEditError(f"'{required_field}' is required.")
+    return picked
+
+
+def create_item(user_id, section, values):
+    """Insert one item. The caller commits."""
+    model = _section(section)[0]
+    row = model(user_id=user_id, **_editable_values(section, values, partial=False))
+    db.session.add(row)
+    db.session.flush()
+    return row
+
+
+def update_item(user_id, section, item_id, values):
+    """Update the given fields of one item. Returns (row, changed). The caller commits."""
+    row = _get_item(user_id, section, item_id)
+    picked = _editable_values(section, values, partial=True)
+    return row, _assign_changed(row, picked, picked)
+
+
+def delete_item(user_id, section, item_id):
+    """Delete one item. The caller commits."""
+    db.session.delete(_get_item(user_id, section, item_id))
+
+
+def update_personal_info(user_id, values):
+    """Update the given personal info fields, creating the row if needed. Returns True if anything changed."""
+    if not isinstance(values, dict):
+        raise ProfileEditError('Personal info must be an object.')
+    picked = {field: values[field] for field in PERSONAL_INFO_FIELDS if field in values}
+    personal_info = db.session.execute(
+        db.select(PersonalInfo).where(PersonalInfo.user_id == user_id)
+    ).scalar_one_or_none()
+    if personal_info is None:
+        db.session.add(PersonalInfo(user_id=user_id, **picked))
+        return True
+    return _assign_changed(personal_info, picked, picked)
+
+
+def apply_patch(user_id, operations):
+    """Apply a list of JSON-Patch style operations in order. The caller commits.
+
+    Paths address items by id rather than by list index, so a patch stays valid
+    while other edits reorder or remove items:
+        {"op": "add", "path": "/skills", "value": {...}}
+        {"op": "replace", "path": "/experiences/12", "value": {...}}  (only the given fields change)
+        {"op": "remove", "path": "/projects/7"}
+        {"op": "replace", "path": "/personal_info", "value": {...}}
+    Returns (changed, results) with one result per operation; added items include their new id.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ProfileEditError('A non-empty list of patch operations is required.')
+    changed = False
+    results = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise ProfileEditError(f'Operation {index} must be an object.')
+        op = operation.get('op')
+        parts = str(operation.get('path', '')).strip('/').split('/')
+        if parts == ['personal_info'] and op == 'replace':
+            changed = update_personal_info(user_id, operation.get('value')) or changed
+            results.append({'op': op, 'path': '/personal_info'})
+        elif len(parts) == 1 and op == 'add':
+            row = create_item(user_id, parts[0], operation.get('value'))
+            changed = True
+            results.append({'op': op, 'path': f'/{parts[0]}/{row.id}', 'id': row.id})
+        elif len(parts) == 2 and parts[1].isdigit() and op in ('replace', 'remove'):
+            section, item_id = parts[0], int(parts[1])
+            if op == 'replace':
+                row, item_changed = update_item(user_id, section, item_id, operation.get('value'))
+                changed = item_changed or changed
+            else:
+                delete_item(user_id, section, item_id)
+                changed = True
+            results.append({'op': op, 'path': f'/{section}/{item_id}'})
+        else:
+            raise ProfileEditError(f"Unsupported operation {index}: '{op}' on '{operation.get('path')}'.")
+    return changed, results
+
+
+def bump_profile_version(user_id):
+    """Mark the user's profile as changed, invalidating renders cached for the old version.
+
+    Done as an SQL increment so concurrent writers can't lose a bump. The caller commits.
+    """
+    db.session.execute(
+        db.update(User)
+        .where(User.id == user_id)
+        .values(profile_version=User.profile_version + 1, profile_fragments=None)
+    )
@@ -0,0 +1,202 @@
+import re
+from collections import namedtuple
+
+# Bump whenever prompt wording changes so cached generations from the old prompts are not reused
+PROMPT_VERSION = 2
+
+# Rough Gemini tokenizer ratio for English text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = ' [...]'
+
+
+class PromptBudget(namedtuple('PromptBudget', ['total_tokens', 'job_description_tokens', 'item_description_tokens'])):
+    """Token limits applied while building prompts.
+
+    total_tokens: target size of the whole prompt; the job description is trimmed further to fit.
+    job_description_tokens: hard cap for the pasted job description.
+    item_description_tokens: cap for each experience/project description.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            total_tokens=config.get('PROMPT_TOKEN_BUDGET', 8000),
+            job_description_tokens=config.get('PROMPT_MAX_JOB_DESCRIPTION_TOKENS', 3000),
+            item_description_tokens=config.get('PROMPT_MAX_ITEM_DESCRIPTION_TOKENS', 500),
+        )
+
+DEFAULT_BUDGET = PromptBudget(8000, 3000, 500)
+
+
+# --- Static prompt sections (built once at import) ---
+RESUME_HEADER = "Generate a professional resume tailored for the following job description, using the candidate's details provided below."
+
+RESUME_INSTRUCTIONS = "\n".join([
+    "\n--- OUTPUT FORMATTING INSTRUCTIONS ---",
+    "1.  Generate the resume content ONLY. Start directly with the candidate's name or summary. Do not include any introductory or concluding text outside the resume itself.",
+    "2.  Use Markdown-like formatting with specific markers:",
+    "    - Use `### Section Name` for main section headers (e.g., `### Experience`, `### Education`, `### Skills`).",
+    "    - Use `**Job Title**` or `**Degree Name**` for titles within sections.",
+    "    - Use `* Bullet point description` for list items under experience or projects.",
+    "    - For skills, list them comma-separated or as simple list items after the `### Skills` header.",
+    "3.  **VERY IMPORTANT: You MUST include ALL sections and ALL details provided in the 'CANDIDATE PROFILE' section above in your generated resume output.** Do not omit any provided information (Personal Information, Experience, Education, Skills, Projects).",
+    "4.  Ensure standard resume sections (Summary/Objective, Experience, Education, Skills, Projects) are present and populated with the provided data.",
+    "5.  Focus on highlighting experiences and skills relevant to the job description, but still include all provided profile information.",
+    "6.  Double-check that all profile sections (Personal Info, Experience, Education, Skills, Projects) are present in the final output if they were provided in the input profile.",
+])
+
+COVER_LETTER_STRUCTURE = "\n".join([
+    "Structure it with an introduction, body paragraphs highlighting relevant skills/experience from the profile that match the job description, and a conclusion expressing enthusiasm and call to action.",
+    "Maintain a professional and enthusiastic tone.",
+])
+
+COVER_LETTER_INSTRUCTIONS = "\n".join([
+    "\n--- INSTRUCTIONS ---",
+    "Generate only the cover letter text, starting with the salutation (e.g., 'Dear ...'). Do not include any introductory or concluding remarks outside the letter itself.",
+])
+
+_RESUME_STATIC_TOKENS = (len(RESUME_HEADER) + len(RESUME_INSTRUCTIONS)) // CHARS_PER_TOKEN
+# Never trim a job description below this, even if the profile alone exceeds the total budget
+_MIN_JOB_DESCRIPTION_TOKENS = 250
+
+
+# --- Token estimation and trimming ---
+def estimate_tokens(text):
+    """Cheap token count estimate (no tokenizer call)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_whitespace(text):
+    """Strip trailing spaces and collapse runs of blank lines, which cost tokens but carry nothing."""
+    text = re.sub(r'[ \t]+\n', '\n', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def trim_to_tokens(text, max_tokens):
+    """Shorten text to about max_tokens, preferring to cut at a line or sentence boundary."""
+    text = normalize_whitespace(text)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER))
+    cut = text[:limit]
+    boundary = max(cut.rfind('\n'), cut.rfind('. '))
+    if boundary > limit // 2: # Only back up to a boundary if that keeps most of the text
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+# --- Candidate profile fragments ---
+ProfileFragments = namedtuple('ProfileFragments', ['resume', 'cover_letter'])
+
+
+def _render_resume_fragment(profile_data, item_description_tokens):
+    parts = []
+    pi = profile_data.get('personal_info') or {}
+    parts.append("\n**Personal Information:**")
+    if pi.get('full_name'): parts.append(f"- Name: {pi['full_name']}")
+    if pi.get('phone_number'): parts.append(f"- Phone: {pi['phone_number']}")
+    if pi.get('email_address'): parts.append(f"- Email: {pi['email_address']}")
+    if pi.get('location'): parts.append(f"- Location: {pi['location']}")
+    if pi.get('linkedin_url'): parts.append(f"- LinkedIn: {pi['linkedin_url']}")
+    if pi.get('portfolio_url'): parts.append(f"- Portfolio: {pi['portfolio_url']}")
+    if pi.get('target_job'): parts.append(f"- Target Role/Summary Hint: {pi['target_job']}")
+
+    if profile_data.get('experiences'):
+        parts.append("\n**Work Experience:**")
+        for exp in profile_data['experiences']:
+            parts.append(f"- **{exp['job_title']}** at {exp.get('company_name') or 'N/A'} ({exp.get('location') or 'N/A'})")
+            parts.append(f"  {exp.get('start_date') or ''} - {exp.get('end_date') or ''}")
+            if exp.get('description'):
+                formatted_desc = trim_to_tokens(exp['description'], item_description_tokens).replace('\n', '\n    - ')
+                parts.append(f"  Responsibilities/Achievements:\n    - {formatted_desc}")
+
+    if profile_data.get('educations'):
+        parts.append("\n**Education:**")
+        for edu in profile_data['educations']:
+            parts.append(f"- **{edu['degree_name']}** in {edu.get('major') or 'N/A'}")
+            parts.append(f"  {edu.get('institution_name') or 'N/A'} ({edu.get('location') or 'N/A'})")
+            if edu.get('graduation_date'): parts.append(f"  Graduated: {edu['graduation_date']}")
+
+    if profile_data.get('skills'):
+        parts.append("\n**Skills:**")
+        parts.append("- " + ", ".join([skill['skill_name'] for skill in profile_data['skills']]))
+
+    if profile_data.get('projects'):
+        parts.append("\n**Projects:**")
+        for proj in profile_data['projects']:
+            parts.append(f"- **{proj['project_name']}**")
+            if proj.get('description'): parts.append(f"  {trim_to_tokens(proj['description'], item_description_tokens)}")
+            if proj.get('link'): parts.append(f"  Link: {proj['link']}")
+    return "\n".join(parts)
+
+
+def _render_cover_letter_fragment(profile_data):
+    parts = []
+    pi = profile_data.get('personal_info') or {}
+    parts.append(f"\nName: {pi.get('full_name') or 'N/A'}")
+    if profile_data.get('skills'):
+        skills_str = ", ".join([skill['skill_name'] for skill in profile_data['skills']])
+        parts.append(f"Key Skills: {skills_str}")
+    # dict.fromkeys de-duplicates while keeping profile order, so the prompt (and its cache key) is stable across processes
+    if profile_data.get('experiences'):
+        exp_titles = ", ".join(dict.fromkeys(exp['job_title'] for exp in profile_data['experiences']))
+        parts.append(f"Relevant Experience Areas: {exp_titles}")
+    if profile_data.get('educations'):
+        degrees = ", ".join(dict.fromkeys(edu['degree_name'] for edu in profile_data['educations']))
+        parts.append(f"Education Background: {degrees}")
+    return "\n".join(parts)
+
+
+def render_profile_fragments(profile_data, budget=DEFAULT_BUDGET):
+    """Render the candidate sections of a profile.
+
+    Not cached here: ProfileFragmentCache (profile_cache.py) keeps renders per
+    (user, profile_version), so a profile is only rendered again after it changes.
+    """
+    return ProfileFragments(
+        resume=_render_resume_fragment(profile_data, budget.item_description_tokens),
+        cover_letter=_render_cover_letter_fragment(profile_data),
+    )
+
+
+# --- Full prompts ---
+def build_resume_prompt(profile_data, job_description, budget=DEFAULT_BUDGET, fragments=None):
+    """Build the resume prompt, trimming the job description to fit the budget."""
+    fragments = fragments or render_profile_fragments(profile_data, budget)
+    remaining = budget.total_tokens - _RESUME_STATIC_TOKENS - estimate_tokens(fragments.resume)
+    jd_tokens = max(_MIN_JOB_DESCRIPTION_TOKENS, min(budget.job_description_tokens, remaining))
+    return "\n".join([
+        RESUME_HEADER,
+        "\n--- JOB DESCRIPTION ---",
+        trim_to_tokens(job_description, jd_tokens),
+        "\n--- CANDIDATE PROFILE ---",
+        fragments.resume,
+        RESUME_INSTRUCTIONS,
+    ])
+
+
+def build_cover_letter_prompt(profile_data, job_description, company_name, hiring_manager=None,
+                              additional_notes=None, budget=DEFAULT_BUDGET, fragments=None):
+    """Build the cover letter prompt, trimming the job description to fit the budget."""
+    fragments = fragments or render_profile_fragments(profile_data, budget)
+    parts = [
+        f"Generate a professional cover letter for a position based on the provided job description at {company_name}.",
+        "The letter should be tailored using the candidate's profile details below.",
+        "Address it appropriately (e.g., 'Dear Hiring Manager,' or use the provided name)." if not hiring_manager else f"Address it to {hiring_manager}.",
+        COVER_LETTER_STRUCTURE,
+    ]
+    if additional_notes:
+        parts.append(f"Incorporate the following points if relevant: {trim_to_tokens(additional_notes, budget.item_description_tokens)}")
+
+    fixed_tokens = estimate_tokens("\n".join(parts)) + estimate_tokens(fragments.cover_letter) + estimate_tokens(COVER_LETTER_INSTRUCTIONS)
+    jd_tokens = max(_MIN_JOB_DESCRIPTION_TOKENS, min(budget.job_description_tokens, budget.total_tokens - fixed_tokens))
+    parts.extend([
+        "\n--- JOB DESCRIPTION ---",
+        trim_to_tokens(job_description, jd_tokens),
+        "\n--- CANDIDATE PROFILE ---",
+        fragments.cover_letter,
+        COVER_LETTER_INSTRUCTIONS,
+    ])
+    return "\n".join(parts)
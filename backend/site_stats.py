@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .models import db, User, SiteStats, GenerationDailyStats
+
+SITE_STATS_ID = 1
+_upsert_dialects = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
+
+def rebuild_site_stats(connection):
+    """Recompute the totals row from the user table. A full scan, for setup and repair only."""
+    totals = connection.execute(
+        db.select(
+            db.func.count(User.id),
+            db.func.coalesce(db.func.sum(User.resume_generations), 0),
+            db.func.coalesce(db.func.sum(User.cover_letter_generations), 0),
+        )
+    ).one()
+    connection.execute(db.delete(SiteStats).where(SiteStats.id == SITE_STATS_ID))
+    connection.execute(db.insert(SiteStats).values(
+        id=SITE_STATS_ID, user_count=totals[0], resume_generations=totals[1], cover_letter_generations=totals[2],
+    ))
+
+
+def adjust_site_stats(connection, **deltas):
+    """Add deltas to the totals row with one atomic UPDATE, in the caller's transaction.
+
+    If the row doesn't exist yet (a database created without migrations) it is built
+    from the user table instead, which already includes the change being recorded.
+    """
+    values = {getattr(SiteStats, field): getattr(SiteStats, field) + amount for field, amount in deltas.items() if amount}
+    if not values:
+        return
+    result = connection.execute(db.update(SiteStats).where(SiteStats.id == SITE_STATS_ID).values(values))
+    if result.rowcount == 0:
+        rebuild_site_stats(connection)
+
+
+def add_daily_generations(connection, day, resume_generations=0, cover_letter_generations=0, active_users=0):
+    """Add to a day's generation bucket, creating it if needed, with a single upsert."""
+    counts = {
+        'resume_generations': resume_generations,
+        'cover_letter_generations': cover_letter_generations,
+        'active_users': active_users,
+    }
+    table = GenerationDailyStats.__table__
+    insert = _upsert_dialects.get(connection.dialect.name)
+    if insert is not None:
+        statement = insert(table).values(day=day, **counts)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.day],
+            set_={field: table.c[field] + statement.excluded[field] for field in counts},
+        ))
+        return
+    result = connection.execute(
+        db.update(table).where(table.c.day == day).values({field: table.c[field] + amount for field, amount in counts.items()})
+    )
+    if result.rowcount == 0:
+        connection.execute(db.insert(table).values(day=day, **counts))
+
+
+def record_generations(connection, applied, new_active_users, day=None):
+    """Add applied {field: amount} counter increments to the totals and today's bucket."""
+    adjust_site_stats(connection, **applied)
+    add_daily_generations(connection, day or utc_today(), active_users=new_active_users, **applied)
+
+
+def mark_active_today(connection, user_id, day=None):
+    """Record that a user generated today. Returns True the first time for each user and day."""
+    day = day or utc_today()
+    result = connection.execute(
+        db.update(User)
+        .where(User.id == user_id, db.or_(User.last_generation_on.is_(None), User.last_generation_on < day))
+        .values(last_generation_on=day)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def load_dashboard_stats(days=30, top_users=5):
+    """Everything the admin dashboard shows, in three small indexed queries.
+
+    None of them depends on the number of users: the totals are one row, the chart
+    reads at most `days` buckets by primary key, and the top users come off the
+    (resume_generations, id) index.
+    """
+    totals = db.session.get(SiteStats, SITE_STATS_ID)
+    if totals is None:
+        rebuild_site_stats(db.session.connection())
+        db.session.commit()
+        totals = db.session.get(SiteStats, SITE_STATS_ID)
+
+    today = utc_today()
+    first_day = today - timedelta(days=days - 1)
+    buckets = {
+        bucket.day: bucket for bucket in db.session.execute(
+            db.select(GenerationDailyStats).where(GenerationDailyStats.day >= first_day)
+        ).scalars()
+    }
+    daily = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        bucket = buckets.get(day)
+        daily.append({
+            'day': day.isoformat(),
+            'resume_generations': bucket.resume_generations if bucket else 0,
+            'cover_letter_generations': bucket.cover_letter_generations if bucket else 0,
+            'active_users': bucket.active_users if bucket else 0,
+        })
+
+    top = db.session.execute(
+        db.select(User.id, User.username, User.resume_generations, User.cover_letter_generations)
+        .order_by(User.resume_generations.desc(), User.id.desc())
+        .limit(top_users)
+    ).all()
+    return {
+        'user_count': totals.user_count,
+        'resume_generations': totals.resume_generations,
+        'cover_letter_generations': totals.cover_letter_generations,
+        'updated_at': totals.updated_at,
+        'daily': daily,
+        'top_users': [row._asdict() for row in top],
+    }
+
+
+# --- Keeping the totals current on every ORM insert and delete of a user ---
+def _user_inserted(mapper, connection, target):
+    adjust_site_stats(connection, user_count=1, resume_generations=target.resume_generations or 0,
+                      cover_letter_generations=target.cover_letter_generations or 0)
+
+
+def _user_deleting(mapper, connection, target):
+    # Read the counters from the row: the instance may predate increments made by other sessions
+    counts = connection.execute(
+        db.select(User.resume_generations, User.cover_letter_generations).where(User.id == target.id)
+    ).one_or_none()
+    if counts is not None:
+        adjust_site_stats(connection, user_count=-1, resume_generations=-counts[0], cover_letter_generations=-counts[1])
+
+
+def init_site_stats(app):
+    """Register the User mapper events that maintain SiteStats.
+
+    Mapper events are global rather than per app, so they are only added once.
+    Set-based deletes that bypass the ORM must call adjust_site_stats themselves.
+    """
+    if not event.contains(User, 'after_insert', _user_inserted):
+        event.listen(User, 'after_insert', _user_inserted)
+        event.listen(User, 'before_delete', _user_deleting)
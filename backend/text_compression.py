@@ -0,0 +1,94 @@
+import logging
+import zlib
+
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+try:
+    import zstandard # Optional, see TEXT_COMPRESSION_CODEC
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Stored values start with a one byte marker saying how the rest is encoded,
+# so codecs can be changed without rewriting existing rows
+RAW = b'r'
+ZLIB = b'z'
+ZSTD = b's'
+
+# Below this many bytes a compressor's header and checksum cost more than it saves
+MIN_COMPRESS_BYTES = 128
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_codec = 'zlib' # Codec for new writes, set from config by init_text_compression
+
+
+def _zstd_compress(data):
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def _zstd_decompress(payload):
+    if zstandard is None:
+        raise RuntimeError('A value is zstd-compressed but the zstandard package is not installed.')
+    return zstandard.ZstdDecompressor().decompress(payload)
+
+
+def compress_text(text, codec=None):
+    """Encode text for storage in a binary column, compressing it if that makes it smaller."""
+    data = text.encode('utf-8')
+    if len(data) >= MIN_COMPRESS_BYTES:
+        if (codec or _codec) == 'zstd':
+            marker, compressed = ZSTD, _zstd_compress(data)
+        else:
+            marker, compressed = ZLIB, zlib.compress(data, ZLIB_LEVEL)
+        if len(compressed) < len(data):
+            return marker + compressed
+    return RAW + data
+
+
+def decompress_text(value):
+    """Decode a value written by compress_text."""
+    value = bytes(value)
+    marker, payload = value[:1], value[1:]
+    if marker == ZLIB:
+        return zlib.decompress(payload).decode('utf-8')
+    if marker == ZSTD:
+        return _zstd_decompress(payload).decode('utf-8')
+    if marker == RAW:
+        return payload.decode('utf-8')
+    raise ValueError(f'Unknown compressed text marker {marker!r}')
+
+
+class CompressedText(TypeDecorator):
+    """A text column stored compressed in a binary column.
+
+    Reads and writes plain str; filtering or sorting on the column in SQL is not
+    possible, so only use it for large free text that is just loaded and displayed.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return compress_text(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value) if value is not None else None
+
+
+def init_text_compression(app):
+    """Pick the codec for new writes from TEXT_COMPRESSION_CODEC ('zlib' or 'zstd').
+
+    zstd needs the optional zstandard package; without it writes fall back to zlib.
+    Either way every codec already present in the database stays readable.
+    """
+    global _codec
+    codec = app.config.get('TEXT_COMPRESSION_CODEC', 'zlib')
+    if codec not in ('zlib', 'zstd'):
+        raise ValueError(f"Unknown TEXT_COMPRESSION_CODEC '{codec}'")
+    if codec == 'zstd' and zstandard is None:
+        logger.warning("TEXT_COMPRESSION_CODEC is 'zstd' but zstandard is not installed, using zlib")
+        codec = 'zlib'
+    _codec = codec
+    return codec
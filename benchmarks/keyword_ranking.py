@@ -0,0 +1,100 @@
+"""Benchmark TF-IDF keyword ranking against a memory-mapped document frequency table.
+
+Generates a synthetic job description corpus, builds the table the way
+`flask build-keyword-corpus` does, then prints the table size and the time to rank
+one description by frequency and by TF-IDF. A regex tokenizer and suffix-stripping
+lemmatizer stand in for NLTK (so no corpora are needed) and the result cache is off,
+so the timings are of tokenizing, term counting and scoring.
+
+    python -m benchmarks.keyword_ranking --documents 20000
+"""
+import argparse
+import bisect
+import itertools
+import os
+import random
+import re
+import statistics
+import string
+import tempfile
+import time
+
+from backend.keyword_corpus import DocumentFrequencyTable, count_document_frequencies, write_document_frequency_table
+from backend.keyword_engine import KeywordEngine, NlpResources
+
+STOP_WORDS = frozenset({'the', 'and', 'with', 'for', 'you', 'our', 'are', 'will', 'who', 'that', 'this', 'have', 'from'})
+STOP_WORD_LIST = sorted(STOP_WORDS)
+VOCABULARY_SIZE = 30000
+
+
+def make_vocabulary(rng):
+    """Pseudo-words with Zipf-like weights, so a few are in every description and most are rare."""
+    words = sorted({''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(VOCABULARY_SIZE)})
+    rng.shuffle(words)
+    return words, list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+
+def make_job_description(rng, vocabulary):
+    words, cum_weights = vocabulary
+    total = cum_weights[-1]
+    sentences = []
+    for _ in range(rng.randint(15, 30)):
+        sentence = [words[bisect.bisect(cum_weights, rng.random() * total)] for _ in range(rng.randint(6, 14))]
+        for _ in range(rng.randint(1, 3)):
+            sentence.insert(rng.randrange(len(sentence)), rng.choice(STOP_WORD_LIST))
+        sentences.append(' '.join(sentence).capitalize() + '.')
+    return ' '.join(sentences)
+
+
+def regex_loader(language):
+    resources = NlpResources(
+        stop_words=STOP_WORDS,
+        punctuation=frozenset(string.punctuation),
+        tokenize=re.compile(r"\w+|[^\w\s]").findall,
+        lemmatize=lambda word: word[:-1] if word.endswith('s') and not word.endswith('ss') else word,
+    )
+    return resources, {}
+
+
+def measure(engine, descriptions):
+    timings = []
+    for text in descriptions:
+        start = time.perf_counter()
+        engine.extract(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings), statistics.quantiles(timings, n=100)[98]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=20000, help='Job descriptions in the corpus')
+    parser.add_argument('--samples', type=int, default=500, help='Job descriptions ranked per measurement')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    builder = KeywordEngine(loader=regex_loader)
+    path = os.path.join(tempfile.mkdtemp(), 'keyword_df.bin')
+    print(f'Building a table from {args.documents} job descriptions in {path} ...')
+    start = time.perf_counter()
+    documents, frequencies = count_document_frequencies(builder, (make_job_description(rng, vocabulary) for _ in range(args.documents)))
+    terms = write_document_frequency_table(path, documents, frequencies)
+    print(f'{terms} terms, {os.path.getsize(path) / 1e6:.1f} MB, built in {time.perf_counter() - start:.1f}s')
+
+    samples = [make_job_description(rng, vocabulary) for _ in range(args.samples)]
+    words = statistics.mean(len(text.split()) for text in samples)
+    table = DocumentFrequencyTable(path)
+    print(f'\nRanking {args.samples} job descriptions of {words:.0f} words on average')
+    print(f"{'ranking':<12} {'mean ms':>9} {'p99 ms':>9}")
+    for label, df_table in (('frequency', None), ('tfidf', table)):
+        engine = KeywordEngine(loader=regex_loader, df_table=df_table)
+        engine.extract(samples[0]) # Load resources outside the timing
+        mean, p99 = measure(engine, samples)
+        print(f'{label:<12} {mean:>9.3f} {p99:>9.3f}')
+    table.close()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark per-user profile queries with and without the (user_id, id) indexes.
+
+Builds a throwaway SQLite database from the app's models, fills it with synthetic
+users, then prints the query plans and mean latency of the profile queries the app
+runs, first with the indexes dropped and then with them in place.
+
+    python -m benchmarks.profile_indexes --users 100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from backend.models import db
+
+PROFILE_TABLES = ('experience', 'education', 'skill', 'project')
+ITEMS_PER_USER = {'experience': 3, 'education': 2, 'skill': 8, 'project': 2}
+
+QUERIES = {
+    # What load_profile's selectin loads issue for each collection
+    'load collection': 'SELECT * FROM {table} WHERE user_id IN (?) ORDER BY {table}.id',
+    # The correlated counts in load_profile_summary
+    'count items': 'SELECT count(id) FROM {table} WHERE user_id = ?',
+    # Removing a user's items (save_profile diff deletes, user deletion cascade)
+    'delete items': 'DELETE FROM {table} WHERE user_id = ?',
+}
+
+
+def build_database(path, users):
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF') # Only for the bulk load
+    with conn:
+        conn.executemany(
+            'INSERT INTO user (id, username, is_admin, resume_generations, cover_letter_generations, profile_version)'
+            ' VALUES (?, ?, 0, 0, 0, 0)',
+            ((user_id, f'user{user_id}') for user_id in range(1, users + 1)),
+        )
+        # Interleave users' rows, as real sign-ups and edits would
+        rows = [user_id for user_id in range(1, users + 1) for _ in range(ITEMS_PER_USER['skill'])]
+        random.shuffle(rows)
+        conn.executemany('INSERT INTO skill (skill_name, user_id) VALUES (?, ?)', (('Skill', user_id) for user_id in rows))
+        for table, column in (('experience', 'job_title'), ('education', 'degree_name'), ('project', 'project_name')):
+            rows = [user_id for user_id in range(1, users + 1) for _ in range(ITEMS_PER_USER[table])]
+            random.shuffle(rows)
+            conn.executemany(f'INSERT INTO {table} ({column}, user_id) VALUES (?, ?)', ((table.title(), user_id) for user_id in rows))
+    return conn
+
+
+def measure(conn, users, samples):
+    """Return {(query, table): (plan, mean_ms)}."""
+    results = {}
+    user_ids = random.sample(range(1, users + 1), min(samples, users))
+    for name, template in QUERIES.items():
+        for table in PROFILE_TABLES:
+            sql = template.format(table=table)
+            plan = '; '.join(row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', (1,)))
+            timings = []
+            for user_id in user_ids:
+                start = time.perf_counter()
+                conn.execute(sql, (user_id,)).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            if name == 'delete items':
+                conn.rollback() # Keep the data for the next run
+            results[(name, table)] = (plan, statistics.mean(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--samples', type=int, default=50, help='Random users queried per measurement')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'profile_indexes.db')
+    print(f'Building {args.users} users in {path} ...')
+    conn = build_database(path, args.users)
+
+    for table in PROFILE_TABLES:
+        conn.execute(f'DROP INDEX IF EXISTS ix_{table}_user_id_id')
+    conn.execute('ANALYZE')
+    before = measure(conn, args.users, args.samples)
+
+    for table in PROFILE_TABLES:
+        conn.execute(f'CREATE INDEX ix_{table}_user_id_id ON {table} (user_id, id)')
+    conn.execute('ANALYZE')
+    after = measure(conn, args.users, args.samples)
+
+    print(f"\n{'query':<16} {'table':<11} {'before ms':>10} {'after ms':>10}  plan after")
+    for key, (plan_before, ms_before) in before.items():
+        plan_after, ms_after = after[key]
+        print(f'{key[0]:<16} {key[1]:<11} {ms_before:>10.3f} {ms_after:>10.3f}  {plan_after}')
+    print('\nPlans before:')
+    for (name, table), (plan, _) in before.items():
+        print(f'  {name:<16} {table:<11} {plan}')
+
+    conn.close()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
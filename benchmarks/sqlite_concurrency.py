@@ -0,0 +1,96 @@
+"""Stress a SQLite database from several processes, with and without the engine tuning.
+
+Each worker process plays a gunicorn worker: writers increment a generation
+counter in a loop while readers keep querying. Run once with SQLite's defaults
+(rollback journal, no lock wait) and once with the settings from db_engine.py,
+and report 'database is locked' errors and throughput for both.
+
+    python -m benchmarks.sqlite_concurrency --writers 4 --readers 4 --seconds 5
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from backend.app import create_app, db
+from backend.config import Config
+from backend.models import User
+
+PROFILES = {
+    'sqlite defaults': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT': 0},
+    'tuned (db_engine.py)': {},
+}
+
+
+def make_config(path, overrides):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        LLM_BACKEND = 'fake'
+        GENERATION_CACHE_BACKEND = 'none'
+    for key, value in overrides.items():
+        setattr(BenchConfig, key, value)
+    return BenchConfig
+
+
+def worker(role, path, overrides, seconds, results):
+    app = create_app(make_config(path, overrides))
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    with app.app_context():
+        while time.monotonic() < deadline:
+            try:
+                if role == 'writer':
+                    db.session.execute(db.update(User).values(resume_generations=User.resume_generations + 1))
+                else:
+                    db.session.execute(db.select(User.resume_generations)).all()
+                db.session.commit()
+                done += 1
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+    results.put((role, done, errors))
+
+
+def run(profile, overrides, args):
+    path = os.path.join(tempfile.mkdtemp(), 'stress.db')
+    app = create_app(make_config(path, overrides))
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='stressuser'))
+        db.session.commit()
+        db.engine.dispose()
+
+    results = multiprocessing.Queue()
+    roles = ['writer'] * args.writers + ['reader'] * args.readers
+    processes = [multiprocessing.Process(target=worker, args=(role, path, overrides, args.seconds, results)) for role in roles]
+    for process in processes:
+        process.start()
+    totals = {'writer': [0, 0], 'reader': [0, 0]}
+    for _ in processes:
+        role, done, errors = results.get()
+        totals[role][0] += done
+        totals[role][1] += errors
+    for process in processes:
+        process.join()
+
+    with app.app_context():
+        counter = db.session.execute(db.select(User.resume_generations)).scalar()
+    print(f"{profile:<22} writes/s {totals['writer'][0] / args.seconds:>8.0f}  reads/s {totals['reader'][0] / args.seconds:>8.0f}"
+          f"  locked errors {totals['writer'][1] + totals['reader'][1]:>6}  counter {counter} (expected {totals['writer'][0]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    for profile, overrides in PROFILES.items():
+        run(profile, overrides, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark database size and read latency of plain vs compressed description columns.
+
+Builds two throwaway SQLite databases with the same synthetic profiles, one storing
+experience and project descriptions as plain text (the old schema) and one storing
+them with backend.text_compression (the current schema), then prints file sizes and
+the mean time to read and decode one user's descriptions, as load_profile does.
+
+    python -m benchmarks.text_compression --users 20000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from backend.text_compression import compress_text, decompress_text
+
+ITEMS_PER_USER = {'experience': 3, 'project': 2}
+
+# Resume-style vocabulary, so the text compresses like real descriptions rather than random bytes
+VERBS = ['Led', 'Built', 'Designed', 'Migrated', 'Automated', 'Reduced', 'Improved', 'Launched', 'Owned', 'Mentored']
+OBJECTS = ['the billing service', 'a data pipeline', 'CI/CD workflows', 'the public API', 'internal dashboards',
+           'customer onboarding', 'the search index', 'on-call tooling', 'a React front end', 'ETL jobs']
+RESULTS = ['cutting latency by {n}%', 'saving ${n}k per year', 'for {n} enterprise customers',
+           'with {n}% fewer incidents', 'across {n} teams', 'handling {n}k requests per second']
+
+
+def make_description(rng):
+    bullets = []
+    for _ in range(rng.randint(3, 10)):
+        result = rng.choice(RESULTS).format(n=rng.randint(2, 90))
+        bullets.append(f'{rng.choice(VERBS)} {rng.choice(OBJECTS)}, {result}.')
+    return '\n'.join(bullets)
+
+
+def build_database(path, users, compressed, seed):
+    rng = random.Random(seed) # Same content in both databases
+    column_type = 'BLOB' if compressed else 'TEXT'
+    encode = compress_text if compressed else (lambda text: text)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF') # Only for the bulk load
+    for table in ITEMS_PER_USER:
+        conn.execute(f'CREATE TABLE {table} (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, description {column_type})')
+        conn.execute(f'CREATE INDEX ix_{table}_user_id_id ON {table} (user_id, id)')
+    raw_bytes = 0
+    with conn:
+        for table, per_user in ITEMS_PER_USER.items():
+            rows = []
+            for user_id in range(1, users + 1):
+                for _ in range(per_user):
+                    text = make_description(rng)
+                    raw_bytes += len(text.encode('utf-8'))
+                    rows.append((user_id, encode(text)))
+            conn.executemany(f'INSERT INTO {table} (user_id, description) VALUES (?, ?)', rows)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.execute('VACUUM')
+    return conn, raw_bytes
+
+
+def measure_reads(conn, users, samples, compressed):
+    decode = decompress_text if compressed else (lambda value: value)
+    timings = []
+    for user_id in random.sample(range(1, users + 1), min(samples, users)):
+        start = time.perf_counter()
+        for table in ITEMS_PER_USER:
+            rows = conn.execute(f'SELECT description FROM {table} WHERE user_id = ? ORDER BY id', (user_id,)).fetchall()
+            [decode(value) for (value,) in rows]
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings), statistics.quantiles(timings, n=100)[98]
+
+
+def measure_scan(conn, compressed):
+    """Time reading and decoding every description, a proxy for cold-cache and backup cost."""
+    decode = decompress_text if compressed else (lambda value: value)
+    start = time.perf_counter()
+    for table in ITEMS_PER_USER:
+        for (value,) in conn.execute(f'SELECT description FROM {table}'):
+            decode(value)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--samples', type=int, default=500, help='Random users read per measurement')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    results = {}
+    for label, compressed in (('plain', False), ('compressed', True)):
+        path = os.path.join(directory, f'{label}.db')
+        print(f'Building {args.users} users in {path} ...')
+        conn, raw_bytes = build_database(path, args.users, compressed, args.seed)
+        read_mean, read_p99 = measure_reads(conn, args.users, args.samples, compressed)
+        scan_ms = measure_scan(conn, compressed)
+        conn.close()
+        results[label] = (os.path.getsize(path), read_mean, read_p99, scan_ms)
+        os.remove(path)
+
+    print(f'\nDescription text: {raw_bytes / 1e6:.1f} MB uncompressed')
+    print(f"{'schema':<12} {'db size MB':>11} {'read ms':>9} {'read p99':>9} {'full scan ms':>13}")
+    for label, (size, read_mean, read_p99, scan_ms) in results.items():
+        print(f'{label:<12} {size / 1e6:>11.1f} {read_mean:>9.3f} {read_p99:>9.3f} {scan_ms:>13.0f}')
+    plain_size, compressed_size = results['plain'][0], results['compressed'][0]
+    print(f'\nCompressed database is {compressed_size / plain_size:.0%} of the plain one.')
+
+
+if __name__ == '__main__':
+    main()
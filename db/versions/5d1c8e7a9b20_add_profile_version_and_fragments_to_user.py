@@ -0,0 +1,29 @@
+"""Add profile version and cached prompt fragments to User
+
+Revision ID: 5d1c8e7a9b20
+Revises: 49223461e8e2
+Create Date: 2026-10-18 10:12:41.503218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1c8e7a9b20'
+down_revision = '49223461e8e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        # Provide server_default='0' for SQLite compatibility when adding NOT NULL column
+        batch_op.add_column(sa.Column('profile_version', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('profile_fragments', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('profile_fragments')
+        batch_op.drop_column('profile_version')
@@ -0,0 +1,30 @@
+"""Add (user_id, id) indexes to profile tables
+
+Revision ID: 7b3e2f9c4a61
+Revises: 5d1c8e7a9b20
+Create Date: 2026-10-18 14:03:27.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3e2f9c4a61'
+down_revision = '5d1c8e7a9b20'
+branch_labels = None
+depends_on = None
+
+# personal_info.user_id already has an index through its unique constraint, as does user.username
+PROFILE_TABLES = ('experience', 'education', 'skill', 'project')
+
+
+def upgrade():
+    # Composite so per-user lookups come back already ordered by id, without a sort step
+    for table in PROFILE_TABLES:
+        op.create_index(f'ix_{table}_user_id_id', table, ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    for table in PROFILE_TABLES:
+        op.drop_index(f'ix_{table}_user_id_id', table_name=table)
@@ -0,0 +1,41 @@
+"""Add the background job table, so any worker process can report a job's status
+
+Revision ID: a4d29c6e0b57
+Revises: f1a6e8b27d90
+Create Date: 2026-10-18 22:05:41.118230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d29c6e0b57'
+down_revision = 'f1a6e8b27d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('background_job',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('queue', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('progress_done', sa.Integer(), nullable=True),
+    sa.Column('progress_total', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('timeout_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_background_job_user_id_status', 'background_job', ['user_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_background_job_user_id_status', table_name='background_job')
+    op.drop_table('background_job')
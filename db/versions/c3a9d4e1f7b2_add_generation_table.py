@@ -0,0 +1,45 @@
+"""Add generation history table
+
+Revision ID: c3a9d4e1f7b2
+Revises: 7b3e2f9c4a61
+Create Date: 2026-10-18 16:21:09.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a9d4e1f7b2'
+down_revision = '7b3e2f9c4a61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('generation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('input_hash', sa.String(length=64), nullable=False),
+    sa.Column('model_name', sa.String(length=100), nullable=True),
+    sa.Column('latency_ms', sa.Integer(), nullable=True),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('output_tokens', sa.Integer(), nullable=True),
+    sa.Column('cached', sa.Boolean(), nullable=False),
+    sa.Column('output', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('generation', schema=None) as batch_op:
+        batch_op.create_index('ix_generation_user_id_id', ['user_id', 'id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_generation_input_hash'), ['input_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('generation', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_generation_input_hash'))
+        batch_op.drop_index('ix_generation_user_id_id')
+
+    op.drop_table('generation')
@@ -0,0 +1,91 @@
+"""Store experience and project descriptions compressed
+
+Revision ID: d8f2b6a05c13
+Revises: c3a9d4e1f7b2
+Create Date: 2026-10-18 17:45:52.630914
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f2b6a05c13'
+down_revision = 'c3a9d4e1f7b2'
+branch_labels = None
+depends_on = None
+
+TABLES = ('experience', 'project')
+# Rows rewritten per statement, so big tables never have to fit in memory
+BATCH_SIZE = 500
+
+# Frozen copy of the storage format in backend/text_compression.py, so this
+# migration keeps producing the same bytes if the app's module changes later
+RAW, ZLIB, ZSTD = b'r', b'z', b's'
+MIN_COMPRESS_BYTES = 128
+
+
+def _to_text(value):
+    # Before the rewrite a value may come back as str, or as bytes after the type change
+    return value if isinstance(value, str) else bytes(value).decode('utf-8')
+
+
+def _compress(value):
+    data = _to_text(value).encode('utf-8')
+    if len(data) >= MIN_COMPRESS_BYTES:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            return ZLIB + compressed
+    return RAW + data
+
+
+def _decompress(value):
+    value = bytes(value)
+    marker, payload = value[:1], value[1:]
+    if marker == ZLIB:
+        payload = zlib.decompress(payload)
+    elif marker == ZSTD:
+        import zstandard
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    return payload # Raw utf-8, converted back to text by the column type change
+
+
+def _rewrite(table, convert):
+    """Apply convert to every non-null description, BATCH_SIZE rows at a time in id order."""
+    conn = op.get_bind()
+    rows_table = sa.table(table, sa.column('id', sa.Integer), sa.column('description'))
+    update = (
+        rows_table.update()
+        .where(rows_table.c.id == sa.bindparam('row_id'))
+        .values(description=sa.bindparam('value', type_=sa.LargeBinary))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(rows_table.c.id, rows_table.c.description)
+            .where(rows_table.c.id > last_id, rows_table.c.description.isnot(None))
+            .order_by(rows_table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(update, [{'row_id': row_id, 'value': convert(value)} for row_id, value in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('description', existing_type=sa.Text(), type_=sa.LargeBinary(),
+                                  postgresql_using="convert_to(description, 'UTF8')")
+        _rewrite(table, _compress)
+
+
+def downgrade():
+    for table in TABLES:
+        _rewrite(table, _decompress)
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('description', existing_type=sa.LargeBinary(), type_=sa.Text(),
+                                  postgresql_using="convert_from(description, 'UTF8')")
@@ -0,0 +1,29 @@
+"""Add indexes for searching and sorting the admin user list
+
+Revision ID: e5b7c1d93a48
+Revises: d8f2b6a05c13
+Create Date: 2026-10-18 19:12:40.275513
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b7c1d93a48'
+down_revision = 'd8f2b6a05c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expression index for case-insensitive username prefix search
+    op.create_index('ix_user_username_lower', 'user', [sa.text('lower(username)')], unique=False)
+    op.create_index('ix_user_resume_generations_id', 'user', ['resume_generations', 'id'], unique=False)
+    op.create_index('ix_user_cover_letter_generations_id', 'user', ['cover_letter_generations', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_cover_letter_generations_id', table_name='user')
+    op.drop_index('ix_user_resume_generations_id', table_name='user')
+    op.drop_index('ix_user_username_lower', table_name='user')
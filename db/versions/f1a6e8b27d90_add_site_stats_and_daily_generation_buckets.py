@@ -0,0 +1,63 @@
+"""Add site stats and daily generation buckets for the admin dashboard
+
+Revision ID: f1a6e8b27d90
+Revises: e5b7c1d93a48
+Create Date: 2026-10-18 20:34:18.551602
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a6e8b27d90'
+down_revision = 'e5b7c1d93a48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('site_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_count', sa.Integer(), nullable=False),
+    sa.Column('resume_generations', sa.Integer(), nullable=False),
+    sa.Column('cover_letter_generations', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('generation_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('resume_generations', sa.Integer(), nullable=False),
+    sa.Column('cover_letter_generations', sa.Integer(), nullable=False),
+    sa.Column('active_users', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_generation_on', sa.Date(), nullable=True))
+
+    # Backfill: totals from the users' counters, and days from the generation history
+    # (the only per-day record of earlier generations)
+    op.execute(
+        "INSERT INTO site_stats (id, user_count, resume_generations, cover_letter_generations, updated_at) "
+        "SELECT 1, count(id), coalesce(sum(resume_generations), 0), coalesce(sum(cover_letter_generations), 0), "
+        "CURRENT_TIMESTAMP FROM \"user\""
+    )
+    # SQLite has no DATE type to cast to; date() gives the same YYYY-MM-DD the ORM stores
+    day = 'date(created_at)' if op.get_bind().dialect.name == 'sqlite' else 'CAST(created_at AS DATE)'
+    op.execute(
+        "INSERT INTO generation_daily_stats (day, resume_generations, cover_letter_generations, active_users) "
+        f"SELECT {day}, "
+        "sum(CASE WHEN kind = 'resume' THEN 1 ELSE 0 END), "
+        "sum(CASE WHEN kind = 'cover_letter' THEN 1 ELSE 0 END), "
+        "count(DISTINCT user_id) "
+        f"FROM generation GROUP BY {day}"
+    )
+
+
+def downgrade():
+    # A plain DROP COLUMN (SQLite 3.35+): a batch rebuild of the user table would silently
+    # drop the ix_user_username_lower expression index the previous revision removes
+    op.drop_column('user', 'last_generation_on')
+
+    op.drop_table('generation_daily_stats')
+    op.drop_table('site_stats')
@@ -0,0 +1,94 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const bulkActions = document.getElementById('bulk-actions');
+    const actionSelect = document.getElementById('bulk-action');
+    const selectedBtn = document.getElementById('bulk-selected');
+    const filterBtn = document.getElementById('bulk-filter');
+    const bulkStatus = document.getElementById('bulk-status');
+    const selectAll = document.getElementById('select-all-users');
+
+    const POLL_INTERVAL_MS = 1000;
+
+    selectAll.addEventListener('change', () => {
+        document.querySelectorAll('.user-select:not(:disabled)').forEach(box => { box.checked = selectAll.checked; });
+    });
+
+    function selectedIds() {
+        return Array.from(document.querySelectorAll('.user-select:checked')).map(box => parseInt(box.value, 10));
+    }
+
+    function setBusy(busy) {
+        selectedBtn.disabled = busy;
+        filterBtn.disabled = busy;
+    }
+
+    // --- Submit a bulk job, then poll it until it finishes ---
+    async function startBulkAction(body, description) {
+        const action = body.action;
+        if (action !== 'export' && !confirm(`Really ${action} ${description}? This runs in the background and cannot be undone.`)) {
+            return;
+        }
+        setBusy(true);
+        bulkStatus.textContent = 'Starting...';
+        try {
+            const response = await fetch(bulkActions.dataset.url, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(body),
+            });
+            const data = await response.json();
+            if (!response.ok) {
+                throw new Error(data.error || `HTTP error! status: ${response.status}`);
+            }
+            await pollJob(data.status_url);
+        } catch (error) {
+            console.error('Bulk action failed:', error);
+            bulkStatus.textContent = `Error: ${error.message}`;
+            setBusy(false);
+        }
+    }
+
+    async function pollJob(statusUrl) {
+        const response = await fetch(statusUrl);
+        const job = await response.json();
+        if (!response.ok) {
+            throw new Error(job.error || `HTTP error! status: ${response.status}`);
+        }
+        if (job.progress) {
+            bulkStatus.textContent = `${job.status}: ${job.progress.done} / ${job.progress.total} users`;
+        } else {
+            bulkStatus.textContent = job.status;
+        }
+        if (job.status === 'queued' || job.status === 'running') {
+            setTimeout(() => pollJob(statusUrl).catch(error => {
+                bulkStatus.textContent = `Error: ${error.message}`;
+                setBusy(false);
+            }), POLL_INTERVAL_MS);
+            return;
+        }
+        setBusy(false);
+        if (job.status === 'failed') {
+            bulkStatus.textContent = `Failed: ${job.error}`;
+        } else if (job.download_url) {
+            window.location.href = job.download_url;
+            bulkStatus.textContent = `Exported ${job.result.users} users.`;
+        } else {
+            bulkStatus.textContent = `Done: ${job.result.users} users. Reloading...`;
+            window.location.reload();
+        }
+    }
+
+    selectedBtn.addEventListener('click', () => {
+        const ids = selectedIds();
+        if (!ids.length) {
+            bulkStatus.textContent = 'Select at least one user.';
+            return;
+        }
+        startBulkAction({ action: actionSelect.value, user_ids: ids }, `${ids.length} selected users`);
+    });
+
+    filterBtn.addEventListener('click', () => {
+        const q = bulkActions.dataset.q;
+        startBulkAction({ action: actionSelect.value, scope: 'filter', q },
+                        q ? `every user whose name starts with "${q}"` : 'EVERY user');
+    });
+});
@@ -11,8 +11,29 @@ document.addEventListener('DOMContentLoaded', () => {
     const copyBtn = document.getElementById('copy-cl-btn');
     const copyStatus = document.getElementById('copy-cl-status');
 
+    const profileCheckMessage = document.getElementById('profile-check-message');
+
     let generatedCoverLetter = ''; // Store the generated text
 
+    // --- Check the profile has what a cover letter needs (at least a name) ---
+    async function checkProfile() {
+        try {
+            const response = await fetch('/api/profile/summary');
+            if (!response.ok) {
+                if (response.status === 401) { // Unauthorized
+                    window.location.href = '/auth/login'; // Redirect to login
+                }
+                return; // Let the backend decide on other errors
+            }
+            const summary = await response.json();
+            const ready = Boolean(summary.complete?.cover_letter);
+            profileCheckMessage.style.display = ready ? 'none' : 'block';
+            generateBtn.disabled = !ready;
+        } catch (error) {
+            console.error('Error checking profile:', error); // Backend will still validate on submit
+        }
+    }
+
     coverLetterForm.addEventListener('submit', async (e) => {
         e.preventDefault();
         generateStatus.textContent = '';
@@ -32,17 +53,21 @@ document.addEventListener('DOMContentLoaded', () => {
         };
 
         try {
+            // Submit as a background job so the request doesn't hold a server worker
             const response = await fetch('/api/generate_cover_letter', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(payload),
+                body: JSON.stringify({ ...payload, async: true }),
             });
 
-            const result = await response.json();
+            let result = await response.json();
 
             if (response.ok) {
+                if (response.status === 202) {
+                    result = await waitForJob(result.job_id);
+                }
                 generatedCoverLetter = result.cover_letter_text; // Store original for copy
 
                 // Clean the text for display
@@ -79,6 +104,24 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    // --- Poll a background generation job until it finishes ---
+    async function waitForJob(jobId, intervalMs = 1500) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+            const response = await fetch(`/api/jobs/${jobId}`);
+            const job = await response.json();
+            if (!response.ok) {
+                throw new Error(job.error || `HTTP error! status: ${response.status}`);
+            }
+            if (job.status === 'succeeded') {
+                return job.result;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Generation failed.');
+            }
+        }
+    }
+
     // --- Copy to Clipboard ---
     copyBtn.addEventListener('click', async () => {
         if (!generatedCoverLetter || !navigator.clipboard) {
@@ -99,4 +142,7 @@ document.addEventListener('DOMContentLoaded', () => {
              setTimeout(() => { copyStatus.textContent = ''; }, 3000);
         }
     });
+
+    // --- Initial check ---
+    checkProfile();
 });
@@ -4,6 +4,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const generateBtn = document.getElementById('generate-btn');
     const generateStatus = document.getElementById('generate-status');
     const profileCheckMessage = document.getElementById('profile-check-message');
+    const resumeOutput = document.getElementById('resume-output');
     // const loadingIndicator = document.getElementById('loading-indicator'); // Remove this line
     // Keyword elements
     const analyzeKeywordsBtn = document.getElementById('analyze-keywords-btn');
@@ -16,7 +17,8 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- Check if profile exists and fetch skills ---
     async function checkProfileAndFetchSkills() { // Renamed function
         try {
-            const response = await fetch('/api/get_profile');
+            // The summary carries only counts, flags and skill names, not the full profile
+            const response = await fetch('/api/profile/summary');
             if (!response.ok) {
                  if (response.status === 401) { // Unauthorized
                     window.location.href = '/auth/login'; // Redirect to login
@@ -29,10 +31,10 @@ document.addEventListener('DOMContentLoaded', () => {
             const data = await response.json();
 
             // Store user skills (lowercase for easier comparison)
-            userSkills = data.skills?.map(skill => skill.skill_name.toLowerCase()) || [];
+            userSkills = data.skills?.map(skill => skill.toLowerCase()) || [];
 
             // Basic check: Does personal info or experience exist?
-            const profileExists = (data.personal_info && data.personal_info.full_name) || (data.experiences && data.experiences.length > 0);
+            const profileExists = data.complete?.resume;
 
             if (!profileExists) {
                 profileCheckMessage.style.display = 'block';
@@ -165,7 +167,8 @@ document.addEventListener('DOMContentLoaded', () => {
         }
 
         try {
-            const response = await fetch('/api/generate', {
+            // Stream the resume so text shows up as soon as the model produces it
+            const response = await fetch('/api/generate/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -173,21 +176,29 @@ document.addEventListener('DOMContentLoaded', () => {
                 body: JSON.stringify({ job_description: jobDescription }),
             });
 
-            const result = await response.json();
-
-            if (response.ok) {
-                // Store the result in sessionStorage to pass to the next page
-                sessionStorage.setItem('generatedResume', result.resume_text);
-                // Redirect to the resume display page
-                window.location.href = '/resume_display';
-            } else {
-                 if (response.status === 401) { // Unauthorized
+            if (!response.ok) {
+                if (response.status === 401) { // Unauthorized
                     window.location.href = '/auth/login'; // Redirect to login
                     return;
                 }
+                const result = await response.json();
                 throw new Error(result.error || `HTTP error! status: ${response.status}`);
             }
 
+            let resumeText;
+            if ((response.headers.get('Content-Type') || '').startsWith('text/event-stream')) {
+                resumeText = await readResumeStream(response);
+            } else {
+                // Streaming is disabled on the server, which answers like /api/generate
+                const result = await response.json();
+                resumeText = result.resume_text;
+            }
+
+            // Store the result in sessionStorage to pass to the next page
+            sessionStorage.setItem('generatedResume', resumeText);
+            // Redirect to the resume display page
+            window.location.href = '/resume_display';
+
         } catch (error) {
             console.error('Error generating resume:', error);
             generateStatus.textContent = `Error generating resume: ${error.message}`;
@@ -198,6 +209,50 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    // --- Read Server-Sent Events from the streaming endpoint ---
+    // Renders chunks into the resume preview as they arrive and resolves with the full text.
+    async function readResumeStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const pre = document.createElement('pre');
+        resumeOutput.innerHTML = '';
+        resumeOutput.appendChild(pre);
+
+        let buffer = '';
+        let resumeText = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                throw new Error('Connection closed before generation finished.');
+            }
+            buffer += decoder.decode(value, { stream: true });
+
+            // Events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let eventName = 'message';
+                let data = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) eventName = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                const payload = data ? JSON.parse(data) : {};
+
+                if (eventName === 'chunk') {
+                    resumeText += payload.text;
+                    pre.textContent = resumeText;
+                } else if (eventName === 'done') {
+                    return resumeText;
+                } else if (eventName === 'error') {
+                    throw new Error(payload.error || 'Generation failed.');
+                }
+            }
+        }
+    }
+
     // --- Initial Check ---
     checkProfileAndFetchSkills(); // Call the renamed function
 });
@@ -19,6 +19,14 @@ document.addEventListener('DOMContentLoaded', () => {
     const saveStatus = document.getElementById('save-status');
     const usernameDisplay = document.getElementById('username-display'); // Get username from template for now
 
+    // Autosave a few seconds after the last edit. The server only writes what changed,
+    // and unchanged forms aren't sent at all.
+    const AUTOSAVE_DELAY_MS = 3000;
+    let autosaveTimer = null;
+    let saveInFlight = false;
+    let saveQueued = false;
+    let lastSavedPayload = null;
+
     // --- Load existing profile data ---
     async function loadProfileData() {
         try {
@@ -32,6 +40,7 @@ document.addEventListener('DOMContentLoaded', () => {
             }
             const data = await response.json();
             populateForm(data);
+            lastSavedPayload = JSON.stringify(collectFormData().formData);
         } catch (error) {
             console.error('Error loading profile data:', error);
             saveStatus.textContent = 'Error loading profile data.';
@@ -67,7 +76,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         // Skills
         skillsList.innerHTML = ''; // Clear existing
-        data.skills?.forEach(skill => addSkillToList(skill.skill_name));
+        data.skills?.forEach(skill => addSkillToList(skill.skill_name, skill.id));
 
         // Projects
         projectEntries.innerHTML = ''; // Clear existing
@@ -78,6 +87,7 @@ document.addEventListener('DOMContentLoaded', () => {
     function addExperienceEntry(data = {}) {
         const templateContent = experienceTemplate.content.cloneNode(true);
         const entryDiv = templateContent.querySelector('.experience-entry');
+        if (data.id) entryDiv.dataset.id = data.id;
         if (data.job_title) entryDiv.querySelector('[name="exp_job_title"]').value = data.job_title;
         if (data.company_name) entryDiv.querySelector('[name="exp_company_name"]').value = data.company_name;
         if (data.location) entryDiv.querySelector('[name="exp_location"]').value = data.location;
@@ -85,36 +95,38 @@ document.addEventListener('DOMContentLoaded', () => {
         if (data.end_date) entryDiv.querySelector('[name="exp_end_date"]').value = data.end_date;
         if (data.description) entryDiv.querySelector('[name="exp_description"]').value = data.description;
 
-        entryDiv.querySelector('.remove-entry').addEventListener('click', () => entryDiv.remove());
+        entryDiv.querySelector('.remove-entry').addEventListener('click', () => { entryDiv.remove(); scheduleAutosave(); });
         experienceEntries.appendChild(templateContent);
     }
 
     function addEducationEntry(data = {}) {
         const templateContent = educationTemplate.content.cloneNode(true);
         const entryDiv = templateContent.querySelector('.education-entry');
+        if (data.id) entryDiv.dataset.id = data.id;
         if (data.degree_name) entryDiv.querySelector('[name="edu_degree_name"]').value = data.degree_name;
         if (data.major) entryDiv.querySelector('[name="edu_major"]').value = data.major;
         if (data.institution_name) entryDiv.querySelector('[name="edu_institution_name"]').value = data.institution_name;
         if (data.location) entryDiv.querySelector('[name="edu_location"]').value = data.location;
         if (data.graduation_date) entryDiv.querySelector('[name="edu_graduation_date"]').value = data.graduation_date;
 
-        entryDiv.querySelector('.remove-entry').addEventListener('click', () => entryDiv.remove());
+        entryDiv.querySelector('.remove-entry').addEventListener('click', () => { entryDiv.remove(); scheduleAutosave(); });
         educationEntries.appendChild(templateContent);
     }
 
      function addProjectEntry(data = {}) {
         const templateContent = projectTemplate.content.cloneNode(true);
         const entryDiv = templateContent.querySelector('.project-entry');
+        if (data.id) entryDiv.dataset.id = data.id;
         if (data.project_name) entryDiv.querySelector('[name="proj_project_name"]').value = data.project_name;
         if (data.description) entryDiv.querySelector('[name="proj_description"]').value = data.description;
         if (data.link) entryDiv.querySelector('[name="proj_link"]').value = data.link;
 
-        entryDiv.querySelector('.remove-entry').addEventListener('click', () => entryDiv.remove());
+        entryDiv.querySelector('.remove-entry').addEventListener('click', () => { entryDiv.remove(); scheduleAutosave(); });
         projectEntries.appendChild(templateContent);
     }
 
     // --- Skill Management ---
-    function addSkillToList(skillName) {
+    function addSkillToList(skillName, id) {
         if (!skillName || skillName.trim() === '') return;
         // Check if skill already exists (case-insensitive)
         const existingSkills = Array.from(skillsList.querySelectorAll('.skill-name')).map(span => span.textContent.toLowerCase());
@@ -125,7 +137,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const templateContent = skillTemplate.content.cloneNode(true);
         const skillItem = templateContent.querySelector('.skill-item');
         skillItem.querySelector('.skill-name').textContent = skillName.trim();
-        skillItem.querySelector('.remove-skill').addEventListener('click', () => skillItem.remove());
+        if (id) skillItem.dataset.id = id;
+        skillItem.querySelector('.remove-skill').addEventListener('click', () => { skillItem.remove(); scheduleAutosave(); });
         skillsList.appendChild(templateContent);
     }
 
@@ -133,6 +146,7 @@ document.addEventListener('DOMContentLoaded', () => {
         addSkillToList(newSkillInput.value);
         newSkillInput.value = ''; // Clear input
         newSkillInput.focus();
+        scheduleAutosave();
     });
 
     newSkillInput.addEventListener('keypress', (e) => {
@@ -140,6 +154,7 @@ document.addEventListener('DOMContentLoaded', () => {
             e.preventDefault(); // Prevent form submission
             addSkillToList(newSkillInput.value);
             newSkillInput.value = '';
+            scheduleAutosave();
         }
     });
 
@@ -152,12 +167,13 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- Save Profile Data ---
     const saveProfileBtn = document.getElementById('save-profile'); // Get button
 
-    profileForm.addEventListener('submit', async (e) => {
-        e.preventDefault();
-        saveStatus.textContent = 'Saving...';
-        saveStatus.className = 'status-message';
-        saveProfileBtn.disabled = true; // Disable button
+    // Existing rows carry their id so the server can update them in place
+    function entryId(element) {
+        return element.dataset.id ? Number(element.dataset.id) : undefined;
+    }
 
+    // Returns the payload plus the DOM element behind each item, to attach new ids to after saving
+    function collectFormData() {
         const formData = {
             personal_info: {
                 full_name: document.getElementById('full_name').value,
@@ -173,10 +189,13 @@ document.addEventListener('DOMContentLoaded', () => {
             skills: [],
             projects: []
         };
+        const elements = { experiences: [], educations: [], skills: [], projects: [] };
 
         // Collect experiences
         experienceEntries.querySelectorAll('.experience-entry').forEach(entry => {
+            elements.experiences.push(entry);
             formData.experiences.push({
+                id: entryId(entry),
                 job_title: entry.querySelector('[name="exp_job_title"]').value,
                 company_name: entry.querySelector('[name="exp_company_name"]').value,
                 location: entry.querySelector('[name="exp_location"]').value,
@@ -188,7 +207,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
         // Collect educations
         educationEntries.querySelectorAll('.education-entry').forEach(entry => {
+            elements.educations.push(entry);
             formData.educations.push({
+                id: entryId(entry),
                 degree_name: entry.querySelector('[name="edu_degree_name"]').value,
                 major: entry.querySelector('[name="edu_major"]').value,
                 institution_name: entry.querySelector('[name="edu_institution_name"]').value,
@@ -198,32 +219,77 @@ document.addEventListener('DOMContentLoaded', () => {
         });
 
         // Collect skills
-        skillsList.querySelectorAll('.skill-item .skill-name').forEach(skillSpan => {
-             formData.skills.push({ skill_name: skillSpan.textContent });
+        skillsList.querySelectorAll('.skill-item').forEach(skillItem => {
+            elements.skills.push(skillItem);
+            formData.skills.push({ id: entryId(skillItem), skill_name: skillItem.querySelector('.skill-name').textContent });
         });
 
         // Collect projects
         projectEntries.querySelectorAll('.project-entry').forEach(entry => {
+            elements.projects.push(entry);
             formData.projects.push({
+                id: entryId(entry),
                 project_name: entry.querySelector('[name="proj_project_name"]').value,
                 description: entry.querySelector('[name="proj_description"]').value,
                 link: entry.querySelector('[name="proj_link"]').value,
             });
         });
 
+        return { formData, elements };
+    }
+
+    // Store the ids returned by the server on the entries they belong to
+    function applySavedIds(elements, ids) {
+        Object.keys(elements).forEach(section => {
+            elements[section].forEach((element, index) => {
+                const id = ids?.[section]?.[index];
+                if (id) element.dataset.id = id;
+                else delete element.dataset.id; // Dropped by the server (e.g. left blank)
+            });
+        });
+    }
+
+    // The payload as it reads once the server's ids are on the entries. Built from what was
+    // sent, not the live form, so edits made while the save was in flight still count as unsaved.
+    function savedPayload(formData, ids) {
+        ['experiences', 'educations', 'skills', 'projects'].forEach(section => {
+            formData[section].forEach((item, index) => {
+                const id = ids?.[section]?.[index]; // Same rule as applySavedIds
+                item.id = id ? Number(id) : undefined;
+            });
+        });
+        return JSON.stringify(formData);
+    }
+
+    async function saveProfile({ autosave = false } = {}) {
+        if (saveInFlight) { // Save again once the current request finishes
+            saveQueued = true;
+            return;
+        }
+        const { formData, elements } = collectFormData();
+        const payload = JSON.stringify(formData);
+        if (autosave && payload === lastSavedPayload) return; // Nothing changed
+
+        saveInFlight = true;
+        saveStatus.textContent = autosave ? 'Autosaving...' : 'Saving...';
+        saveStatus.className = 'status-message';
+        saveProfileBtn.disabled = true; // Disable button
+
         try {
             const response = await fetch('/api/save_profile', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(formData),
+                body: payload,
             });
 
             const result = await response.json();
 
             if (response.ok) {
-                saveStatus.textContent = result.message || 'Profile saved successfully!';
+                applySavedIds(elements, result.ids);
+                lastSavedPayload = savedPayload(formData, result.ids);
+                saveStatus.textContent = autosave ? 'All changes saved.' : (result.message || 'Profile saved successfully!');
                 saveStatus.className = 'status-message';
             } else {
                  if (response.status === 401) { // Unauthorized
@@ -237,10 +303,28 @@ document.addEventListener('DOMContentLoaded', () => {
             saveStatus.textContent = `Error saving profile: ${error.message}`;
             saveStatus.className = 'status-message error';
         } finally {
+            saveInFlight = false;
             saveProfileBtn.disabled = false; // Re-enable button
             // Optionally clear the status message after a few seconds
             setTimeout(() => { saveStatus.textContent = ''; }, 5000);
+            if (saveQueued) {
+                saveQueued = false;
+                scheduleAutosave();
+            }
         }
+    }
+
+    function scheduleAutosave() {
+        clearTimeout(autosaveTimer);
+        autosaveTimer = setTimeout(() => saveProfile({ autosave: true }), AUTOSAVE_DELAY_MS);
+    }
+
+    profileForm.addEventListener('input', scheduleAutosave);
+
+    profileForm.addEventListener('submit', async (e) => {
+        e.preventDefault();
+        clearTimeout(autosaveTimer);
+        await saveProfile();
     });
 
     // --- Initial Load ---
@@ -15,6 +15,8 @@ class TestConfig(Config):
     WTF_CSRF_ENABLED = False
     SECRET_KEY = 'test-secret-key'
     SERVER_NAME = 'localhost.test' # Add a dummy server name for url_for
+    LLM_BACKEND = 'fake' # Offline LLM client, see the fake_llm fixture
+    GENERATION_CACHE_BACKEND = 'none' # Keep generation tests independent; cache tests enable it explicitly
 
 @pytest.fixture(scope='module')
 def test_app():
@@ -68,6 +70,17 @@ def new_user(test_app):
         db.session.delete(user)
         db.session.commit()
 
+@pytest.fixture(scope='function')
+def fake_llm(test_app):
+    """The app's FakeLLMClient, reset to its default canned reply for each test."""
+    resilient_client = test_app.extensions['llm_client']
+    client = resilient_client.client # Unwrap the retry/circuit breaker layer
+    client.reset()
+    resilient_client.breaker.reset()
+    yield client
+    client.reset()
+    resilient_client.breaker.reset()
+
 @pytest.fixture(scope='session', autouse=True)
 def download_nltk_data():
     """Ensure necessary NLTK data is downloaded once per session."""
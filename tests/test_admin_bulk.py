@@ -0,0 +1,174 @@
+import csv
+import io
+
+import pytest
+from flask import url_for, json
+from sqlalchemy import event
+
+from backend.app import db
+from backend.models import User, Experience, Skill, PersonalInfo, Generation, SiteStats
+from backend.admin_bulk import run_bulk_action, delete_users
+from backend.generation_history import record_generation
+from backend.job_queue import get_admin_job_queue, get_job_queue
+from backend.site_stats import SITE_STATS_ID, load_dashboard_stats
+
+
+def login(client, username, password):
+    return client.post(url_for('auth.login'), data={'username': username, 'password': password}, follow_redirects=True)
+
+@pytest.fixture(autouse=True)
+def export_instance_path(test_app, tmp_path, monkeypatch):
+    """Write export files to a temporary folder instead of the app's real instance folder."""
+    monkeypatch.setattr(test_app, 'instance_path', str(tmp_path))
+
+@pytest.fixture(scope='function')
+def bulk_admin(test_app):
+    with test_app.app_context():
+        admin = User(username='bulkadmin', is_admin=True)
+        admin.set_password('password')
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+    yield admin_id
+    with test_app.app_context():
+        leftover = db.session.execute(db.select(User.id).where(User.username.like('bulk%'))).scalars().all()
+        delete_users(leftover)
+        db.session.commit()
+
+def _make_users(test_app, count, prefix='bulkuser'):
+    """Users with a few child rows each, the kind an ORM cascade would load one by one."""
+    with test_app.app_context():
+        ids = []
+        for index in range(count):
+            user = User(username=f'{prefix}{index:03d}', resume_generations=1)
+            user.personal_info = PersonalInfo(full_name=f'User {index}')
+            user.experiences = [Experience(job_title='Dev', description='Did things. ' * 20)]
+            user.skills = [Skill(skill_name='Python'), Skill(skill_name='SQL')]
+            db.session.add(user)
+            db.session.commit()
+            record_generation(user.id, 'resume', '0' * 64, 'fake-model', 'prompt', 'output', 1)
+            ids.append(user.id)
+        return ids
+
+def _run_job(test_client, body):
+    response = test_client.post(url_for('admin.bulk_users'), json=body)
+    assert response.status_code == 202, response.data
+    data = json.loads(response.data)
+    assert get_admin_job_queue().get(data['job_id']).wait(timeout=10)
+    get_admin_job_queue()._jobs.clear() # Poll as another worker process would, from the stored job
+    status = json.loads(test_client.get(data['status_url']).data)
+    assert status['status'] == 'succeeded', status
+    return status
+
+def _remaining(model, ids):
+    return db.session.execute(db.select(db.func.count()).select_from(model).where(model.user_id.in_(ids))).scalar()
+
+
+def test_bulk_delete_selection(test_client, test_app, bulk_admin):
+    ids = _make_users(test_app, 5)
+    with test_app.app_context():
+        load_dashboard_stats(days=1)
+        users_before = db.session.get(SiteStats, SITE_STATS_ID).user_count
+        test_app.config['ADMIN_BULK_CHUNK_SIZE'] = 2
+        try:
+            login(test_client, 'bulkadmin', 'password')
+            status = _run_job(test_client, {'action': 'delete', 'user_ids': ids[:4] + [bulk_admin]})
+        finally:
+            test_app.config['ADMIN_BULK_CHUNK_SIZE'] = 500
+
+        assert status['result'] == {'action': 'delete', 'users': 4}
+        assert status['progress'] == {'done': 4, 'total': 4}
+        remaining = db.session.execute(db.select(User.id).where(User.id.in_(ids + [bulk_admin]))).scalars().all()
+        assert sorted(remaining) == sorted([ids[4], bulk_admin]) # The requesting admin is never included
+        for model in (Experience, Skill, PersonalInfo, Generation):
+            assert _remaining(model, ids[:4]) == 0
+            assert _remaining(model, ids[4:]) > 0
+        stats = db.session.get(SiteStats, SITE_STATS_ID, populate_existing=True)
+        assert stats.user_count == users_before - 4
+
+def test_bulk_delete_statement_count_does_not_grow_with_rows(test_app, bulk_admin):
+    ids = _make_users(test_app, 6)
+    with test_app.app_context():
+        statements = []
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            delete_users(ids)
+            db.session.commit()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+    # One aggregate, one DELETE per child table, the users and the totals row: not one per row
+    deletes = [sql for sql in statements if sql.startswith('DELETE')]
+    assert len(deletes) == 7 # personal_info, experience, education, skill, project, generation, user
+    assert len(statements) <= 9
+
+def test_bulk_promote_and_demote_by_filter(test_client, test_app, bulk_admin):
+    ids = _make_users(test_app, 3, prefix='bulkpromo')
+    with test_app.app_context():
+        login(test_client, 'bulkadmin', 'password')
+        _run_job(test_client, {'action': 'promote', 'scope': 'filter', 'q': 'BULKPROMO'})
+        flags = db.session.execute(db.select(User.is_admin).where(User.id.in_(ids)).execution_options(populate_existing=True)).scalars().all()
+        assert flags == [True, True, True]
+
+        _run_job(test_client, {'action': 'demote', 'user_ids': ids})
+        flags = db.session.execute(db.select(User.is_admin).where(User.id.in_(ids))).scalars().all()
+        assert flags == [False, False, False]
+        assert db.session.get(User, bulk_admin, populate_existing=True).is_admin # Can't demote yourself
+
+def test_bulk_export(test_client, test_app, bulk_admin):
+    ids = _make_users(test_app, 3, prefix='bulkexport')
+    with test_app.app_context():
+        login(test_client, 'bulkadmin', 'password')
+        status = _run_job(test_client, {'action': 'export', 'scope': 'filter', 'q': 'bulkexport'})
+        response = test_client.get(status['download_url'])
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.data.decode('utf-8'))))
+    assert [int(row['id']) for row in rows] == ids
+    assert rows[0]['username'] == 'bulkexport000'
+
+@pytest.mark.parametrize('body', [
+    {'action': 'explode', 'user_ids': [1]},
+    {'action': 'delete'},
+    {'action': 'delete', 'user_ids': []},
+    {'action': 'delete', 'user_ids': ['1']},
+])
+def test_bulk_validation(test_client, test_app, bulk_admin, body):
+    with test_app.app_context():
+        login(test_client, 'bulkadmin', 'password')
+        response = test_client.post(url_for('admin.bulk_users'), json=body)
+    assert response.status_code == 400
+
+def test_bulk_requires_admin(test_client, test_app, new_user):
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('admin.bulk_users'), json={'action': 'export', 'scope': 'filter'})
+    assert response.status_code == 403
+
+def test_bulk_job_hidden_from_other_admins(test_client, test_app, bulk_admin):
+    with test_app.app_context():
+        other = User(username='bulkother', is_admin=True)
+        other.set_password('password')
+        db.session.add(other)
+        db.session.commit()
+        login(test_client, 'bulkadmin', 'password')
+        status = _run_job(test_client, {'action': 'export', 'scope': 'filter', 'q': 'nobody'})
+        test_client.get(url_for('auth.logout'))
+        login(test_client, 'bulkother', 'password')
+        assert test_client.get(url_for('admin.bulk_job_status', job_id=status['job_id'])).status_code == 404
+        assert test_client.get(status['download_url']).status_code == 404
+
+def test_bulk_jobs_do_not_use_generation_queue(test_client, test_app, bulk_admin, monkeypatch):
+    with test_app.app_context():
+        monkeypatch.setattr(get_job_queue(), 'max_pending_per_user', 0) # Generation queue full for everyone
+        login(test_client, 'bulkadmin', 'password')
+        status = _run_job(test_client, {'action': 'export', 'scope': 'filter', 'q': 'nobody'})
+        assert get_job_queue().get(status['job_id']) is None
+    assert status['result']['users'] == 0
+
+def test_run_bulk_action_without_job(test_app, bulk_admin):
+    ids = _make_users(test_app, 2, prefix='bulkdirect')
+    with test_app.app_context():
+        assert run_bulk_action('delete', bulk_admin, user_ids=ids) == {'action': 'delete', 'users': 2}
+        assert db.session.execute(db.select(User.id).where(User.id.in_(ids))).all() == []
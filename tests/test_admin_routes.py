@@ -144,3 +144,47 @@ def test_admin_view_user_loads(test_client, admin_user, new_user, test_app):
 
 # Note: Further tests for view_user template rendering would require updating
 # the route to use render_template and creating admin_user_detail.html.
+
+def test_admin_metrics(test_client, admin_user, test_app):
+    """Test the metrics endpoint reports generation cache counters."""
+    with test_app.app_context():
+        login(test_client, admin_user.username, 'password')
+        response = test_client.get(url_for('admin.metrics'))
+    assert response.status_code == 200
+    data = response.get_json()
+    assert {'hits', 'misses', 'hit_ratio', 'backend'} <= set(data['generation_cache'])
+    assert data['llm_client']['state'] == 'closed'
+    assert {'hits', 'misses', 'size'} <= set(data['profile_fragment_cache'])
+    assert {'ready', 'warmup_seconds', 'resource_seconds', 'warmup_error'} <= set(data['keyword_engine'])
+    assert {'hits', 'misses', 'hit_ratio'} <= set(data['keyword_engine']['lemma_cache'])
+    assert {'hits', 'misses', 'hit_ratio', 'size'} <= set(data['keyword_engine']['result_cache'])
+
+def test_admin_user_list_search_sort_and_paginate(test_client, admin_user, test_app):
+    with test_app.app_context():
+        users = [User(username=f'listed{index}', resume_generations=index) for index in range(3)]
+        db.session.add_all(users)
+        db.session.commit()
+        test_app.config['ADMIN_USERS_PAGE_SIZE'] = 2
+        try:
+            login(test_client, admin_user.username, 'password')
+            response = test_client.get(url_for('admin.list_users', q='LISTED', sort='resume_generations', dir='desc'))
+            assert response.status_code == 200
+            assert b'3 matching users' in response.data
+            assert b'listed2' in response.data and b'listed1' in response.data
+            assert b'listed0' not in response.data
+            assert b'Next page' in response.data
+
+            next_link = response.data.decode().split('cursor=')[1].split('"')[0]
+            response = test_client.get(url_for('admin.list_users', q='listed', sort='resume_generations', dir='desc')
+                                       + f'&cursor={next_link}')
+            assert b'listed0' in response.data
+            assert b'listed2' not in response.data
+            assert b'Next page' not in response.data
+
+            response = test_client.get(url_for('admin.list_users', sort='password_hash'))
+            assert response.status_code == 302
+        finally:
+            test_app.config['ADMIN_USERS_PAGE_SIZE'] = 50
+            for user in users:
+                db.session.delete(user)
+            db.session.commit()
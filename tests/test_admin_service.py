@@ -0,0 +1,68 @@
+import pytest
+
+from backend.app import db
+from backend.models import User
+from backend.admin_service import (
+    list_users_page, estimate_user_count, count_matching_users, username_prefix_filter, encode_cursor,
+)
+
+
+@pytest.fixture(scope='function')
+def many_users(test_app):
+    """Users 'Page00'...'Page11' with varied counters, removed afterwards."""
+    with test_app.app_context():
+        users = [User(username=f'Page{index:02d}', resume_generations=index % 4, cover_letter_generations=index)
+                 for index in range(12)]
+        db.session.add_all(users)
+        db.session.commit()
+        yield [user.id for user in users]
+        for user in users:
+            db.session.delete(user)
+        db.session.commit()
+
+def _all_pages(**kwargs):
+    seen, cursor = [], None
+    while True:
+        users, cursor = list_users_page(cursor=cursor, limit=5, **kwargs)
+        seen.extend(users)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize('sort', ['id', 'username', 'resume_generations', 'cover_letter_generations'])
+@pytest.mark.parametrize('descending', [False, True])
+def test_pages_cover_every_user_once_in_order(test_app, many_users, sort, descending):
+    with test_app.app_context():
+        users = _all_pages(sort=sort, descending=descending, prefix='page')
+        keys = [(getattr(user, sort), user.id) for user in users]
+    assert sorted(user.id for user in users) == sorted(many_users)
+    assert keys == sorted(keys, reverse=descending)
+
+def test_prefix_search_is_case_insensitive(test_app, many_users):
+    with test_app.app_context():
+        users, cursor = list_users_page(prefix='PAGE1', limit=50)
+    assert sorted(user.username for user in users) == ['Page10', 'Page11']
+    assert cursor is None
+
+def test_prefix_search_uses_index(test_app):
+    with test_app.app_context():
+        query = db.select(User.id).where(username_prefix_filter('page'))
+        sql = str(query.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = ' '.join(row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')))
+    assert 'ix_user_username_lower' in plan
+
+def test_invalid_sort_and_cursor(test_app):
+    with test_app.app_context():
+        with pytest.raises(ValueError):
+            list_users_page(sort='password_hash')
+        with pytest.raises(ValueError):
+            list_users_page(cursor='not-a-cursor')
+        with pytest.raises(ValueError):
+            list_users_page(cursor=encode_cursor({'id': 1}))
+
+def test_counts(test_app, many_users):
+    with test_app.app_context():
+        assert estimate_user_count() >= len(many_users)
+        assert count_matching_users('page', cap=100) == (12, False)
+        assert count_matching_users('page', cap=5) == (5, True)
+        assert count_matching_users('nobody', cap=5) == (0, False)
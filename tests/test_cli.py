@@ -28,3 +28,34 @@ def test_make_admin_command_user_not_found(runner: FlaskCliRunner, test_app):
         # Check output
         assert result.exit_code == 0 # Command itself runs successfully
         assert "User 'nosuchuser' not found." in result.output
+
+def test_build_keyword_corpus_command(runner: FlaskCliRunner, test_app, tmp_path, monkeypatch):
+    """Test 'flask build-keyword-corpus' writes a table the keyword engine can load."""
+    from backend.keyword_corpus import DocumentFrequencyTable
+    from backend.keyword_engine import KeywordEngine
+    from tests.test_keyword_engine import fake_loader
+    monkeypatch.setitem(test_app.extensions, 'keyword_engine', KeywordEngine(loader=fake_loader))
+    corpus = tmp_path / 'jobs.jsonl'
+    corpus.write_text('"Python developer"\n"Senior python developer"\n"Flask developer"\n', encoding='utf-8')
+    output = str(tmp_path / 'df.bin')
+
+    result = runner.invoke(args=["build-keyword-corpus", str(corpus), "--output", output])
+
+    assert result.exit_code == 0
+    assert f"Wrote 3 terms from 3 job descriptions to {output}." in result.output
+    table = DocumentFrequencyTable(output)
+    assert table.document_frequency('python developer') == 2
+    table.close()
+
+def test_build_keyword_corpus_command_without_nltk_data(runner: FlaskCliRunner, test_app, tmp_path, monkeypatch):
+    from backend.keyword_engine import KeywordEngine
+    from tests.test_keyword_engine import missing_data_loader
+    monkeypatch.setitem(test_app.extensions, 'keyword_engine', KeywordEngine(loader=missing_data_loader))
+    corpus = tmp_path / 'job.txt'
+    corpus.write_text('Python developer', encoding='utf-8')
+
+    result = runner.invoke(args=["build-keyword-corpus", str(corpus), "--output", str(tmp_path / 'df.bin')])
+
+    assert result.exit_code != 0
+    assert 'NLTK data for keyword extraction is missing' in result.output
+    assert not (tmp_path / 'df.bin').exists()
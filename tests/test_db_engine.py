@@ -0,0 +1,94 @@
+import os
+import tempfile
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from backend.app import create_app, db
+from backend.db_engine import engine_options
+from backend.models import User
+from tests.conftest import TestConfig
+
+
+@pytest.fixture(scope='module')
+def file_db_app():
+    """An app on a SQLite file, since WAL and locking don't apply to in-memory databases."""
+    db_dir = tempfile.mkdtemp()
+
+    class FileDBConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(db_dir, 'stress.db')
+
+    app = create_app(FileDBConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(username='stressuser')
+        db.session.add(user)
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_sqlite_pragmas_applied(file_db_app):
+    with file_db_app.app_context():
+        conn = db.session.connection()
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1 # NORMAL
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == file_db_app.config['SQLITE_BUSY_TIMEOUT']
+        db.session.rollback()
+
+
+def test_engine_options_for_other_databases():
+    options = engine_options({'SQLALCHEMY_DATABASE_URI': 'postgresql://db/app', 'DB_POOL_SIZE': 3,
+                              'SQLALCHEMY_ENGINE_OPTIONS': {'pool_recycle': 60}})
+    assert options['pool_size'] == 3
+    assert options['pool_recycle'] == 60 # Explicit options win
+    assert options['pool_pre_ping'] is True
+    assert 'connect_args' not in options
+
+
+def test_concurrent_writers_and_readers_do_not_lock(file_db_app):
+    """Stress test: concurrent counter writes alongside readers finish without 'database is locked'."""
+    writers, readers, increments = 6, 4, 40
+    errors = []
+    stop_reading = threading.Event()
+
+    def write():
+        with file_db_app.app_context():
+            for _ in range(increments):
+                try:
+                    db.session.execute(db.update(User).where(User.username == 'stressuser')
+                                       .values(resume_generations=User.resume_generations + 1))
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(e)
+            db.session.remove()
+
+    def read():
+        with file_db_app.app_context():
+            while not stop_reading.is_set():
+                try:
+                    db.session.execute(db.select(User.resume_generations)).all()
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(e)
+            db.session.remove()
+
+    reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=write) for _ in range(writers)]
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    stop_reading.set()
+    for thread in reader_threads:
+        thread.join()
+
+    assert errors == []
+    with file_db_app.app_context():
+        user = User.query.filter_by(username='stressuser').one()
+        assert user.resume_generations == writers * increments
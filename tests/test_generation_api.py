@@ -1,9 +1,12 @@
+import sqlite3
+
 import pytest
-from flask import url_for, json, jsonify # Import jsonify
+from flask import url_for, json
 from unittest.mock import patch
 # Import db and User for counter checks
 from backend.app import db
 from backend.models import User
+from backend.profile_service import Profile
 
 # Helper function to log in
 def login(client, username, password):
@@ -19,20 +22,18 @@ def test_generation_unauthenticated(test_client, test_app, endpoint):
     assert response.status_code == 302 # Redirects to login
     assert '/auth/login' in response.location
 
-@patch('backend.generation_api.get_profile') # Mock get_profile
-@patch('backend.generation_api.genai.GenerativeModel') # Mock Gemini Model
-def test_generate_resume_success(mock_gemini_model, mock_get_profile, test_client, new_user, test_app):
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_success(mock_load_profile, test_client, new_user, test_app, fake_llm):
     """Test successful resume generation."""
     # Setup mocks
-    mock_get_profile.return_value = (jsonify({ # Simulate successful profile fetch
+    mock_load_profile.return_value = Profile.from_dict({ # Simulate successful profile fetch
         'username': new_user.username,
         'personal_info': {'full_name': 'Test User'},
             # Add missing fields to mock experience data
             'experiences': [{'job_title': 'Tester', 'company_name': 'Mock Inc.', 'location': 'Testville'}],
             'educations': [], 'skills': [], 'projects': []
-        }), 200)
-    mock_model_instance = mock_gemini_model.return_value
-    mock_model_instance.generate_content.return_value.text = "Generated Resume Text"
+        })
+    fake_llm.response_text = "Generated Resume Text"
 
     with test_app.app_context():
         login(test_client, new_user.username, 'password')
@@ -42,14 +43,14 @@ def test_generate_resume_success(mock_gemini_model, mock_get_profile, test_clien
     data = json.loads(response.data)
     assert 'resume_text' in data
     assert data['resume_text'] == "Generated Resume Text"
-    mock_model_instance.generate_content.assert_called_once() # Check API was called
+    assert len(fake_llm.calls) == 1 # Check API was called
 
     # Check counter incremented (optional but good)
     with test_app.app_context():
         user = db.session.get(User, new_user.id)
         assert user.resume_generations == 1
 
-def test_generate_resume_no_jd(test_client, new_user, test_app):
+def test_generate_resume_no_jd(test_client, new_user, test_app, fake_llm):
     """Test resume generation without job description."""
     with test_app.app_context():
         login(test_client, new_user.username, 'password')
@@ -57,13 +58,13 @@ def test_generate_resume_no_jd(test_client, new_user, test_app):
     assert response.status_code == 400
     assert b"Job description is required" in response.data
 
-@patch('backend.generation_api.get_profile') # Mock get_profile
-def test_generate_resume_empty_profile(mock_get_profile, test_client, new_user, test_app):
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_empty_profile(mock_load_profile, test_client, new_user, test_app, fake_llm):
     """Test resume generation with an empty profile."""
-    mock_get_profile.return_value = (jsonify({ # Simulate empty profile
+    mock_load_profile.return_value = Profile.from_dict({ # Simulate empty profile
          'username': new_user.username,
          'personal_info': {}, 'experiences': [], 'educations': [], 'skills': [], 'projects': []
-    }), 200)
+    })
 
     with test_app.app_context():
         login(test_client, new_user.username, 'password')
@@ -73,7 +74,7 @@ def test_generate_resume_empty_profile(mock_get_profile, test_client, new_user,
 
 # --- Keyword Extraction Tests ---
 
-def test_extract_keywords_success(test_client, new_user, test_app):
+def test_extract_keywords_success(test_client, new_user, test_app, fake_llm):
     """Test successful keyword extraction."""
     with test_app.app_context():
         login(test_client, new_user.username, 'password')
@@ -88,7 +89,7 @@ def test_extract_keywords_success(test_client, new_user, test_app):
     assert 'flask' in data['keywords']
     assert 'job' in data['keywords']
 
-def test_extract_keywords_no_jd(test_client, new_user, test_app):
+def test_extract_keywords_no_jd(test_client, new_user, test_app, fake_llm):
     """Test keyword extraction without job description."""
     with test_app.app_context():
         login(test_client, new_user.username, 'password')
@@ -98,17 +99,15 @@ def test_extract_keywords_no_jd(test_client, new_user, test_app):
 
 # --- Cover Letter Generation Tests ---
 
-@patch('backend.generation_api.get_profile') # Mock get_profile
-@patch('backend.generation_api.genai.GenerativeModel') # Mock Gemini Model
-def test_generate_cover_letter_success(mock_gemini_model, mock_get_profile, test_client, new_user, test_app):
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_cover_letter_success(mock_load_profile, test_client, new_user, test_app, fake_llm):
     """Test successful cover letter generation."""
-    mock_get_profile.return_value = (jsonify({ # Simulate successful profile fetch
+    mock_load_profile.return_value = Profile.from_dict({ # Simulate successful profile fetch
         'username': new_user.username,
         'personal_info': {'full_name': 'Test User'}, # Need at least name
         'experiences': [], 'educations': [], 'skills': [], 'projects': []
-    }), 200)
-    mock_model_instance = mock_gemini_model.return_value
-    mock_model_instance.generate_content.return_value.text = "Generated Cover Letter Text"
+    })
+    fake_llm.response_text = "Generated Cover Letter Text"
 
     with test_app.app_context():
         login(test_client, new_user.username, 'password')
@@ -121,14 +120,14 @@ def test_generate_cover_letter_success(mock_gemini_model, mock_get_profile, test
     data = json.loads(response.data)
     assert 'cover_letter_text' in data
     assert data['cover_letter_text'] == "Generated Cover Letter Text"
-    mock_model_instance.generate_content.assert_called_once()
+    assert len(fake_llm.calls) == 1
 
     # Check counter incremented
     with test_app.app_context():
         user = db.session.get(User, new_user.id)
         assert user.cover_letter_generations == 1
 
-def test_generate_cover_letter_missing_input(test_client, new_user, test_app):
+def test_generate_cover_letter_missing_input(test_client, new_user, test_app, fake_llm):
     """Test cover letter generation with missing company or JD."""
     with test_app.app_context():
         login(test_client, new_user.username, 'password')
@@ -142,13 +141,13 @@ def test_generate_cover_letter_missing_input(test_client, new_user, test_app):
     assert response2.status_code == 400
     assert b"Job description and company name are required" in response2.data
 
-@patch('backend.generation_api.get_profile') # Mock get_profile
-def test_generate_cover_letter_empty_profile(mock_get_profile, test_client, new_user, test_app):
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_cover_letter_empty_profile(mock_load_profile, test_client, new_user, test_app, fake_llm):
     """Test cover letter generation with an empty profile (missing name)."""
-    mock_get_profile.return_value = (jsonify({ # Simulate empty profile
+    mock_load_profile.return_value = Profile.from_dict({ # Simulate empty profile
          'username': new_user.username,
          'personal_info': {}, 'experiences': [], 'educations': [], 'skills': [], 'projects': []
-    }), 200)
+    })
 
     with test_app.app_context():
         login(test_client, new_user.username, 'password')
@@ -158,3 +157,337 @@ def test_generate_cover_letter_empty_profile(mock_get_profile, test_client, new_
         })
     assert response.status_code == 400
     assert b"Please complete your profile (at least name)" in response.data
+
+# --- Async Job Tests ---
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_async_job(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test async resume generation returns a job id and the job result can be polled."""
+    mock_load_profile.return_value = Profile.from_dict({
+        'username': new_user.username,
+        'personal_info': {'full_name': 'Test User'},
+        'experiences': [], 'educations': [], 'skills': [], 'projects': []
+    })
+    fake_llm.response_text = "Async Resume Text"
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD', 'async': True})
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+
+        # Wait for the worker to finish before polling
+        assert test_app.extensions['generation_jobs'].get(job_id).wait(timeout=5)
+        test_app.extensions['generation_jobs']._jobs.clear() # Poll as another worker process would, from the stored job
+        job_response = test_client.get(url_for('generation_api.get_job', job_id=job_id))
+
+    assert job_response.status_code == 200
+    data = job_response.get_json()
+    assert data['status'] == 'succeeded'
+    assert data['result'] == {'resume_text': "Async Resume Text"}
+
+    with test_app.app_context():
+        user = db.session.get(User, new_user.id)
+        assert user.resume_generations == 1
+
+def test_get_job_not_found(test_client, new_user, test_app, fake_llm):
+    """Test polling an unknown job id returns 404."""
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.get(url_for('generation_api.get_job', job_id='does-not-exist'))
+    assert response.status_code == 404
+
+# --- Generation Cache Tests ---
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_uses_cache(mock_load_profile, test_client, new_user, test_app, fake_llm, monkeypatch):
+    """Test identical generation requests are served from the cache unless force_regenerate is set."""
+    from backend.generation_cache import MemoryCache
+    cache = MemoryCache()
+    monkeypatch.setitem(test_app.extensions, 'generation_cache', cache)
+    mock_load_profile.return_value = Profile.from_dict({
+        'username': new_user.username,
+        'personal_info': {'full_name': 'Test User'},
+        'experiences': [], 'educations': [], 'skills': [], 'projects': []
+    })
+    fake_llm.response_text = "Cached Resume Text"
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        first = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+        second = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+        assert len(fake_llm.calls) == 1
+        forced = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD', 'force_regenerate': True})
+        assert len(fake_llm.calls) == 2
+
+    assert first.get_json() == second.get_json() == forced.get_json() == {'resume_text': "Cached Resume Text"}
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+class LockedCache:
+    """A shared cache file another worker holds the write lock on."""
+    def get(self, key):
+        raise sqlite3.OperationalError('database is locked')
+
+    def set(self, key, value):
+        raise sqlite3.OperationalError('database is locked')
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_cache_errors_are_best_effort(mock_load_profile, test_client, new_user, test_app, fake_llm, monkeypatch):
+    """Test a failing cache doesn't fail a generation the model already produced."""
+    monkeypatch.setitem(test_app.extensions, 'generation_cache', LockedCache())
+    mock_load_profile.return_value = Profile.from_dict({
+        'username': new_user.username,
+        'personal_info': {'full_name': 'Test User'},
+        'experiences': [], 'educations': [], 'skills': [], 'projects': []
+    })
+    fake_llm.response_text = "Uncached Resume Text"
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+        stream = test_client.post(url_for('generation_api.generate_resume_stream'), json={'job_description': 'Test JD'})
+        body = stream.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.get_json() == {'resume_text': "Uncached Resume Text"}
+    assert body.endswith('event: done\ndata: {}\n\n')
+    assert len(fake_llm.calls) == 2
+
+    with test_app.app_context():
+        user = db.session.get(User, new_user.id)
+        assert user.resume_generations == 2
+
+# --- Streaming Tests ---
+
+def _profile(username):
+    return Profile.from_dict({
+        'username': username,
+        'personal_info': {'full_name': 'Test User'},
+        'experiences': [], 'educations': [], 'skills': [], 'projects': []
+    })
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_stream(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test the streaming endpoint forwards model chunks as SSE and counts once at the end."""
+    mock_load_profile.return_value = _profile(new_user.username)
+    fake_llm.response_text = 'Hello World' # The fake streams one word per chunk
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_resume_stream'), json={'job_description': 'Test JD'})
+        body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert body == ('event: chunk\ndata: {"text": "Hello "}\n\n'
+                    'event: chunk\ndata: {"text": "World"}\n\n'
+                    'event: done\ndata: {}\n\n')
+    assert len(fake_llm.calls) == 1
+
+    with test_app.app_context():
+        user = db.session.get(User, new_user.id)
+        assert user.resume_generations == 1
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_stream_falls_back_to_buffered(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test a streaming failure before any output degrades to a single buffered call."""
+    mock_load_profile.return_value = _profile(new_user.username)
+    fake_llm.stream_error = NotImplementedError('streaming unavailable')
+    fake_llm.response_text = 'Buffered Text'
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_resume_stream'), json={'job_description': 'Test JD'})
+        body = response.get_data(as_text=True)
+
+    assert body == 'event: chunk\ndata: {"text": "Buffered Text"}\n\nevent: done\ndata: {}\n\n'
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_stream_error_does_not_count(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test a failed stream reports an error event and does not increment the counter."""
+    mock_load_profile.return_value = _profile(new_user.username)
+    fake_llm.error = RuntimeError('quota exceeded')
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_resume_stream'), json={'job_description': 'Test JD'})
+        body = response.get_data(as_text=True)
+
+    assert body.startswith('event: error\n')
+    assert 'An error occurred during AI generation' in body
+    assert 'quota exceeded' not in body # Provider details are logged, not shown
+    with test_app.app_context():
+        user = db.session.get(User, new_user.id)
+        assert user.resume_generations == 0
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_stream_disabled(mock_load_profile, test_client, new_user, test_app, fake_llm, monkeypatch):
+    """Test the streaming endpoint returns the buffered JSON response when streaming is disabled."""
+    monkeypatch.setitem(test_app.config, 'GENERATION_STREAMING_ENABLED', False)
+    mock_load_profile.return_value = _profile(new_user.username)
+    fake_llm.response_text = "Buffered Resume"
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_resume_stream'), json={'job_description': 'Test JD'})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'resume_text': "Buffered Resume"}
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_resume_circuit_open(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test generation fails fast with 503 while the circuit breaker is open."""
+    mock_load_profile.return_value = _profile(new_user.username)
+    breaker = test_app.extensions['llm_client'].breaker
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+    assert breaker.state == 'open'
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+
+    assert response.status_code == 503
+    assert b"temporarily unavailable" in response.data
+    assert fake_llm.calls == [] # The model was never called
+
+# --- Bundle Generation Tests ---
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_bundle_success(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test resume and cover letter are generated together and both counters incremented."""
+    mock_load_profile.return_value = _profile(new_user.username)
+    fake_llm.response_text = "Generated Text"
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_bundle'), json={
+            'job_description': 'Test JD',
+            'company_name': 'Test Company'
+        })
+
+    assert response.status_code == 200
+    assert response.get_json() == {'resume_text': "Generated Text", 'cover_letter_text': "Generated Text"}
+    assert mock_load_profile.call_count == 1 # Profile loaded once for both prompts
+    assert len(fake_llm.calls) == 2
+    assert any('Test Company' in prompt for prompt in fake_llm.calls)
+
+    with test_app.app_context():
+        user = db.session.get(User, new_user.id)
+        assert user.resume_generations == 1
+        assert user.cover_letter_generations == 1
+
+def test_generate_bundle_missing_input(test_client, new_user, test_app):
+    """Test the bundle endpoint requires a job description and company name."""
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_bundle'), json={'job_description': 'Test JD'})
+    assert response.status_code == 400
+    assert b"Job description and company name are required" in response.data
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_bundle_failure_counts_nothing(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test a failed generation in the bundle leaves both counters untouched."""
+    mock_load_profile.return_value = _profile(new_user.username)
+    fake_llm.error = RuntimeError('model error')
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_bundle'), json={
+            'job_description': 'Test JD',
+            'company_name': 'Test Company'
+        })
+
+    assert response.status_code == 500
+    with test_app.app_context():
+        user = db.session.get(User, new_user.id)
+        assert user.resume_generations == 0
+        assert user.cover_letter_generations == 0
+
+# --- Batch Generation Tests ---
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_batch_streams_per_item_results(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test a batch reports each item separately and one bad item does not abort the rest."""
+    mock_load_profile.return_value = _profile(new_user.username)
+    fake_llm.response_text = "Batch Resume"
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_batch'), json={
+            'job_descriptions': ['JD one', '', 'JD three']
+        })
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert lines[-1] == {'done': True, 'succeeded': 2, 'failed': 1}
+    items = sorted(lines[:-1], key=lambda line: line['index'])
+    assert items == [
+        {'index': 0, 'resume_text': "Batch Resume"},
+        {'index': 1, 'error': 'Job description is required.'},
+        {'index': 2, 'resume_text': "Batch Resume"},
+    ]
+    assert mock_load_profile.call_count == 1
+    assert len(fake_llm.calls) == 2
+
+    with test_app.app_context():
+        user = db.session.get(User, new_user.id)
+        assert user.resume_generations == 2
+
+def test_generate_batch_validates_input(test_client, new_user, test_app, monkeypatch):
+    """Test the batch endpoint rejects missing or oversized lists."""
+    monkeypatch.setitem(test_app.config, 'GENERATION_BATCH_MAX_ITEMS', 2)
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        empty = test_client.post(url_for('generation_api.generate_batch'), json={'job_descriptions': []})
+        too_many = test_client.post(url_for('generation_api.generate_batch'), json={'job_descriptions': ['a', 'b', 'c']})
+    assert empty.status_code == 400
+    assert too_many.status_code == 400
+    assert b"At most 2 job descriptions" in too_many.data
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_reuses_rendered_profile_until_saved(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    """Test the rendered profile is cached across generations and invalidated by save_profile."""
+    mock_load_profile.return_value = _profile(new_user.username)
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        for _ in range(2):
+            response = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+            assert response.status_code == 200
+        assert mock_load_profile.call_count == 1 # Second generation skipped loading the profile
+
+        save = test_client.post(url_for('profile_api.save_profile'), json={'personal_info': {'full_name': 'Renamed User'}})
+        assert save.status_code == 200
+        mock_load_profile.return_value = Profile.from_dict({
+            'username': new_user.username,
+            'personal_info': {'full_name': 'Renamed User'},
+            'experiences': [], 'educations': [], 'skills': [], 'projects': []
+        })
+        response = test_client.post(url_for('generation_api.generate_cover_letter'),
+                                    json={'job_description': 'Test JD', 'company_name': 'Test Co'})
+
+    assert response.status_code == 200
+    assert mock_load_profile.call_count == 2
+    assert 'Name: Renamed User' in fake_llm.calls[-1]
+
+@patch('backend.generation_api.load_profile') # Mock load_profile
+def test_generate_uses_rendered_profile_stored_on_user(mock_load_profile, test_client, new_user, test_app, fake_llm, monkeypatch):
+    """Test renders persisted on the user row are reused when the in-process cache is empty."""
+    monkeypatch.setitem(test_app.config, 'PROFILE_FRAGMENT_DB_CACHE', True)
+    mock_load_profile.return_value = _profile(new_user.username)
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        first = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+        assert db.session.get(User, new_user.id).profile_fragments is not None
+        test_app.extensions['profile_fragment_cache'].clear() # As if served by another worker
+        second = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert mock_load_profile.call_count == 1
+    assert fake_llm.calls[0] == fake_llm.calls[1]
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+from backend.generation_cache import make_cache_key, MemoryCache, SQLiteCache, NullCache
+
+
+def test_cache_key_is_stable_and_input_sensitive():
+    """Test the cache key depends on the prompt, model and prompt version."""
+    key = make_cache_key('prompt', 'model-a', 1)
+    assert key == make_cache_key('prompt', 'model-a', 1)
+    assert key != make_cache_key('prompt', 'model-b', 1)
+    assert key != make_cache_key('prompt', 'model-a', 2)
+    assert key != make_cache_key('prompt!', 'model-a', 1)
+
+def test_memory_cache_lru_eviction():
+    """Test the least recently used entry is evicted once the cache is full."""
+    cache = MemoryCache(max_entries=2, ttl=60)
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+    assert cache.get('a') == 'A' # 'a' is now most recently used
+    cache.set('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.get('c') == 'C'
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 3
+    assert stats['misses'] == 1
+    assert stats['size'] == 2
+
+def test_memory_cache_ttl_expiry():
+    """Test expired entries are treated as misses."""
+    cache = MemoryCache(max_entries=2, ttl=-1) # Entries expire immediately
+    cache.set('a', 'A')
+    assert cache.get('a') is None
+
+def test_sqlite_cache_roundtrip_and_eviction():
+    """Test the SQLite backend persists entries across instances and bounds its size."""
+    path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+    cache = SQLiteCache(path, max_entries=2, ttl=60)
+    cache.set('a', 'A')
+    time.sleep(0.01)
+    cache.set('b', 'B')
+    time.sleep(0.01)
+    cache.set('c', 'C') # Evicts 'a', the least recently used
+    reopened = SQLiteCache(path, max_entries=2, ttl=60)
+    assert reopened.get('a') is None
+    assert reopened.get('b') == 'B'
+    assert reopened.get('c') == 'C'
+    assert reopened.stats()['size'] == 2
+    assert cache.stats()['evictions'] == 1
+
+def test_sqlite_cache_connects_lazily_per_process(monkeypatch):
+    """Test the SQLite backend opens nothing until used, runs in WAL mode and reconnects after a fork."""
+    path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+    cache = SQLiteCache(path)
+    assert not os.path.exists(path)
+    cache.set('a', 'A')
+    conn = cache._connect()
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+    monkeypatch.setattr(os, 'getpid', lambda: -1) # As seen from a forked worker
+    assert cache._connect() is not conn
+    assert cache.get('a') == 'A'
+
+def test_null_cache_always_misses():
+    """Test the disabled cache never stores anything."""
+    cache = NullCache()
+    cache.set('a', 'A')
+    assert cache.get('a') is None
+    assert cache.stats()['misses'] == 1
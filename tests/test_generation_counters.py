@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from backend.app import db
+from backend.models import User
+from backend.generation_counters import BufferedCounters, DirectCounters, apply_increments
+
+
+def _counts(test_app, user_id):
+    with test_app.app_context():
+        user = db.session.get(User, user_id)
+        return user.resume_generations, user.cover_letter_generations
+
+
+def test_direct_counters_increment_atomically(test_app, new_user):
+    with test_app.app_context():
+        DirectCounters().increment(new_user.id, ('resume_generations', 'cover_letter_generations'))
+        DirectCounters().increment(new_user.id, ('resume_generations',), by=3)
+    assert _counts(test_app, new_user.id) == (4, 1)
+
+
+def test_apply_increments_rejects_unknown_fields(test_app, new_user):
+    with test_app.app_context():
+        with pytest.raises(ValueError):
+            apply_increments({new_user.id: {'is_admin': 1}})
+
+
+def test_buffered_counters_coalesce_until_flush(test_app, new_user):
+    counters = BufferedCounters(test_app, flush_interval=3600)
+    try:
+        for _ in range(5):
+            counters.increment(new_user.id, ('resume_generations',))
+        counters.increment(new_user.id, ('cover_letter_generations',), by=2)
+        assert counters.stats()['pending_increments'] == 6
+        assert _counts(test_app, new_user.id) == (0, 0) # Nothing written yet
+
+        assert counters.flush() == 6
+        assert _counts(test_app, new_user.id) == (5, 2)
+        assert counters.stats()['flushes'] == 1
+    finally:
+        counters.shutdown()
+
+
+def test_buffered_counters_exact_under_concurrency(test_app, new_user):
+    """Concurrent increments, interleaved with flushes, all end up in the database exactly once."""
+    counters = BufferedCounters(test_app, flush_interval=0.01, max_pending=7)
+    threads, per_thread = 8, 50
+    user_id = new_user.id
+
+    def work():
+        for _ in range(per_thread):
+            counters.increment(user_id, ('resume_generations',))
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    counters.shutdown() # Final flush
+
+    assert _counts(test_app, user_id) == (threads * per_thread, 0)
+    assert counters.stats()['pending_increments'] == 0
+    assert counters.stats()['flushes'] > 1
@@ -0,0 +1,160 @@
+import re
+import pytest
+from flask import url_for, json
+from unittest.mock import patch
+from backend.app import db
+from backend.models import User, Generation
+from backend.profile_service import Profile
+from backend.generation_history import record_generation, list_generations
+
+# Helper function to log in
+def login(client, username, password):
+    return client.post(url_for('auth.login'), data={'username': username, 'password': password}, follow_redirects=True)
+
+def _profile(username):
+    return Profile.from_dict({'username': username, 'personal_info': {'full_name': 'Test User'},
+                              'experiences': [{'job_title': 'Tester'}]})
+
+def _add_generations(user_id, count, kind='resume'):
+    for index in range(count):
+        record_generation(user_id, kind, f'{index:064d}', 'fake-model', 'prompt', f'{kind} text {index}', 12)
+
+
+def test_generations_unauthenticated(test_client, test_app):
+    with test_app.app_context():
+        response = test_client.get(url_for('history_api.get_generations'))
+    assert response.status_code == 302
+    assert '/auth/login' in response.location
+
+@patch('backend.generation_api.load_profile')
+def test_generation_is_recorded(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    mock_load_profile.return_value = _profile(new_user.username)
+    fake_llm.response_text = 'Stored Resume Text ' * 20
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+        response = test_client.get(url_for('history_api.get_generations'))
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data['generations']) == 1
+        entry = data['generations'][0]
+        assert entry['kind'] == 'resume'
+        assert entry['model_name'] == fake_llm.model_name
+        assert entry['cached'] is False
+        assert len(entry['input_hash']) == 64
+        assert entry['output_tokens'] > 0 and entry['prompt_tokens'] > 0
+        assert 'text' not in entry # Listing never returns the output
+        assert data['next_before_id'] is None
+
+        response = test_client.get(url_for('history_api.get_generation_detail', generation_id=entry['id']))
+        assert response.status_code == 200
+        assert json.loads(response.data)['text'] == fake_llm.response_text
+        # Stored compressed
+        stored = db.session.execute(db.text('SELECT output FROM generation WHERE id = :id'), {'id': entry['id']}).scalar_one()
+        assert len(stored) < len(fake_llm.response_text)
+
+@patch('backend.generation_api.load_profile')
+def test_bundle_records_both_kinds(mock_load_profile, test_client, new_user, test_app, fake_llm):
+    mock_load_profile.return_value = _profile(new_user.username)
+
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.generate_bundle'),
+                                    json={'job_description': 'Test JD', 'company_name': 'Acme'})
+        assert response.status_code == 200
+        response = test_client.get(url_for('history_api.get_generations'))
+    kinds = sorted(entry['kind'] for entry in json.loads(response.data)['generations'])
+    assert kinds == ['cover_letter', 'resume']
+
+def test_failed_generation_is_not_recorded(test_client, new_user, test_app, fake_llm):
+    fake_llm.error = ValueError('bad request')
+    with patch('backend.generation_api.load_profile', return_value=_profile(new_user.username)):
+        with test_app.app_context():
+            login(test_client, new_user.username, 'password')
+            response = test_client.post(url_for('generation_api.generate_resume'), json={'job_description': 'Test JD'})
+            assert response.status_code == 500
+            assert db.session.execute(db.select(db.func.count(Generation.id))
+                                      .where(Generation.user_id == new_user.id)).scalar() == 0
+
+def test_generations_keyset_pagination(test_client, new_user, test_app):
+    with test_app.app_context():
+        _add_generations(new_user.id, 5)
+        login(test_client, new_user.username, 'password')
+
+        seen = []
+        before_id = None
+        while True:
+            params = {'limit': 2}
+            if before_id is not None:
+                params['before_id'] = before_id
+            data = json.loads(test_client.get(url_for('history_api.get_generations', **params)).data)
+            seen.extend(entry['id'] for entry in data['generations'])
+            before_id = data['next_before_id']
+            if before_id is None:
+                break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True) # Newest first, no repeats
+
+def test_generations_filter_by_kind(test_client, new_user, test_app):
+    with test_app.app_context():
+        _add_generations(new_user.id, 2, kind='resume')
+        _add_generations(new_user.id, 1, kind='cover_letter')
+        login(test_client, new_user.username, 'password')
+        response = test_client.get(url_for('history_api.get_generations', kind='cover_letter'))
+    generations = json.loads(response.data)['generations']
+    assert [entry['kind'] for entry in generations] == ['cover_letter']
+
+@pytest.mark.parametrize('params', [{'limit': 0}, {'limit': 1000}, {'limit': 'x'}, {'before_id': 'x'}, {'kind': 'poem'}])
+def test_generations_invalid_params(test_client, new_user, test_app, params):
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.get(url_for('history_api.get_generations', **params))
+    assert response.status_code == 400
+
+def test_other_users_generation_not_found(test_client, new_user, test_app):
+    with test_app.app_context():
+        other = User(username='historyother')
+        other.set_password('password')
+        db.session.add(other)
+        db.session.commit()
+        _add_generations(other.id, 1)
+        other_generation_id = list_generations(other.id, 1)[0][0].id
+
+        login(test_client, new_user.username, 'password')
+        response = test_client.get(url_for('history_api.get_generation_detail', generation_id=other_generation_id))
+        assert response.status_code == 404
+        response = test_client.post(url_for('export_api.export_resume'),
+                                    json={'generation_id': other_generation_id, 'format': 'pdf'})
+        assert response.status_code == 404
+
+        db.session.delete(other) # Cascades to the generation
+        db.session.commit()
+        assert db.session.get(Generation, other_generation_id) is None
+
+def test_export_stored_generation(test_client, new_user, test_app):
+    with test_app.app_context():
+        record_generation(new_user.id, 'resume', '0' * 64, 'fake-model', 'prompt', '### Summary\nStored resume', 5)
+        generation_id = list_generations(new_user.id, 1)[0][0].id
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('export_api.export_resume'),
+                                    json={'generation_id': generation_id, 'format': 'pdf'})
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'application/pdf'
+
+def test_list_generations_does_not_read_output(test_app, new_user):
+    with test_app.app_context():
+        _add_generations(new_user.id, 3)
+        statements = []
+        from sqlalchemy import event
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            list_generations(new_user.id, 2)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+    assert len(statements) == 1
+    assert not re.search(r'generation\.output\b', statements[0])
+    assert 'LIMIT' in statements[0]
@@ -0,0 +1,88 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from backend.app import db
+from backend.job_queue import GenerationJobQueue, JobQueueFull, load_job
+from backend.models import BackgroundJob
+
+
+def test_job_queue_runs_job_in_app_context(test_app):
+    """Test a submitted job runs on a worker and stores its result."""
+    from flask import current_app
+    queue = GenerationJobQueue(test_app, workers=1)
+    job = queue.submit(1, 'test', lambda: current_app.name)
+    assert job.wait(timeout=5)
+    assert job.status == 'succeeded'
+    assert job.result == test_app.name
+    queue.shutdown()
+
+def test_job_queue_records_failure(test_app):
+    """Test exceptions raised by a job mark it as failed."""
+    def boom():
+        raise ValueError('model unavailable')
+    queue = GenerationJobQueue(test_app, workers=1)
+    job = queue.submit(1, 'test', boom)
+    assert job.wait(timeout=5)
+    assert job.to_dict() == {'job_id': job.id, 'kind': 'test', 'status': 'failed', 'error': 'model unavailable'}
+    queue.shutdown()
+
+def test_job_queue_pending_limit(test_app):
+    """Test a user cannot queue more than the configured number of jobs."""
+    release = threading.Event()
+    queue = GenerationJobQueue(test_app, workers=1, max_pending_per_user=2)
+    queue.submit(1, 'test', release.wait)
+    queue.submit(1, 'test', release.wait)
+    with pytest.raises(JobQueueFull):
+        queue.submit(1, 'test', release.wait)
+    # Other users are unaffected by user 1's limit
+    queue.submit(2, 'test', release.wait)
+    release.set()
+    queue.shutdown()
+
+def test_job_queue_round_robin_between_users(test_app):
+    """Test a burst from one user does not delay another user's job behind it."""
+    release = threading.Event()
+    order = []
+    queue = GenerationJobQueue(test_app, workers=1, max_pending_per_user=10)
+    blocker = queue.submit(1, 'test', release.wait) # Occupies the only worker
+    burst = [queue.submit(1, 'test', order.append, 'user1') for _ in range(3)]
+    other = queue.submit(2, 'test', order.append, 'user2')
+    release.set()
+    for job in [blocker, other] + burst:
+        assert job.wait(timeout=5)
+    assert order == ['user2', 'user1', 'user1', 'user1']
+    queue.shutdown()
+
+def test_job_queue_stores_jobs_for_other_processes(test_app):
+    """Test job status and results are stored, and the pending limit counts every process's jobs."""
+    release = threading.Event()
+    worker_a = GenerationJobQueue(test_app, workers=1, max_pending_per_user=2)
+    worker_b = GenerationJobQueue(test_app, workers=1, max_pending_per_user=2) # Another gunicorn worker
+    blocked = worker_a.submit(3, 'test', release.wait)
+    worker_a.submit(3, 'test', release.wait)
+    with pytest.raises(JobQueueFull):
+        worker_b.submit(3, 'test', release.wait)
+    with test_app.app_context():
+        assert load_job(blocked.id).to_dict()['status'] in ('queued', 'running')
+    release.set()
+    assert blocked.wait(timeout=5)
+    with test_app.app_context():
+        assert load_job(blocked.id).to_dict() == {'job_id': blocked.id, 'kind': 'test', 'status': 'succeeded', 'result': True}
+        assert load_job('does-not-exist') is None
+    worker_a.shutdown()
+    worker_b.shutdown()
+
+def test_job_queue_reports_interrupted_jobs(test_app):
+    """Test a job left unfinished by a process that exited is reported as failed and frees its slot."""
+    queue = GenerationJobQueue(test_app, workers=1, max_pending_per_user=1)
+    with test_app.app_context():
+        db.session.add(BackgroundJob(id='interrupted', queue='generation', user_id=4, kind='test', status='running',
+                                     timeout_at=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=1)))
+        db.session.commit()
+        data = load_job('interrupted').to_dict()
+    assert data['status'] == 'failed'
+    assert 'interrupted' in data['error']
+    job = queue.submit(4, 'test', lambda: 'ok')
+    assert job.wait(timeout=5)
+    queue.shutdown()
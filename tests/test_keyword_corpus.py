@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from backend.keyword_corpus import (
+    DocumentFrequencyTable, count_document_frequencies, iter_job_descriptions, write_document_frequency_table,
+)
+from backend.keyword_engine import KeywordEngine
+from tests.test_keyword_engine import fake_loader
+
+
+def test_table_round_trip(tmp_path):
+    path = str(tmp_path / 'df.bin')
+    frequencies = {f'term{index}': index + 1 for index in range(1000)}
+    frequencies['machine learning'] = 40
+    assert write_document_frequency_table(path, 50, frequencies) == 1001
+    table = DocumentFrequencyTable(path)
+    try:
+        assert table.document_count == 50
+        assert table.term_count == 1001
+        assert table.document_frequency('term0') == 1
+        assert table.document_frequency('term999') == 1000
+        assert table.document_frequency('machine learning') == 40
+        assert table.document_frequency('never seen') == 0
+        assert table.stats()['size_bytes'] == os.path.getsize(path)
+    finally:
+        table.close()
+
+def test_empty_table(tmp_path):
+    path = str(tmp_path / 'df.bin')
+    write_document_frequency_table(path, 0, {})
+    table = DocumentFrequencyTable(path)
+    assert table.document_frequency('python') == 0
+    table.close()
+
+def test_invalid_table_is_rejected(tmp_path):
+    path = tmp_path / 'df.bin'
+    path.write_bytes(b'not a table at all, just some bytes')
+    with pytest.raises(ValueError):
+        DocumentFrequencyTable(str(path))
+    write_document_frequency_table(str(path), 3, {'python': 2})
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        DocumentFrequencyTable(str(path))
+
+def test_iter_job_descriptions(tmp_path):
+    (tmp_path / 'one.txt').write_text('Python developer', encoding='utf-8')
+    (tmp_path / 'blank.txt').write_text('  \n', encoding='utf-8')
+    (tmp_path / 'notes.md').write_text('Not a job description', encoding='utf-8')
+    nested = tmp_path / 'exports'
+    nested.mkdir()
+    (nested / 'jobs.jsonl').write_text('\n'.join([
+        json.dumps({'job_description': 'Flask engineer'}),
+        json.dumps('Data analyst'),
+        '',
+        json.dumps({'title': 'No description'}),
+    ]), encoding='utf-8')
+    assert list(iter_job_descriptions([str(tmp_path)])) == ['Python developer', 'Flask engineer', 'Data analyst']
+    assert list(iter_job_descriptions([str(tmp_path / 'notes.md')])) == ['Not a job description']
+
+def test_count_document_frequencies_counts_documents_not_occurrences():
+    engine = KeywordEngine(loader=fake_loader)
+    documents = ['Python python developers', 'Python developer.', 'Flask developer']
+    count, frequencies = count_document_frequencies(engine, documents, min_df=2)
+    assert count == 3
+    assert frequencies == {'python': 2, 'developer': 3, 'python developer': 2}
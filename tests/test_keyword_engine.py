@@ -0,0 +1,147 @@
+import string
+
+import pytest
+from flask import url_for
+
+from backend.generation_cache import MemoryCache
+from backend.keyword_corpus import DocumentFrequencyTable, write_document_frequency_table
+from backend.keyword_engine import KeywordEngine, KeywordEngineUnavailable, NlpResources, make_document_key
+
+
+def fake_loader(language):
+    """Stands in for the NLTK corpora: whitespace tokens, a tiny stopword list, plural stripping."""
+    fake_loader.calls += 1
+    resources = NlpResources(
+        stop_words=frozenset({'the', 'and', 'with', 'for'}),
+        punctuation=frozenset(string.punctuation),
+        tokenize=lambda text: text.replace('.', ' .').replace(',', ' ,').split(),
+        lemmatize=lambda word: word[:-1] if word.endswith('s') and not word.endswith('ss') else word,
+    )
+    return resources, {'stopwords': 0.001, 'wordnet': 0.002, 'punkt': 0.0}
+
+fake_loader.calls = 0
+
+
+def missing_data_loader(language):
+    raise LookupError('Resource wordnet not found.')
+
+
+def login(client, username, password):
+    return client.post(url_for('auth.login'), data={'username': username, 'password': password}, follow_redirects=True)
+
+
+def test_extract_ranks_lemmatized_content_words():
+    engine = KeywordEngine(loader=fake_loader)
+    keywords = engine.extract('Python developers, Python APIs and the Flask APIs. Flask with SQL for developer roles.')
+    assert keywords[:3] == ['python', 'developer', 'api']
+    assert 'the' not in keywords and 'and' not in keywords
+    assert engine.extract('python flask sql', top_n=2) == ['python', 'flask']
+
+def test_resources_are_loaded_once():
+    engine = KeywordEngine(loader=fake_loader)
+    calls = fake_loader.calls
+    engine.warm_up()
+    engine.extract('python flask')
+    engine.extract('django postgres')
+    assert fake_loader.calls == calls + 1
+    stats = engine.stats()
+    assert stats['ready'] is True
+    assert stats['extractions'] == 2
+    assert stats['resource_seconds'] == {'stopwords': 0.001, 'wordnet': 0.002, 'punkt': 0.0}
+    assert stats['warmup_seconds'] >= 0
+
+def test_lemmas_are_memoized_across_documents():
+    engine = KeywordEngine(loader=fake_loader, lemma_cache_size=2)
+    engine.extract('python python developers')
+    engine.extract('developers python')
+    lemma_cache = engine.stats()['lemma_cache']
+    # Each distinct token is lemmatized once per document, then served from the memo
+    assert (lemma_cache['hits'], lemma_cache['misses']) == (2, 2)
+    assert lemma_cache['hit_ratio'] == 0.5
+    assert lemma_cache['size'] == 2
+    engine.extract('flask django sql')
+    assert engine.stats()['lemma_cache']['size'] == 2 # Bounded
+
+def test_results_are_cached_by_document_hash():
+    engine = KeywordEngine(loader=fake_loader, result_cache=MemoryCache(max_entries=8))
+    first = engine.extract('Python and Flask developers')
+    first.append('mutated by caller')
+    assert engine.extract('  python AND flask\n developers ') == ['python', 'flask', 'developer']
+    assert engine.stats()['extractions'] == 1
+    assert engine.stats()['result_cache']['hits'] == 1
+    engine.extract('Python and Flask developers', top_n=1)
+    assert engine.stats()['extractions'] == 2 # top_n is part of the key
+
+def test_document_key_ignores_case_and_whitespace():
+    assert make_document_key('Python  Flask\n', 15) == make_document_key('python flask', 15)
+    assert make_document_key('python flask', 15) != make_document_key('python flask', 10)
+    assert make_document_key('python flask', 15) != make_document_key('pythonflask', 15)
+
+@pytest.fixture
+def df_table(tmp_path):
+    """100 job descriptions: 'developer' and 'team' are in nearly all, 'terraform' in few."""
+    path = str(tmp_path / 'df.bin')
+    write_document_frequency_table(path, 100, {
+        'developer': 95, 'team': 90, 'experience': 90, 'python': 30, 'terraform': 3,
+        'machine': 10, 'learning': 12, 'machine learning': 8, 'senior': 60,
+    })
+    table = DocumentFrequencyTable(path)
+    yield table
+    table.close()
+
+def test_document_terms_include_phrases_within_runs():
+    engine = KeywordEngine(loader=fake_loader, max_ngram=3)
+    terms = engine.document_terms('Senior machine learning engineers, and python.')
+    assert list(terms) == [
+        'senior', 'machine', 'senior machine', 'learning', 'machine learning', 'senior machine learning',
+        'engineer', 'learning engineer', 'machine learning engineer', 'python',
+    ]
+    assert 'engineer python' not in terms # Punctuation and stopwords end a phrase
+
+def test_tfidf_ranks_distinctive_terms_and_phrases_first(df_table):
+    engine = KeywordEngine(loader=fake_loader, df_table=df_table)
+    text = ('Developer team. Developer team. Developer team with experience. '
+            'Terraform. Machine learning for the team. Python developers.')
+    keywords = engine.extract(text)
+    # Frequency ranking would put 'developer' and 'team' first
+    assert keywords[:2] == ['terraform', 'machine learning']
+    assert keywords.index('python') < keywords.index('experience')
+    # Words only seen inside a chosen phrase aren't repeated on their own
+    assert 'machine' not in keywords and 'learning' not in keywords
+    # An unseen phrase repeated in the description scores like its most common word
+    assert keywords.index('developer team') > keywords.index('developer')
+    # Unknown word pairs that occur once aren't treated as phrases
+    assert 'python developer' not in keywords
+    stats = engine.stats()
+    assert stats['ranking'] == 'tfidf'
+    assert stats['df_table']['documents'] == 100
+
+def test_repeated_unknown_phrase_counts_as_phrase(df_table):
+    engine = KeywordEngine(loader=fake_loader, df_table=df_table)
+    keywords = engine.extract('Acme cloud. Acme cloud. Team developer.')
+    assert keywords[0] == 'acme cloud'
+
+def test_missing_nltk_data_is_reported():
+    engine = KeywordEngine(loader=missing_data_loader)
+    with pytest.raises(KeywordEngineUnavailable):
+        engine.extract('python flask')
+    stats = engine.stats()
+    assert stats['ready'] is False
+    assert 'wordnet' in stats['warmup_error']
+
+def test_extract_keywords_route_uses_app_engine(test_client, new_user, test_app, monkeypatch):
+    monkeypatch.setitem(test_app.extensions, 'keyword_engine', KeywordEngine(loader=fake_loader))
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.extract_keywords'),
+                                    json={'job_description': 'Flask APIs with Python. Python jobs.'})
+    assert response.status_code == 200
+    assert response.get_json()['keywords'] == ['python', 'flask', 'api', 'job']
+
+def test_extract_keywords_route_without_nltk_data(test_client, new_user, test_app, monkeypatch):
+    monkeypatch.setitem(test_app.extensions, 'keyword_engine', KeywordEngine(loader=missing_data_loader))
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('generation_api.extract_keywords'), json={'job_description': 'Python'})
+    assert response.status_code == 503
+    assert 'unavailable' in response.get_json()['error']
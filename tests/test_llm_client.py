@@ -0,0 +1,39 @@
+import pytest
+from backend.llm_client import GeminiClient, FakeLLMClient, LLMNotConfigured, init_llm_client
+from backend.llm_resilience import ResilientLLMClient
+
+
+def test_gemini_client_without_api_key():
+    """Test the Gemini client reports itself unconfigured and refuses to generate without a key."""
+    client = GeminiClient(None, 'gemini-test-model')
+    assert client.is_configured is False
+    with pytest.raises(LLMNotConfigured):
+        client.generate('prompt')
+
+def test_gemini_client_uses_configured_model():
+    """Test the model name and generation parameters come from the constructor, not constants."""
+    client = GeminiClient('dummy-key', 'gemini-test-model', {'temperature': 0.2})
+    assert client.is_configured is True
+    assert client.model_name == 'gemini-test-model'
+    assert client._model.model_name == 'models/gemini-test-model'
+
+def test_fake_client_stream_matches_generate():
+    """Test the fake client streams the same text it would return in one call."""
+    client = FakeLLMClient(response_text='One two  three\nfour')
+    assert ''.join(client.stream('prompt')) == client.generate('prompt')
+    assert list(client.stream('prompt')) == ['One ', 'two  ', 'three\n', 'four']
+    assert client.calls == ['prompt'] * 3
+
+def test_init_llm_client_from_config(test_app):
+    """Test the app builds one shared client from its config."""
+    assert isinstance(test_app.extensions['llm_client'], ResilientLLMClient)
+    assert isinstance(test_app.extensions['llm_client'].client, FakeLLMClient)
+    test_app.config['GEMINI_TEMPERATURE'] = 0.5
+    try:
+        client = init_llm_client(test_app)
+        assert client.model_name == test_app.config['GEMINI_MODEL_NAME']
+        assert client.client.generation_config == {'temperature': 0.5}
+        assert client.max_retries == test_app.config['LLM_MAX_RETRIES']
+    finally:
+        test_app.config['GEMINI_TEMPERATURE'] = None
+        init_llm_client(test_app)
@@ -0,0 +1,152 @@
+import pytest
+from backend.llm_client import FakeLLMClient
+from backend.llm_resilience import CircuitBreaker, ResilientLLMClient, LLMUnavailable, LLMTimeout
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FlakyClient(FakeLLMClient):
+    """Fails with the given errors in order, then succeeds."""
+    def __init__(self, errors):
+        super().__init__(response_text='ok')
+        self.errors = list(errors)
+    def generate(self, prompt, timeout=None):
+        self.calls.append(timeout)
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.response_text
+
+
+def make_client(inner, clock, **kwargs):
+    breaker = kwargs.pop('breaker', None) or CircuitBreaker(min_calls=4, window=4, reset_timeout=30, clock=clock)
+    return ResilientLLMClient(inner, breaker=breaker, sleep=clock.sleep, clock=clock, **kwargs)
+
+def test_retries_retryable_errors_with_backoff():
+    """Test transient errors are retried and the call succeeds."""
+    clock = FakeClock()
+    inner = FlakyClient([ConnectionError('reset'), TimeoutError('slow')])
+    client = make_client(inner, clock, max_retries=2, backoff_base=1, backoff_max=4)
+    assert client.generate('prompt') == 'ok'
+    assert len(inner.calls) == 3
+    assert client.retries == 2
+    assert clock.now <= 1 + 2 # Full jitter never sleeps longer than the backoff cap per attempt
+
+def test_does_not_retry_non_retryable_errors():
+    """Test request errors are raised immediately."""
+    clock = FakeClock()
+    inner = FlakyClient([ValueError('bad prompt')])
+    client = make_client(inner, clock, max_retries=3)
+    with pytest.raises(ValueError):
+        client.generate('prompt')
+    assert len(inner.calls) == 1
+    assert client.breaker.state == 'closed'
+
+def test_timeout_is_translated_after_retries_exhausted():
+    """Test a persistent provider timeout surfaces as LLMTimeout."""
+    clock = FakeClock()
+    inner = FlakyClient([TimeoutError('slow')] * 3)
+    client = make_client(inner, clock, max_retries=2)
+    with pytest.raises(LLMTimeout):
+        client.generate('prompt')
+    assert len(inner.calls) == 3
+
+def test_attempt_timeout_is_capped_by_remaining_deadline():
+    """Test each attempt gets the smaller of the per-attempt timeout and what is left of the deadline."""
+    clock = FakeClock()
+    inner = FlakyClient([ConnectionError('reset')])
+    client = make_client(inner, clock, timeout=10, deadline=12, max_retries=1, backoff_base=1, backoff_max=1)
+    def slow_sleep(seconds):
+        clock.now += 5 # Pretend the failed attempt plus backoff took 5s
+    client._sleep = slow_sleep
+    client.generate('prompt')
+    assert inner.calls == [10, 7]
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test the breaker opens on a high failure rate, fast-fails, then closes after a successful trial."""
+    clock = FakeClock()
+    inner = FlakyClient([ConnectionError('down')] * 4)
+    client = make_client(inner, clock, max_retries=0)
+    for _ in range(4):
+        with pytest.raises(ConnectionError):
+            client.generate('prompt')
+    assert client.breaker.state == 'open'
+
+    with pytest.raises(LLMUnavailable):
+        client.generate('prompt')
+    assert len(inner.calls) == 4 # Rejected without calling the model
+
+    clock.now += 30
+    assert client.breaker.state == 'half_open'
+    assert client.generate('prompt') == 'ok'
+    stats = client.stats()
+    assert stats['state'] == 'closed'
+    assert stats['rejected_calls'] == 1
+    assert stats['transitions'] == {'closed->open': 1, 'open->half_open': 1, 'half_open->closed': 1}
+
+def test_half_open_failure_reopens():
+    """Test a failed trial call sends the breaker straight back to open."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow() is True # The single trial call
+    assert breaker.allow() is False # Concurrent calls are still rejected
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+def test_half_open_trial_with_non_retryable_error_keeps_breaker_half_open():
+    """Test a trial call failing with e.g. an auth error neither closes the breaker nor blocks the next trial."""
+    clock = FakeClock()
+    inner = FlakyClient([PermissionError('invalid API key')])
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=10, clock=clock)
+    client = make_client(inner, clock, breaker=breaker)
+    breaker.record_failure()
+    clock.now += 10
+    with pytest.raises(PermissionError):
+        client.generate('prompt')
+    assert breaker.state == 'half_open'
+    assert client.generate('prompt') == 'ok' # The slot was released for the next trial
+    assert breaker.state == 'closed'
+
+def test_expired_deadline_does_not_count_against_breaker():
+    """Test a call whose deadline is already spent fails without calling the model or touching the breaker."""
+    clock = FakeClock()
+    inner = FlakyClient([])
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=10, clock=clock)
+    impatient = make_client(inner, clock, deadline=0, breaker=breaker)
+    for _ in range(5):
+        with pytest.raises(LLMTimeout):
+            impatient.generate('prompt')
+    assert inner.calls == []
+    assert breaker.state == 'closed'
+
+    # Nor does it take the half-open trial slot away from a caller that can use it
+    breaker.record_failure()
+    clock.now += 10
+    with pytest.raises(LLMTimeout):
+        impatient.generate('prompt')
+    assert make_client(inner, clock, breaker=breaker).generate('prompt') == 'ok'
+    assert breaker.state == 'closed'
+
+def test_stream_retries_before_first_chunk():
+    """Test a stream that fails to start is retried transparently."""
+    clock = FakeClock()
+    inner = FakeLLMClient(response_text='Hello World')
+    client = make_client(inner, clock, max_retries=1)
+    inner_stream = inner.stream
+    attempts = []
+    def stream_once_failing(prompt, timeout=None):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            raise ConnectionError('reset')
+        return inner_stream(prompt, timeout=timeout)
+    inner.stream = stream_once_failing
+    assert list(client.stream('prompt')) == ['Hello ', 'World']
+    assert len(attempts) == 2
@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def alembic(db_path, *args):
+    """Run an alembic command against a SQLite file in its own process, as a deployment would."""
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + db_path, LLM_BACKEND='fake')
+    result = subprocess.run(
+        [sys.executable, '-m', 'alembic', '-c', os.path.join(PROJECT_ROOT, 'alembic.ini'), *args],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def user_indexes(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {row[1] for row in conn.execute("PRAGMA index_list('user')")}
+
+
+def test_migrations_downgrade_to_base_and_upgrade_again(tmp_path):
+    db_path = str(tmp_path / 'migrations.db')
+    alembic(db_path, 'upgrade', 'head')
+    assert 'ix_user_username_lower' in user_indexes(db_path)
+
+    alembic(db_path, 'downgrade', 'base')
+    with sqlite3.connect(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables <= {'alembic_version'}
+
+    alembic(db_path, 'upgrade', 'head')
+    assert {'ix_user_username_lower', 'ix_user_resume_generations_id'} <= user_indexes(db_path)
@@ -1,5 +1,7 @@
 import pytest
 from flask import url_for, json
+from sqlalchemy import event
+from backend.app import db
 # Assuming User model is in backend.models
 from backend.models import User, PersonalInfo, Experience, Education, Skill, Project
 
@@ -127,3 +129,188 @@ def test_save_empty_profile(test_client, new_user, test_app):
         assert retrieved_data['educations'] == []
         assert retrieved_data['skills'] == []
         assert retrieved_data['projects'] == []
+
+def test_save_profile_incremental(test_client, new_user, test_app):
+    """Test saves diff items by id: kept rows keep their ids, only changes are written."""
+    first_save = {
+        'personal_info': {'full_name': 'Test User'},
+        'experiences': [{'job_title': 'Job A'}, {'job_title': 'Job B'}],
+        'skills': [{'skill_name': 'Python'}, {'skill_name': ''}], # Blank items are dropped
+    }
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.post(url_for('profile_api.save_profile'), json=first_save)
+        assert response.status_code == 200
+        ids = response.get_json()['ids']
+        job_a, job_b = ids['experiences']
+        assert ids['skills'][1] is None
+        version = db.session.get(User, new_user.id).profile_version
+
+        # Edit Job A, remove Job B, add Job C
+        second_save = {
+            'personal_info': {'full_name': 'Test User'},
+            'experiences': [{'id': job_a, 'job_title': 'Job A (edited)'}, {'job_title': 'Job C'}],
+            'skills': [{'id': ids['skills'][0], 'skill_name': 'Python'}],
+        }
+        response = test_client.post(url_for('profile_api.save_profile'), json=second_save)
+        new_ids = response.get_json()['ids']
+        assert new_ids['experiences'][0] == job_a
+        assert new_ids['experiences'][1] not in (job_a, job_b)
+        assert new_ids['skills'] == ids['skills'][:1]
+        assert db.session.get(User, new_user.id).profile_version == version + 1
+
+        profile = test_client.get(url_for('profile_api.get_profile')).get_json()
+        assert [exp['job_title'] for exp in profile['experiences']] == ['Job A (edited)', 'Job C']
+        assert db.session.get(Experience, job_b) is None
+
+def test_save_profile_unchanged_writes_nothing(test_client, new_user, test_app):
+    """Test an autosave of an unchanged profile issues no writes and keeps the version."""
+    profile_data = {'personal_info': {'full_name': 'Test User'}, 'skills': [{'skill_name': 'Python'}]}
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        ids = test_client.post(url_for('profile_api.save_profile'), json=profile_data).get_json()['ids']
+        profile_data['skills'][0]['id'] = ids['skills'][0]
+        version = db.session.get(User, new_user.id).profile_version
+
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = test_client.post(url_for('profile_api.save_profile'), json=profile_data)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+        assert not [s for s in statements if s.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        db.session.expire_all()
+        assert db.session.get(User, new_user.id).profile_version == version
+
+def test_profile_item_endpoints(test_client, new_user, test_app):
+    """Test creating, updating and deleting single items, each bumping the profile version."""
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        version = db.session.get(User, new_user.id).profile_version
+
+        created = test_client.post(url_for('profile_api.create_profile_item', section='experiences'),
+                                   json={'job_title': 'Dev', 'company_name': 'Acme'})
+        assert created.status_code == 201
+        item = created.get_json()
+        assert item['job_title'] == 'Dev'
+
+        updated = test_client.patch(url_for('profile_api.update_profile_item', section='experiences', item_id=item['id']),
+                                    json={'description': 'Built things.'})
+        assert updated.status_code == 200
+        assert updated.get_json() == dict(item, description='Built things.')
+
+        personal = test_client.patch(url_for('profile_api.patch_personal_info'), json={'full_name': 'Test User'})
+        assert personal.status_code == 200
+
+        deleted = test_client.delete(url_for('profile_api.delete_profile_item', section='experiences', item_id=item['id']))
+        assert deleted.status_code == 200
+
+        db.session.expire_all()
+        assert db.session.get(User, new_user.id).profile_version == version + 4
+        profile = test_client.get(url_for('profile_api.get_profile')).get_json()
+        assert profile['experiences'] == []
+        assert profile['personal_info']['full_name'] == 'Test User'
+
+def test_profile_item_endpoints_validate(test_client, new_user, test_app):
+    """Test invalid sections, blank required fields and other users' items are rejected."""
+    with test_app.app_context():
+        other = User(username='otheruser')
+        other.set_password('password')
+        db.session.add(other)
+        db.session.commit()
+        other_skill = Skill(user_id=other.id, skill_name='Secret')
+        db.session.add(other_skill)
+        db.session.commit()
+
+        login(test_client, new_user.username, 'password')
+        bad_section = test_client.post(url_for('profile_api.create_profile_item', section='hobbies'), json={'name': 'x'})
+        blank = test_client.post(url_for('profile_api.create_profile_item', section='skills'), json={'skill_name': ''})
+        foreign = test_client.patch(url_for('profile_api.update_profile_item', section='skills', item_id=other_skill.id),
+                                    json={'skill_name': 'Mine'})
+
+        assert bad_section.status_code == 400
+        assert blank.status_code == 400
+        assert foreign.status_code == 404
+        assert db.session.get(Skill, other_skill.id).skill_name == 'Secret'
+
+        db.session.delete(other)
+        db.session.commit()
+
+def test_patch_profile_bulk(test_client, new_user, test_app):
+    """Test the JSON-Patch style endpoint applies all operations or none."""
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        response = test_client.patch(url_for('profile_api.patch_profile'), json=[
+            {'op': 'add', 'path': '/skills', 'value': {'skill_name': 'Python'}},
+            {'op': 'add', 'path': '/skills', 'value': {'skill_name': 'SQL'}},
+            {'op': 'replace', 'path': '/personal_info', 'value': {'full_name': 'Test User'}},
+        ])
+        assert response.status_code == 200
+        python_id, sql_id = [result['id'] for result in response.get_json()['results'][:2]]
+
+        failed = test_client.patch(url_for('profile_api.patch_profile'), json=[
+            {'op': 'remove', 'path': f'/skills/{python_id}'},
+            {'op': 'replace', 'path': f'/skills/{sql_id}', 'value': {'skill_name': ''}}, # Invalid, rolls back the remove
+        ])
+        assert failed.status_code == 400
+
+        response = test_client.patch(url_for('profile_api.patch_profile'), json=[
+            {'op': 'remove', 'path': f'/skills/{python_id}'},
+            {'op': 'replace', 'path': f'/skills/{sql_id}', 'value': {'skill_name': 'PostgreSQL'}},
+        ])
+        assert response.status_code == 200
+
+        profile = test_client.get(url_for('profile_api.get_profile')).get_json()
+        assert [skill['skill_name'] for skill in profile['skills']] == ['PostgreSQL']
+
+def test_get_profile_conditional(test_client, new_user, test_app):
+    """Test get_profile returns an ETag, answers 304 while it matches and 200 after a save."""
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        first = test_client.get(url_for('profile_api.get_profile'))
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+        assert 'private' in first.headers['Cache-Control']
+
+        cached = test_client.get(url_for('profile_api.get_profile'), headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == etag
+
+        test_client.post(url_for('profile_api.save_profile'), json={'personal_info': {'full_name': 'Test User'}})
+        changed = test_client.get(url_for('profile_api.get_profile'), headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+        assert changed.get_json()['personal_info']['full_name'] == 'Test User'
+
+def test_profile_summary(test_client, new_user, test_app):
+    """Test the summary reports counts, completeness flags and skills in one query."""
+    with test_app.app_context():
+        login(test_client, new_user.username, 'password')
+        empty = test_client.get(url_for('profile_api.get_profile_summary')).get_json()
+        assert empty['counts'] == {'experiences': 0, 'educations': 0, 'skills': 0, 'projects': 0}
+        assert empty['complete'] == {'personal_info': False, 'resume': False, 'cover_letter': False}
+
+        db.session.add(Experience(user_id=new_user.id, job_title='Dev', description='A long description.'))
+        db.session.add_all([Skill(user_id=new_user.id, skill_name=name) for name in ('Python', 'SQL')])
+        db.session.commit()
+
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = test_client.get(url_for('profile_api.get_profile_summary'))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        summary = response.get_json()
+        assert response.headers['ETag']
+        assert len(statements) == 2 # The flask-login user lookup plus the summary query
+        assert summary['counts'] == {'experiences': 1, 'educations': 0, 'skills': 2, 'projects': 0}
+        assert summary['complete'] == {'personal_info': False, 'resume': True, 'cover_letter': False}
+        assert summary['skills'] == ['Python', 'SQL']
@@ -0,0 +1,53 @@
+from backend.prompt_builder import DEFAULT_BUDGET
+from backend.profile_cache import ProfileFragmentCache, RenderedProfile
+
+PROFILE = {
+    'personal_info': {'full_name': 'Test User'},
+    'experiences': [{'job_title': 'Tester'}],
+    'educations': [], 'skills': [], 'projects': [],
+}
+
+
+def test_rendered_profile_flags():
+    rendered = RenderedProfile.from_profile_data(PROFILE, DEFAULT_BUDGET)
+    assert rendered.has_profile
+    assert rendered.full_name == 'Test User'
+    assert 'Tester' in rendered.fragments.resume
+
+    empty = RenderedProfile.from_profile_data({'personal_info': {}, 'experiences': []}, DEFAULT_BUDGET)
+    assert not empty.has_profile
+    assert empty.full_name == ''
+
+
+def test_rendered_profile_json_round_trip():
+    rendered = RenderedProfile.from_profile_data(PROFILE, DEFAULT_BUDGET)
+    raw = rendered.to_json(version=3, item_tokens=500)
+    assert RenderedProfile.from_json(raw, 3, 500) == rendered
+    assert RenderedProfile.from_json(raw, 4, 500) is None # Profile saved since
+    assert RenderedProfile.from_json(raw, 3, 200) is None # Different budget
+    assert RenderedProfile.from_json('not json', 3, 500) is None
+
+
+def test_cache_entries_expire_with_version():
+    cache = ProfileFragmentCache()
+    rendered = RenderedProfile.from_profile_data(PROFILE, DEFAULT_BUDGET)
+    cache.set(1, 7, 500, rendered)
+    assert cache.get(1, 7, 500) is rendered
+    assert cache.get(1, 8, 500) is None
+    assert cache.get(1, 7, 500) is None # The stale entry was dropped
+    assert cache.stats()['hits'] == 1
+
+
+def test_cache_invalidate_and_lru():
+    cache = ProfileFragmentCache(max_entries=2)
+    rendered = RenderedProfile.from_profile_data(PROFILE, DEFAULT_BUDGET)
+    cache.set(1, 0, 500, rendered)
+    cache.set(1, 0, 200, rendered)
+    cache.invalidate(1)
+    assert cache.stats()['size'] == 0
+
+    for user_id in (1, 2, 3):
+        cache.set(user_id, 0, 500, rendered)
+    assert cache.get(1, 0, 500) is None # Least recently used, evicted
+    assert cache.get(3, 0, 500) is rendered
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,55 @@
+from sqlalchemy import event
+
+from backend.app import db
+from backend.models import PersonalInfo, Experience, Education, Skill, Project
+from backend.profile_service import Profile, load_profile
+
+
+def test_load_profile_missing_user(test_app):
+    with test_app.app_context():
+        assert load_profile(999999) is None
+
+
+def test_load_profile_empty(test_app, new_user):
+    with test_app.app_context():
+        profile = load_profile(new_user.id)
+    assert profile.to_dict() == {
+        'username': 'testuser', 'personal_info': {},
+        'experiences': [], 'educations': [], 'skills': [], 'projects': [],
+    }
+
+
+def test_load_profile_eager_and_ordered(test_app, new_user):
+    """Test the whole profile is loaded by one eager statement with collections ordered by id."""
+    with test_app.app_context():
+        db.session.add(PersonalInfo(user_id=new_user.id, full_name='Test User'))
+        db.session.add_all([Experience(user_id=new_user.id, job_title=f'Job {i}') for i in range(3)])
+        db.session.add(Education(user_id=new_user.id, degree_name='B.S.'))
+        db.session.add_all([Skill(user_id=new_user.id, skill_name=name) for name in ('Python', 'SQL')])
+        db.session.add(Project(user_id=new_user.id, project_name='Tool'))
+        db.session.commit()
+        db.session.expunge_all()
+
+        statements = []
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            profile = load_profile(new_user.id)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        # User + personal info in one query, then one selectin query per collection
+        assert len(statements) == 5
+        assert profile.personal_info['full_name'] == 'Test User'
+        assert [exp['job_title'] for exp in profile.experiences] == ['Job 0', 'Job 1', 'Job 2']
+        assert [skill['skill_name'] for skill in profile.skills] == ['Python', 'SQL']
+        assert profile.projects[0]['project_name'] == 'Tool'
+
+
+def test_profile_from_dict_round_trip():
+    data = {
+        'username': 'someone', 'personal_info': {'full_name': 'Some One'},
+        'experiences': [{'id': 1, 'job_title': 'Dev'}], 'educations': [], 'skills': [], 'projects': [],
+    }
+    assert Profile.from_dict(data).to_dict() == data
@@ -0,0 +1,61 @@
+from backend.prompt_builder import (
+    PromptBudget, build_resume_prompt, build_cover_letter_prompt, render_profile_fragments,
+    estimate_tokens, trim_to_tokens, TRUNCATION_MARKER,
+)
+
+PROFILE = {
+    'personal_info': {'full_name': 'Test User', 'email_address': 'test@example.com'},
+    'experiences': [
+        {'job_title': 'Engineer', 'company_name': 'Acme', 'location': None, 'start_date': 'Jan 2020', 'end_date': 'Present', 'description': 'Built things.\nShipped things.'},
+        {'job_title': 'Engineer', 'company_name': 'Beta', 'location': 'Remote', 'start_date': '2018', 'end_date': '2019', 'description': ''},
+        {'job_title': 'Intern', 'company_name': 'Gamma', 'location': 'NYC', 'start_date': '2017', 'end_date': '2017', 'description': None},
+    ],
+    'educations': [{'degree_name': 'B.S.', 'major': 'CS', 'institution_name': 'Uni', 'location': 'Town', 'graduation_date': '2017'}],
+    'skills': [{'skill_name': 'Python'}, {'skill_name': 'Flask'}],
+    'projects': [{'project_name': 'Tool', 'description': 'A tool.', 'link': 'https://example.com'}],
+}
+
+
+def test_resume_prompt_contains_profile_and_instructions():
+    """Test the resume prompt includes the job description, every profile section and the formatting rules."""
+    prompt = build_resume_prompt(PROFILE, 'Looking for a Python engineer.')
+    assert prompt.startswith("Generate a professional resume")
+    assert "\n--- JOB DESCRIPTION ---\nLooking for a Python engineer.\n" in prompt
+    assert "- **Engineer** at Acme (N/A)" in prompt # Missing values render as N/A, not None
+    assert "  Responsibilities/Achievements:\n    - Built things.\n    - Shipped things." in prompt
+    assert "- Python, Flask" in prompt
+    assert "  Link: https://example.com" in prompt
+    assert prompt.endswith("are present in the final output if they were provided in the input profile.")
+
+def test_cover_letter_prompt_is_deterministic():
+    """Test repeated titles are de-duplicated in profile order so the prompt never varies between runs."""
+    prompt = build_cover_letter_prompt(PROFILE, 'JD', 'Acme', hiring_manager='Ms. Smith')
+    assert "Address it to Ms. Smith." in prompt
+    assert "Relevant Experience Areas: Engineer, Intern" in prompt
+    assert "Key Skills: Python, Flask" in prompt
+
+def test_trim_to_tokens_cuts_at_boundary():
+    """Test long text is cut near the budget at a sentence boundary and marked as truncated."""
+    text = "First sentence here. " * 100
+    trimmed = trim_to_tokens(text, 50)
+    assert estimate_tokens(trimmed) <= 50
+    assert trimmed.endswith("here." + TRUNCATION_MARKER)
+    assert trim_to_tokens("short\n\n\n\ntext  \n", 50) == "short\n\ntext"
+
+def test_oversized_job_description_is_trimmed_to_budget():
+    """Test a huge job description is trimmed so the whole prompt stays near the total budget."""
+    budget = PromptBudget(total_tokens=1500, job_description_tokens=3000, item_description_tokens=500)
+    prompt = build_resume_prompt(PROFILE, "Requirement line.\n" * 5000, budget)
+    assert TRUNCATION_MARKER in prompt
+    assert estimate_tokens(prompt) <= budget.total_tokens + 10
+
+def test_long_item_descriptions_are_trimmed():
+    """Test each experience description is capped at the per-item budget."""
+    profile = dict(PROFILE, experiences=[dict(PROFILE['experiences'][0], description="Did a thing. " * 500)])
+    fragments = render_profile_fragments(profile, PromptBudget(8000, 3000, 100))
+    assert estimate_tokens(fragments.resume) < 200
+    assert TRUNCATION_MARKER in fragments.resume
+
+def test_profile_fragments_are_deterministic():
+    """Test rendering the same profile content twice gives identical fragments (and so identical prompt cache keys)."""
+    assert render_profile_fragments(PROFILE) == render_profile_fragments(dict(PROFILE))
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from flask import url_for, json
+from sqlalchemy import event
+
+from backend.app import db
+from backend.models import User, SiteStats, GenerationDailyStats
+from backend.generation_counters import DirectCounters
+from backend.site_stats import SITE_STATS_ID, load_dashboard_stats, utc_today, add_daily_generations
+
+
+def login(client, username, password):
+    return client.post(url_for('auth.login'), data={'username': username, 'password': password}, follow_redirects=True)
+
+def _totals():
+    totals = db.session.get(SiteStats, SITE_STATS_ID, populate_existing=True)
+    return totals.user_count, totals.resume_generations, totals.cover_letter_generations
+
+def _user_table_totals():
+    return tuple(db.session.execute(db.select(
+        db.func.count(User.id),
+        db.func.coalesce(db.func.sum(User.resume_generations), 0),
+        db.func.coalesce(db.func.sum(User.cover_letter_generations), 0),
+    )).one())
+
+def _today_bucket():
+    bucket = db.session.get(GenerationDailyStats, utc_today(), populate_existing=True)
+    return (bucket.resume_generations, bucket.cover_letter_generations, bucket.active_users) if bucket else (0, 0, 0)
+
+
+def test_totals_follow_user_inserts_and_deletes(test_app):
+    with test_app.app_context():
+        load_dashboard_stats(days=1) # Make sure the row exists
+        users_before = _totals()[0]
+        user = User(username='statsuser', resume_generations=2)
+        db.session.add(user)
+        db.session.commit()
+        assert _totals() == _user_table_totals()
+        assert _totals()[0] == users_before + 1
+
+        db.session.delete(user)
+        db.session.commit()
+        assert _totals() == _user_table_totals()
+        assert _totals()[0] == users_before
+
+def test_generations_update_totals_and_daily_bucket(test_app, new_user):
+    with test_app.app_context():
+        load_dashboard_stats(days=1)
+        other = User(username='statsother')
+        db.session.add(other)
+        db.session.commit()
+        before = _today_bucket()
+
+        counters = DirectCounters()
+        counters.increment(new_user.id, ('resume_generations',))
+        counters.increment(new_user.id, ('resume_generations', 'cover_letter_generations'))
+        counters.increment(other.id, ('cover_letter_generations',), by=3)
+
+        after = _today_bucket()
+        # Each user counts as active once per day however often they generate
+        assert (after[0] - before[0], after[1] - before[1], after[2] - before[2]) == (2, 4, 2)
+        assert _totals() == _user_table_totals()
+
+        db.session.delete(other) # Deleting a user removes their generations from the totals, not from the days
+        db.session.commit()
+        assert _totals() == _user_table_totals()
+        assert _today_bucket() == after
+
+def test_daily_upsert_accumulates(test_app):
+    day = utc_today() - timedelta(days=400) # Out of the dashboard's range, not touched by other tests
+    with test_app.app_context():
+        add_daily_generations(db.session.connection(), day, resume_generations=1, active_users=1)
+        add_daily_generations(db.session.connection(), day, resume_generations=2, cover_letter_generations=1)
+        db.session.commit()
+        bucket = db.session.get(GenerationDailyStats, day)
+        assert (bucket.resume_generations, bucket.cover_letter_generations, bucket.active_users) == (3, 1, 1)
+
+def test_missing_row_is_rebuilt(test_app, new_user):
+    with test_app.app_context():
+        db.session.execute(db.delete(SiteStats))
+        db.session.commit()
+        stats = load_dashboard_stats(days=7)
+        assert (stats['user_count'], stats['resume_generations'], stats['cover_letter_generations']) == _user_table_totals()
+        assert len(stats['daily']) == 7
+        assert stats['daily'][-1]['day'] == utc_today().isoformat()
+
+def test_dashboard_queries_do_not_scan_users(test_app, new_user):
+    with test_app.app_context():
+        load_dashboard_stats(days=30)
+        statements = []
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            load_dashboard_stats(days=30)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+    assert len(statements) <= 3
+    # The only user query reads the top users off the counter index
+    user_queries = [sql for sql in statements if 'FROM user' in sql]
+    assert len(user_queries) == 1 and 'LIMIT' in user_queries[0]
+    assert not any('count(' in sql.lower() for sql in statements)
+
+def test_dashboard_and_stats_endpoint(test_client, test_app):
+    with test_app.app_context():
+        admin = User(username='statsadmin', is_admin=True)
+        admin.set_password('password')
+        db.session.add(admin)
+        db.session.commit()
+        try:
+            login(test_client, 'statsadmin', 'password')
+            response = test_client.get(url_for('admin.dashboard'))
+            assert response.status_code == 200
+            assert b'Top Users' in response.data
+            assert b'statsadmin' in response.data
+
+            response = test_client.get(url_for('admin.stats', days=5))
+            data = json.loads(response.data)
+            assert len(data['daily']) == 5
+            assert data['user_count'] == _user_table_totals()[0]
+        finally:
+            db.session.delete(admin)
+            db.session.commit()
+
+def test_rebuild_stats_command(runner, test_app, new_user):
+    with test_app.app_context():
+        db.session.execute(db.update(SiteStats).values(user_count=999))
+        db.session.commit()
+        result = runner.invoke(args=['rebuild-stats'])
+        assert 'Rebuilt site stats' in result.output
+        assert _totals() == _user_table_totals()
@@ -0,0 +1,59 @@
+import pytest
+
+from backend.text_compression import compress_text, decompress_text, RAW, ZLIB
+
+
+def test_short_text_is_stored_raw():
+    stored = compress_text('Python')
+    assert stored == RAW + b'Python'
+    assert decompress_text(stored) == 'Python'
+
+def test_long_text_is_compressed():
+    text = 'Led a team of five engineers building resume tooling. ' * 40 + 'Ünïcödé ✓'
+    stored = compress_text(text)
+    assert stored[:1] == ZLIB
+    assert len(stored) < len(text.encode('utf-8')) / 5
+    assert decompress_text(stored) == text
+
+def test_unknown_marker_is_rejected():
+    with pytest.raises(ValueError):
+        decompress_text(b'?data')
+
+def test_zstd_without_package_falls_back_to_zlib(test_app, monkeypatch):
+    from backend import text_compression
+    monkeypatch.setattr(text_compression, 'zstandard', None)
+    monkeypatch.setattr(text_compression, '_codec', 'zlib')
+    test_app.config['TEXT_COMPRESSION_CODEC'] = 'zstd'
+    try:
+        assert text_compression.init_text_compression(test_app) == 'zlib'
+    finally:
+        test_app.config['TEXT_COMPRESSION_CODEC'] = 'zlib'
+        text_compression.init_text_compression(test_app)
+
+def test_unknown_codec_is_rejected(test_app):
+    from backend.text_compression import init_text_compression
+    test_app.config['TEXT_COMPRESSION_CODEC'] = 'lz4'
+    try:
+        with pytest.raises(ValueError):
+            init_text_compression(test_app)
+    finally:
+        test_app.config['TEXT_COMPRESSION_CODEC'] = 'zlib'
+
+def test_description_columns_are_stored_compressed(test_app, new_user):
+    from backend.app import db
+    from backend.models import Experience, Project
+    description = '\n'.join(f'Shipped feature {index} to production.' for index in range(30))
+    with test_app.app_context():
+        experience = Experience(job_title='Engineer', description=description, user_id=new_user.id)
+        project = Project(project_name='Tool', description=None, user_id=new_user.id)
+        db.session.add_all([experience, project])
+        db.session.commit()
+        experience_id, project_id = experience.id, project.id
+        db.session.expire_all()
+
+        stored = db.session.execute(db.text('SELECT description FROM experience WHERE id = :id'),
+                                    {'id': experience_id}).scalar_one()
+        assert stored[:1] == ZLIB
+        assert len(stored) < len(description)
+        assert db.session.get(Experience, experience_id).description == description
+        assert db.session.get(Project, project_id).description is None